@@ -7,12 +7,16 @@ import pandas as pd
 import numpy as np
 
 from modules import config
+from modules.data_loader import load_timeseries
+from modules.feature_store import get_features, get_window, store_columns, store_range
 
 
-def _read_csv(path: Path, parse_dates: List[str] | None = None) -> pd.DataFrame:
-    if not path.exists():
+def _read_csv(path: Path, columns: List[str] | None = None) -> pd.DataFrame:
+    """Idősor CSV a közös loaderből, a timestamp oszlopként (UTC, rendezve)."""
+    df = load_timeseries(path, columns=columns)
+    if df.empty:
         return pd.DataFrame()
-    return pd.read_csv(path, parse_dates=parse_dates)
+    return df.reset_index()
 
 
 def _df_to_records(df: pd.DataFrame, *, max_rows: int) -> List[Dict[str, Any]]:
@@ -37,34 +41,17 @@ def _df_to_records(df: pd.DataFrame, *, max_rows: int) -> List[Dict[str, Any]]:
     return out
 
 
-def _infer_time_col(df: pd.DataFrame) -> str | None:
-    for c in ["timestamp", "date", "time", "datetime"]:
-        if c in df.columns:
-            return c
-    return None
-
-
 def load_training_features_last_row() -> Dict[str, Any]:
     """Utolsó sor a training_features_1h.csv-ből oszlopnevekkel.
 
     Vissza: {"columns": [...], "row": {...}}.
     """
-    path = Path(config.TRAINING_FEATURES_CSV)
-    df = _read_csv(path)
-    if df.empty:
-        return {"columns": [], "row": {}}
-
-    time_col = _infer_time_col(df)
-    if time_col and time_col in df.columns:
-        df[time_col] = pd.to_datetime(df[time_col], errors="coerce", utc=True)
-        df = df.dropna(subset=[time_col]).sort_values(time_col)
-
-    last = df.tail(1)
+    last = get_window(n=1, path=config.TRAINING_FEATURES_CSV).reset_index()
     if last.empty:
-        return {"columns": list(df.columns), "row": {}}
+        return {"columns": [], "row": {}}
 
     row_dict = _df_to_records(last, max_rows=1)[0]
-    return {"columns": list(df.columns), "row": row_dict}
+    return {"columns": list(last.columns), "row": row_dict}
 
 
 def load_longterm_features_last_year() -> Dict[str, Any]:
@@ -74,27 +61,16 @@ def load_longterm_features_last_year() -> Dict[str, Any]:
     Vissza: {"columns": [...], "rows": [...], "time_range": {"start":...,"end":...}}
     """
     path = Path(config.LONGTERM_FEATURES_15D_CSV)
-    df = _read_csv(path)
-    if df.empty:
+    _, end = store_range(path)
+    if end is None:
         return {"columns": [], "rows": [], "time_range": None}
 
-    time_col = _infer_time_col(df)
-    if time_col and time_col in df.columns:
-        df[time_col] = pd.to_datetime(df[time_col], errors="coerce", utc=True)
-        df = df.dropna(subset=[time_col]).sort_values(time_col)
-        end = df[time_col].max()
-        start = end - pd.Timedelta(days=365)
-        df = df[df[time_col] >= start]
-        time_range = {"start": start.isoformat(), "end": end.isoformat()}
-    else:
-        # ha nincs időoszlop, akkor csak az utolsó ~25 sort adjuk
-        df = df.tail(25)
-        time_range = None
-
+    start = end - pd.Timedelta(days=365)
+    df = get_features(start=start, path=path).reset_index()
     return {
         "columns": list(df.columns),
         "rows": _df_to_records(df, max_rows=60),
-        "time_range": time_range,
+        "time_range": {"start": start.isoformat(), "end": end.isoformat()},
     }
 
 
@@ -112,8 +88,6 @@ def load_last_day_bundle() -> Dict[str, Any]:
     # --- market 1h last 24 rows ---
     df_mkt = _read_csv(Path(config.MARKET_DATA_CSV))
     if not df_mkt.empty and "timestamp" in df_mkt.columns:
-        df_mkt["timestamp"] = pd.to_datetime(df_mkt["timestamp"], errors="coerce", utc=True)
-        df_mkt = df_mkt.dropna(subset=["timestamp"]).sort_values("timestamp")
         cutoff = df_mkt["timestamp"].max() - pd.Timedelta(hours=24)
         df_mkt_24h = df_mkt[df_mkt["timestamp"] >= cutoff]
         keep_cols = [c for c in ["timestamp", "open", "high", "low", "close", "volume"] if c in df_mkt_24h.columns]
@@ -127,8 +101,6 @@ def load_last_day_bundle() -> Dict[str, Any]:
     # --- intraday 1m summary + tail ---
     df_intra = _read_csv(Path(config.MARKET_INTRADAY_1M_CSV))
     if not df_intra.empty and "timestamp" in df_intra.columns and "close" in df_intra.columns:
-        df_intra["timestamp"] = pd.to_datetime(df_intra["timestamp"], errors="coerce", utc=True)
-        df_intra = df_intra.dropna(subset=["timestamp"]).sort_values("timestamp")
         # napi ablak: max - 24h
         cutoff = df_intra["timestamp"].max() - pd.Timedelta(hours=24)
         day = df_intra[df_intra["timestamp"] >= cutoff]
@@ -149,9 +121,8 @@ def load_last_day_bundle() -> Dict[str, Any]:
         out["intraday_1m"] = {"summary": None, "columns": [], "tail_rows": []}
 
     # --- sentiment last 7d (daily) ---
-    df_sent = _read_csv(Path(config.SENTIMENT_DATA_CSV), parse_dates=["timestamp"])
+    df_sent = _read_csv(Path(config.SENTIMENT_DATA_CSV))
     if not df_sent.empty and "timestamp" in df_sent.columns:
-        df_sent = df_sent.sort_values("timestamp")
         cutoff = df_sent["timestamp"].max() - pd.Timedelta(days=7)
         df_sent = df_sent[df_sent["timestamp"] >= cutoff]
         keep_cols = [c for c in ["timestamp", "news_sentiment", "fear_greed"] if c in df_sent.columns]
@@ -162,10 +133,6 @@ def load_last_day_bundle() -> Dict[str, Any]:
     # --- macro latest ---
     df_macro = _read_csv(Path(config.MACRO_DATA_CSV))
     if not df_macro.empty:
-        tcol = _infer_time_col(df_macro)
-        if tcol:
-            df_macro[tcol] = pd.to_datetime(df_macro[tcol], errors="coerce", utc=True)
-            df_macro = df_macro.dropna(subset=[tcol]).sort_values(tcol)
         latest = df_macro.tail(1)
         out["macro_latest"] = {"columns": list(df_macro.columns), "row": _df_to_records(latest, max_rows=1)[0] if not latest.empty else {}}
     else:
@@ -174,10 +141,6 @@ def load_last_day_bundle() -> Dict[str, Any]:
     # --- onchain latest ---
     df_on = _read_csv(Path(config.ONCHAIN_DATA_CSV))
     if not df_on.empty:
-        tcol = _infer_time_col(df_on)
-        if tcol:
-            df_on[tcol] = pd.to_datetime(df_on[tcol], errors="coerce", utc=True)
-            df_on = df_on.dropna(subset=[tcol]).sort_values(tcol)
         latest = df_on.tail(1)
         out["onchain_latest"] = {"columns": list(df_on.columns), "row": _df_to_records(latest, max_rows=1)[0] if not latest.empty else {}}
     else:
@@ -191,27 +154,13 @@ def load_last_day_bundle() -> Dict[str, Any]:
 
 
 def load_recent_news(max_items: int = 12) -> List[Dict[str, str]]:
-    # Ne használjunk parse_dates listát előre, mert ha egy oszlop hiányzik,
-    # pandas: "Missing column provided to 'parse_dates'" hibát dob.
     df = _read_csv(Path(config.NEWS_DATA_CSV))
     if df.empty:
         return []
 
-    # időoszlopok óvatos normalizálása
-    for candidate in ["timestamp", "published", "date"]:
-        if candidate in df.columns:
-            df[candidate] = pd.to_datetime(df[candidate], errors="coerce", utc=True)
-
-    time_col = None
-    for candidate in ["timestamp", "published", "date"]:
-        if candidate in df.columns:
-            time_col = candidate
-            break
-
-    if time_col:
-        df = df.sort_values(time_col, ascending=False)
-    else:
-        df = df.tail(max_items)
+    # a loader időrendben adja, a legfrissebb hírek kellenek elöl
+    time_col = "timestamp"
+    df = df.iloc[::-1]
 
     rows = []
     for _, row in df.head(max_items).iterrows():
@@ -229,11 +178,10 @@ def load_recent_news(max_items: int = 12) -> List[Dict[str, str]]:
 
 
 def load_sentiment_snapshot(days: int = 60) -> Dict[str, float | None]:
-    df = _read_csv(Path(config.SENTIMENT_DATA_CSV), parse_dates=["timestamp"])
+    df = _read_csv(Path(config.SENTIMENT_DATA_CSV))
     if df.empty:
         return {"latest": None, "avg": None, "fear_greed": None}
 
-    df = df.sort_values("timestamp")
     cutoff = df["timestamp"].max() - pd.Timedelta(days=days)
     df_recent = df[df["timestamp"] >= cutoff]
 
@@ -248,15 +196,13 @@ def load_sentiment_snapshot(days: int = 60) -> Dict[str, float | None]:
 def load_market_context(days: int = 180) -> Dict[str, float | None]:
     # prefer full history, fallback to operational
     for path in [config.MARKET_DATA_FULL_CSV, config.MARKET_DATA_CSV]:
-        df = _read_csv(Path(path), parse_dates=["timestamp"])
-        if not df.empty:
+        _, last_ts = store_range(path)
+        if last_ts is not None and "close" in store_columns(path):
             break
-    if df.empty:
+    else:
         return {"last_close": None, "return_%": None, "volatility_%": None}
 
-    df = df.sort_values("timestamp")
-    cutoff = df["timestamp"].max() - pd.Timedelta(days=days)
-    df_recent = df[df["timestamp"] >= cutoff]
+    df_recent = get_features(["close"], start=last_ts - pd.Timedelta(days=days), path=path)
 
     if df_recent.empty:
         return {"last_close": None, "return_%": None, "volatility_%": None}
@@ -274,11 +220,10 @@ def load_market_context(days: int = 180) -> Dict[str, float | None]:
 
 def load_long_curve(years_ahead: int = 5) -> Tuple[List[str], List[float]]:
     path = Path(config.BASE_DIR) / "predictions" / "btc_log_curve_prediction.csv"
-    df = _read_csv(path, parse_dates=["timestamp"])
+    df = _read_csv(path)
     if df.empty:
         return [], []
 
-    df = df.sort_values("timestamp")
     labels = [str(ts.year) for ts in df["timestamp"]]
     prices = [float(x) for x in df["pred_price"]]
 
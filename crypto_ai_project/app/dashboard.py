@@ -13,6 +13,7 @@ from modules.config import (
     BASE_DIR,
 )
 from modules.advisor import generate_advice
+from modules.data_loader import load_timeseries
 
 app = Flask(__name__)
 CORS(app)  # <--- Hozzáadva: Engedélyezi a böngészőnek az adatlekérést a React portról
@@ -28,11 +29,11 @@ def load_ohlcv_1h(limit: int = 200) -> list[dict]:
     if not path.exists():
         return []
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return []
 
-    df = df.sort_values("timestamp").tail(limit)
+    df = df.tail(limit)
 
     candles = []
     for _, row in df.iterrows():
@@ -70,7 +71,7 @@ def load_longterm_curve() -> dict:
             "pred_price_high": [],
         }
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return {
             "labels": [],
@@ -79,8 +80,6 @@ def load_longterm_curve() -> dict:
             "pred_price_high": [],
         }
 
-    df = df.sort_values("timestamp")
-
     # X tengelyen csak az ÉV-et akarjuk kiírni
     labels = [str(ts.year) for ts in df["timestamp"]]
 
@@ -101,11 +100,11 @@ def load_intraday_1m(limit: int = 300) -> list[dict]:
     if not path.exists():
         return []
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return []
 
-    df = df.sort_values("timestamp").tail(limit)
+    df = df.tail(limit)
 
     points = []
     for _, row in df.iterrows():
@@ -140,7 +139,7 @@ def load_sentiment_series(days: int = 60) -> dict:
             "latest": {"news_sentiment": 0, "fear_greed": 50},
         }
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return {
             "timestamps": [],
@@ -149,7 +148,6 @@ def load_sentiment_series(days: int = 60) -> dict:
             "latest": {"news_sentiment": 0, "fear_greed": 50},
         }
 
-    df = df.sort_values("timestamp")
     cutoff = df["timestamp"].max() - pd.Timedelta(days=days)
     df = df[df["timestamp"] >= cutoff]
 
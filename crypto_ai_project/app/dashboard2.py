@@ -12,6 +12,9 @@ from modules.config import (
     NEWS_DATA_CSV,
     BASE_DIR,
 )
+from modules.feature_store import get_features, get_window, store_columns, store_range
+from modules.cross_asset import cross_asset_columns
+from modules.data_loader import load_timeseries
 from LLM.news_adjuster import build_adjusted_forecast
 from LLM.chatbot import crypto_chat
 
@@ -28,12 +31,10 @@ def load_ohlcv_1h(limit: int = 200) -> list[dict]:
     if not path.exists():
         return []
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = get_window(n=limit, path=path).reset_index()
     if df.empty:
         return []
 
-    df = df.sort_values("timestamp").tail(limit)
-
     candles = []
     for _, row in df.iterrows():
         candles.append(
@@ -69,7 +70,7 @@ def load_longterm_curve() -> dict:
             "pred_price_high": [],
         }
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return {
             "labels": [],
@@ -78,8 +79,6 @@ def load_longterm_curve() -> dict:
             "pred_price_high": [],
         }
 
-    df = df.sort_values("timestamp")
-
     # X tengelyen csak az ÉV-et akarjuk kiírni
     labels = [str(ts.year) for ts in df["timestamp"]]
 
@@ -100,12 +99,10 @@ def load_intraday_1m(limit: int = 300) -> list[dict]:
     if not path.exists():
         return []
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = get_window(n=limit, path=path).reset_index()
     if df.empty:
         return []
 
-    df = df.sort_values("timestamp").tail(limit)
-
     points = []
     for _, row in df.iterrows():
         points.append(
@@ -138,7 +135,7 @@ def load_sentiment_series(days: int = 60) -> dict:
             "latest": {"news_sentiment": None, "fear_greed": None},
         }
 
-    df = pd.read_csv(path, parse_dates=["timestamp"])
+    df = load_timeseries(path).reset_index()
     if df.empty:
         return {
             "timestamps": [],
@@ -147,7 +144,6 @@ def load_sentiment_series(days: int = 60) -> dict:
             "latest": {"news_sentiment": None, "fear_greed": None},
         }
 
-    df = df.sort_values("timestamp")
     cutoff = df["timestamp"].max() - pd.Timedelta(days=days)
     df = df[df["timestamp"] >= cutoff]
 
@@ -190,19 +186,11 @@ def load_daily_news(limit: int = 25) -> list[dict]:
     if not path.exists():
         return []
 
-    try:
-        df = pd.read_csv(path)
-    except Exception:
-        return []
-
+    df = load_timeseries(path)
     if df.empty:
         return []
 
-    if "timestamp" in df.columns:
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-        df = df.dropna(subset=["timestamp"]).sort_values("timestamp", ascending=False)
-    else:
-        df = df.tail(limit)
+    df = df.iloc[::-1].reset_index()
 
     out = []
     for _, row in df.head(limit).iterrows():
@@ -219,6 +207,77 @@ def load_daily_news(limit: int = 25) -> list[dict]:
     return out
 
 
+def load_named_features(names: list[str], limit: int = 200) -> dict:
+    """
+    Név szerint kért feature-ök az 1H market adatból (feature registry):
+    csak a kért feature-ök részgráfja fut, az utolsó 'limit' sorra.
+
+    Vissza: {"timestamps": [...], "features": {name: [...]}}
+    """
+    path = Path(MARKET_DATA_CSV)
+    if not names or not path.exists():
+        return {"timestamps": [], "features": {}}
+
+    df_feat = get_window(names, n=limit, path=path)
+    if df_feat.empty:
+        return {"timestamps": [], "features": {}}
+
+    return {
+        "timestamps": [ts.isoformat() for ts in df_feat.index],
+        "features": {
+            name: [float(x) if pd.notna(x) else None for x in df_feat[name]]
+            for name in names
+        },
+    }
+
+
+def load_cross_asset(window: int = 90, days: int = 180) -> dict:
+    """
+    BTC vs. S&P500 / DXY / hash-rate / sentiment gördülő korreláció és béta
+    a training feature store-ból (napi mintavétel, utolsó 'days' nap).
+
+    Vissza:
+      {
+        "window": 90,
+        "timestamps": [...],
+        "corr": {faktor: [...]},
+        "latest": {faktor: {"corr": float|None, "beta": float|None}}
+      }
+    """
+    empty = {"window": window, "timestamps": [], "corr": {}, "latest": {}}
+    stored = set(store_columns())
+    cols = [c for c in cross_asset_columns(window) if c in stored]
+    _, last_ts = store_range()
+    if last_ts is None or not cols:
+        return empty
+
+    df = get_features(cols, start=last_ts - pd.Timedelta(days=days))
+    df = df.groupby(df.index.floor("D")).last()
+
+    prefix, suffix = "corr_btc_", f"_{window}d"
+    factors = [c[len(prefix):-len(suffix)] for c in cols if c.startswith(prefix)]
+
+    def _clean(values):
+        return [float(x) if pd.notna(x) else None for x in values]
+
+    corr, latest = {}, {}
+    for name in factors:
+        corr_col = f"corr_btc_{name}{suffix}"
+        beta_col = f"beta_btc_{name}{suffix}"
+        corr[name] = _clean(df[corr_col])
+        latest[name] = {
+            "corr": corr[name][-1] if corr[name] else None,
+            "beta": _clean(df[beta_col].tail(1))[0] if beta_col in df.columns and len(df) else None,
+        }
+
+    return {
+        "window": window,
+        "timestamps": [ts.isoformat() for ts in df.index],
+        "corr": corr,
+        "latest": latest,
+    }
+
+
 # ---------- Flask route-ok ----------
 
 @app.route("/")
@@ -237,6 +296,7 @@ def api_state():
       - 1H OHLCV gyertyák
       - intraday 1m ár
       - sentiment idősor + aktuális értékek
+      - cross-asset korreláció / béta
       - modell előrejelzés + BUY / HOLD / SELL
     """
     # 1) OHLCV
@@ -249,6 +309,9 @@ def api_state():
     # 2b) Napi hírek
     news = load_daily_news(limit=25)
 
+    # 2c) Cross-asset korreláció / béta
+    cross_asset = load_cross_asset(window=90)
+
     # 3) Hosszútávú log-görbe
     long_curve = load_longterm_curve()
 
@@ -274,12 +337,26 @@ def api_state():
         "sentiment": sentiment,
         "news": news,
         "long_curve": long_curve,  # <--- ÚJ
+        "cross_asset": cross_asset,
         "advice": advice,
     }
 
     return jsonify(payload)
 
 
+@app.route("/api/features")
+def api_features():
+    """
+    Név szerinti feature lekérés, pl. /api/features?names=rsi_14,macd,bb_pctb&limit=200
+    """
+    names = [n.strip() for n in (request.args.get("names") or "").split(",") if n.strip()]
+    try:
+        limit = int(request.args.get("limit") or 200)
+        return jsonify(load_named_features(names, limit=limit))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+
 @app.route("/api/llm/adjusted_forecast", methods=["GET"])
 def api_adjusted_forecast():
     """
@@ -0,0 +1,288 @@
+# benchmarks.py
+"""
+Teljesítmény-mérések a feature pipeline-hoz.
+
+Futtatás:
+    python benchmarks.py indicators --bars 1000000
+    python benchmarks.py spectral --bars 1000000
+    python benchmarks.py sentiment --texts 200000 --workers 8
+    python benchmarks.py backends --texts 20000 --backends vader,onnx
+    python benchmarks.py cointelegraph --pages 10
+
+Az eredményt "ms / 1M gyertya" egységben írjuk ki, hogy a különböző méretű
+futások összehasonlíthatók legyenek (a sentiment mérésnél szöveg / mp, és
+szöveg / mp / mag).
+"""
+
+import argparse
+import os
+import re
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _synthetic_ohlcv(n_bars: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Szintetikus 1 perces OHLCV (geometriai bolyongás), hogy a mérés ne függjön
+    a lokálisan meglévő CSV-k méretétől.
+    """
+    rng = np.random.default_rng(seed)
+    log_ret = rng.normal(0.0, 0.001, n_bars)
+    close = 30000.0 * np.exp(np.cumsum(log_ret))
+    open_ = np.empty_like(close)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.normal(0.0, 0.0008, n_bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.gamma(2.0, 5.0, n_bars)
+
+    index = pd.date_range("2020-01-01", periods=n_bars, freq="1min", tz="UTC")
+    return pd.DataFrame(
+        {"open": open_, "high": high, "low": low, "close": close, "volume": volume},
+        index=index,
+    )
+
+
+def _time_call(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _report(rows, n_bars: int):
+    scale = 1_000_000 / n_bars
+    width = max(len(name) for name, _ in rows)
+    print(f"{'indikátor'.ljust(width)}  {'ms / 1M gyertya':>16}")
+    for name, seconds in rows:
+        print(f"{name.ljust(width)}  {seconds * 1000.0 * scale:16.1f}")
+
+
+def bench_indicators(n_bars: int, repeat: int = 3):
+    from modules import feature_engineering as fe
+    from modules.rolling_stats import rolling_order_stats
+
+    df = _synthetic_ohlcv(n_bars)
+    close = df["close"]
+
+    cases = [
+        ("ma_21", lambda: fe.ma(close, 21)),
+        ("ema_12", lambda: fe.ema(close, 12)),
+        ("rsi_14", lambda: fe.rsi(close, 14)),
+        ("macd", lambda: fe.macd(close)),
+        ("bollinger_20", lambda: fe.bollinger_bands(close, 20, 2.0)),
+        ("stochastic_14_3", lambda: fe.stochastic(df, 14, 3)),
+        ("adx_14", lambda: fe.adx(df, 14)),
+        ("ichimoku", lambda: fe.ichimoku(df)),
+        ("supertrend_10_3", lambda: fe.supertrend(df, 10, 3.0)),
+        ("rolling_mad_720", lambda: rolling_order_stats(close, 720, mad=True)),
+        ("rolling_rank_8760", lambda: rolling_order_stats(close, 8760, rank=True)),
+        ("session_vwap_day", lambda: fe.session_vwap(df, "D")),
+        ("volume_profile_168", lambda: fe.rolling_volume_profile(df, 168, 24)),
+        ("add_all_features", lambda: fe.add_all_features(df)),
+    ]
+
+    print(f">>> Indikátor benchmark: {n_bars} gyertya, legjobb {repeat} futásból")
+    rows = [(name, _time_call(func, repeat)) for name, func in cases]
+    _report(rows, n_bars)
+
+
+def _spectral_loop(values: np.ndarray, window: int, n_windows: int):
+    """Referencia: ablakonként külön rfft (a batch-elt útvonal előtti megoldás)."""
+    taper = np.hanning(window)
+    for end in range(window, window + n_windows):
+        seg = values[end - window:end]
+        np.abs(np.fft.rfft((seg - seg.mean()) * taper)) ** 2
+
+
+def bench_spectral(n_bars: int, repeat: int = 3, window: int = 256, loop_windows: int = 20_000):
+    """
+    Gördülő spektrális feature-ök: batch-elt rfft (strided view) vs. ablakonkénti
+    ciklus. A ciklust csak loop_windows ablakon mérjük, és 1M gyertyára vetítjük.
+    """
+    from modules.spectral_features import rolling_spectral_stats
+
+    df = _synthetic_ohlcv(n_bars)
+    log_ret = np.diff(np.log(df["close"].to_numpy()))
+    n_loop = min(loop_windows, max(1, len(log_ret) - window))
+
+    cases = [
+        (f"batched_rfft_{window}", lambda: rolling_spectral_stats(log_ret, window)),
+        (f"batched_rfft_{window}_step15", lambda: rolling_spectral_stats(log_ret, window, step=15)),
+    ]
+
+    print(f">>> Spektrális benchmark: {n_bars} gyertya, ablak={window}, legjobb {repeat} futásból")
+    rows = [(name, _time_call(func, repeat)) for name, func in cases]
+    loop_seconds = _time_call(lambda: _spectral_loop(log_ret, window, n_loop), repeat)
+    rows.append((f"loop_rfft_{window} (becsült)", loop_seconds * n_bars / n_loop))
+    _report(rows, n_bars)
+
+
+SENTIMENT_WORDS = (
+    "bitcoin rallies surges crashes dumps etf approval sec lawsuit whales accumulate "
+    "miners sell record high fear panic bullish bearish breakout support resistance "
+    "great terrible hack exploit adoption inflation rate cut strong weak !!! ?"
+).split()
+
+
+def _synthetic_headlines(n_texts: int, seed: int = 42) -> list:
+    """Véletlen, 8-20 szavas "hírcímek" a SENTIMENT_WORDS szókészletből."""
+    rng = np.random.default_rng(seed)
+    words = np.array(SENTIMENT_WORDS)
+    lengths = rng.integers(8, 21, n_texts)
+    return [" ".join(words[rng.integers(0, len(words), k)]) for k in lengths]
+
+
+def bench_sentiment(n_texts: int, repeat: int = 3, workers: int | None = None):
+    """
+    VADER pontozás: soronkénti DataFrame.apply (a korábbi megoldás) vs. a
+    batch-elt motor egy folyamatban és folyamat-poolon (a pool indítása is benne van).
+    """
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    from modules.sentiment_batch import score_matrix
+
+    workers = workers or os.cpu_count() or 1
+    texts = _synthetic_headlines(n_texts)
+    df = pd.DataFrame({"title": texts})
+    analyzer = SentimentIntensityAnalyzer()
+
+    cases = [
+        ("apply_row", 1, lambda: df.apply(lambda r: analyzer.polarity_scores(r["title"])["compound"], axis=1)),
+        ("batch_1_worker", 1, lambda: score_matrix(texts, workers=1)),
+        (f"batch_{workers}_workers", workers, lambda: score_matrix(texts, workers=workers, min_parallel=0)),
+    ]
+
+    print(f">>> Sentiment benchmark: {n_texts} szöveg, legjobb {repeat} futásból")
+    width = max(len(name) for name, _, _ in cases)
+    print(f"{'mód'.ljust(width)}  {'szöveg / mp':>12}  {'szöveg / mp / mag':>18}")
+    for name, cores, func in cases:
+        rate = n_texts / _time_call(func, repeat)
+        print(f"{name.ljust(width)}  {rate:12.0f}  {rate / cores:18.0f}")
+
+
+def bench_backends(n_texts: int, backends=("vader", "onnx"), repeat: int = 3, latency_samples: int = 200):
+    """
+    Sentiment backendek ugyanazon a korpuszon (cache nélkül):
+    - betöltés: backend létrehozás + warm_up (hidegindítás)
+    - késleltetés: egyetlen szöveg pontozása a bemelegített példánnyal (p50 / p95)
+    - áteresztés: a teljes korpusz egy score_batch hívásban (szöveg / mp)
+    A nem elérhető backendet (hiányzó modell / függőség) kihagyjuk.
+    """
+    from modules.sentiment_backends import BACKENDS
+
+    texts = _synthetic_headlines(n_texts)
+    rows = []
+    for name in backends:
+        start = time.perf_counter()
+        try:
+            backend = BACKENDS[name]()
+            backend.warm_up()
+        except (RuntimeError, KeyError) as e:
+            print(f"{name}: kihagyva ({e})")
+            continue
+        load_ms = (time.perf_counter() - start) * 1000.0
+
+        latencies = []
+        for text in texts[:latency_samples]:
+            t0 = time.perf_counter()
+            backend.score_batch([text])
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        rate = n_texts / _time_call(lambda: backend.score_batch(texts), repeat)
+        rows.append((name, load_ms, np.percentile(latencies, 50), np.percentile(latencies, 95), rate))
+
+    print(f">>> Sentiment backend benchmark: {n_texts} szöveg, legjobb {repeat} futásból, "
+          f"késleltetés {latency_samples} egyedi hívásból")
+    print(f"{'backend':<8}  {'betöltés ms':>11}  {'p50 ms':>8}  {'p95 ms':>8}  {'szöveg / mp':>12}")
+    for name, load_ms, p50, p95, rate in rows:
+        print(f"{name:<8}  {load_ms:11.1f}  {p50:8.3f}  {p95:8.3f}  {rate:12.0f}")
+
+
+COINTELEGRAPH_FIXTURE = Path(__file__).resolve().parent / "data" / "fixtures" / "cointelegraph_tag_page.html"
+# a fixture cikklistájának elemszáma: ha a parser ettől eltér, a mérés érvénytelen
+COINTELEGRAPH_FIXTURE_ARTICLES = 30
+# regressziós küszöb: a cikklista parser cikkenkénti ideje legfeljebb ennyiszerese
+# lehet a régi teljes DOM-os parserének (gépfüggetlen arány; mérve ~0.09)
+COINTELEGRAPH_MAX_TIME_RATIO = 0.25
+
+
+def _scaled_cointelegraph_page(html: str, factor: int) -> str:
+    """A fixture cikklistája factor-szor (egyedi URL-ekkel), a többi rész változatlan."""
+    items = re.findall(r"\s*<li class=\"group-\[\.inline\].*?</li>", html, flags=re.S)
+    block = "".join(items)
+    copies = [block] + [
+        re.sub(r'href="/(news|markets)/', rf'href="/\1/p{k}-', block) for k in range(1, factor)
+    ]
+    return html.replace(block, "".join(copies), 1)
+
+
+def bench_cointelegraph(pages: int = 1, repeat: int = 3):
+    """
+    Cointelegraph tag oldal parse a regressziós fixture-ön (data/fixtures):
+    cikklista parser target (parse_cointelegraph_tag_page) vs. a régi teljes
+    DOM-os parser. pages > 1: a cikklistát felszorozzuk (hosszabb oldal / több
+    oldal). Hibával áll le, ha a cikkszám eltér, vagy ha az új parser ideje a
+    régihez képest COINTELEGRAPH_MAX_TIME_RATIO fölé nő.
+    """
+    from modules.sentiment_analyzer import parse_cointelegraph_tag_page, _parse_cointelegraph_soup
+
+    html = _scaled_cointelegraph_page(COINTELEGRAPH_FIXTURE.read_text(encoding="utf-8"), pages)
+    n_fast = len(parse_cointelegraph_tag_page(html))
+    expected = COINTELEGRAPH_FIXTURE_ARTICLES * pages
+    if n_fast != expected:
+        raise RuntimeError(f"A fixture-ből {n_fast} cikk jött ki, {expected} helyett.")
+
+    cases = [
+        ("target_article_list", lambda: parse_cointelegraph_tag_page(html)),
+        ("soup_all_links (régi)", lambda: _parse_cointelegraph_soup(html)),
+    ]
+    print(f">>> Cointelegraph parse benchmark: {len(html) // 1024} KB, {expected} cikk, legjobb {repeat} futásból")
+    width = max(len(name) for name, _ in cases)
+    print(f"{'parser'.ljust(width)}  {'ms / oldal':>10}  {'µs / cikk':>10}")
+    timings = []
+    for name, func in cases:
+        seconds = _time_call(func, repeat)
+        timings.append(seconds)
+        print(f"{name.ljust(width)}  {seconds * 1000.0 / pages:10.2f}  {seconds * 1e6 / expected:10.1f}")
+
+    ratio = timings[0] / timings[1]
+    print(f"arány (új / régi): {ratio:.3f}, küszöb: {COINTELEGRAPH_MAX_TIME_RATIO}")
+    if ratio > COINTELEGRAPH_MAX_TIME_RATIO:
+        raise RuntimeError(
+            f"Cointelegraph parser regresszió: {timings[0] * 1e6 / expected:.1f} µs / cikk, "
+            f"a régi parser {ratio:.2f}-szerese (küszöb: {COINTELEGRAPH_MAX_TIME_RATIO})."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=[
+        "indicators",
+        "spectral",
+        "sentiment",
+        "backends",
+        "cointelegraph",
+    ])
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--texts", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backends", default="vader,onnx")
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "indicators":
+        bench_indicators(args.bars, repeat=args.repeat)
+    elif args.command == "spectral":
+        bench_spectral(args.bars, repeat=args.repeat)
+    elif args.command == "sentiment":
+        bench_sentiment(args.texts, repeat=args.repeat, workers=args.workers)
+    elif args.command == "backends":
+        bench_backends(args.texts, backends=args.backends.split(","), repeat=args.repeat)
+    elif args.command == "cointelegraph":
+        bench_cointelegraph(args.pages, repeat=args.repeat)
@@ -6,11 +6,21 @@ Training feature store összeállítása:
 - on-chain mutatók (ONCHAIN_DATA_CSV)
 - makró mutatók (MACRO_DATA_CSV)
 - hosszú távú sentiment (TRAINING_SENTIMENT_FEATURES_CSV)
+- órás hírsentiment + news pressure (SENTIMENT_STREAM_CSV, sentiment_stream)
+- napi per-eszköz hírsentiment (ASSET_SENTIMENT_CSV, entity_tagger)
+- gördülő cross-asset korreláció / béta (BTC vs. S&P500, DXY, hash-rate, sentiment)
 - esemény-jellegű feature-ök (halving, China ban, COVID, ETF, stb.)
 
 Kimenet: data/processed/training_features_1h.csv
+
+Futtatás:
+    python build_training_features.py                 # teljes újraépítés
+    python build_training_features.py --incremental   # csak az új órák hozzáfűzése
 """
 
+import io
+import json
+
 import numpy as np
 import pandas as pd
 
@@ -19,46 +29,28 @@ from modules.config import (
     ONCHAIN_DATA_CSV,
     MACRO_DATA_CSV,
     TRAINING_SENTIMENT_FEATURES_CSV,
+    ASSET_SENTIMENT_CSV,
     PROCESSED_DIR,
+    ASOF_MAX_STALENESS,
+    TRAINING_FEATURES_META_JSON,
+    TRAINING_FULL_REBUILD_DAYS,
 )
 from modules.feature_engineering import add_all_features
 from modules.event_features import build_event_features
+from modules.dtypes import apply_dtype_policy
+from modules.asof_join import asof_join
+from modules.cross_asset import build_cross_asset_daily
+from modules.sentiment_stream import stream_features, stream_max_staleness
+from modules.data_loader import load_timeseries, parse_timestamps
+from modules.feature_registry import BASE_COLUMNS, compute_features, list_features
 
 
 TRAINING_FEATURES_CSV = PROCESSED_DIR / "training_features_1h.csv"
 
 
-def _load_df_or_empty(path, index_col="timestamp"):
-    """
-    CSV beolvasása biztonságosan.
-    - ha a fájl nem létezik -> üres DataFrame
-    - ha nincs index_col -> üres DataFrame
-    - ha van, akkor kényszerítve datetime (utc), NaN timestamp sorok kidobása
-    """
-    try:
-        df = pd.read_csv(path)
-    except FileNotFoundError:
-        print(f"{path} nem létezik, üres DataFrame-et adunk vissza.")
-        return pd.DataFrame()
-
-    if index_col not in df.columns:
-        print(f"{path} nem tartalmaz '{index_col}' oszlopot, üres DataFrame-et adunk vissza.")
-        return pd.DataFrame()
-
-    df[index_col] = pd.to_datetime(df[index_col], errors="coerce", utc=True)
-    df = df.dropna(subset=[index_col])
-
-    if df.empty:
-        print(f"{path} csak érvénytelen/üres timestamp sorokat tartalmaz, üres DataFrame.")
-        return pd.DataFrame()
-
-    df = df.set_index(index_col).sort_index()
-    return df
-
-
-def build_training_features():
-    # 1) Market full history (1H OHLCV)
-    df_mkt = _load_df_or_empty(MARKET_DATA_FULL_CSV)
+def _load_market_1h() -> pd.DataFrame:
+    """Market full history (1H OHLCV), 1h-ra aggregálva."""
+    df_mkt = load_timeseries(MARKET_DATA_FULL_CSV)
     if df_mkt.empty:
         raise RuntimeError(
             "MARKET_DATA_FULL_CSV üres vagy hiányzik. Futtasd először: bootstrap_market_data.py"
@@ -81,42 +73,154 @@ def build_training_features():
     ).dropna(subset=["open", "close"])
 
     print("Market 1h resampled shape:", df_mkt_1h.shape)
+    return df_mkt_1h
 
-    # 2) Technikai indikátorok
-    df_feat = add_all_features(df_mkt_1h)
-    print("Market with features shape:", df_feat.shape)
 
-    # 3) On-chain
-    df_onchain = _load_df_or_empty(ONCHAIN_DATA_CSV)
+def _load_slow_sources(df_mkt_1h: pd.DataFrame) -> dict:
+    """On-chain, makró, napi + órás sentiment és cross-asset források (as-of illesztéshez)."""
+    df_onchain = load_timeseries(ONCHAIN_DATA_CSV)
     if not df_onchain.empty:
         print("On-chain raw shape:", df_onchain.shape)
-        df_onchain_1h = df_onchain.resample("1h").ffill()
-    else:
-        df_onchain_1h = pd.DataFrame(index=df_feat.index)
-    # 4) Makró
-    df_macro = _load_df_or_empty(MACRO_DATA_CSV)
+    df_macro = load_timeseries(MACRO_DATA_CSV)
     if not df_macro.empty:
         print("Macro raw shape:", df_macro.shape)
-        df_macro_1h = df_macro.resample("1h").ffill()
-    else:
-        df_macro_1h = pd.DataFrame(index=df_feat.index)
-
-    # 5) Sentiment (napi) -> 1h
-    df_sent_long = _load_df_or_empty(TRAINING_SENTIMENT_FEATURES_CSV)
+    df_sent_long = load_timeseries(TRAINING_SENTIMENT_FEATURES_CSV)
     if not df_sent_long.empty:
         print("Sentiment long shape:", df_sent_long.shape)
-        df_sent_1h = df_sent_long.resample("1h").ffill()
-    else:
-        df_sent_1h = pd.DataFrame(index=df_feat.index)
+    # órás sentiment a mentett stream állapotból (a hír store újraolvasása nélkül)
+    df_sent_stream = stream_features()
+    if not df_sent_stream.empty:
+        print("Sentiment stream shape:", df_sent_stream.shape)
+    df_sent_assets = load_timeseries(ASSET_SENTIMENT_CSV)
+    if not df_sent_assets.empty:
+        print("Asset sentiment shape:", df_sent_assets.shape)
+
+    # napi BTC vs. faktor korreláció / béta (a nap végével indexelve)
+    factors = [df for df in (df_onchain, df_macro, df_sent_long) if not df.empty]
+    df_cross = pd.DataFrame()
+    if factors:
+        df_cross = build_cross_asset_daily(df_mkt_1h["close"], pd.concat(factors, axis=1, sort=True))
+        print("Cross-asset shape:", df_cross.shape)
+
+    return {
+        "onchain": df_onchain,
+        "macro": df_macro,
+        "sentiment": df_sent_long,
+        "sentiment_stream": df_sent_stream,
+        "asset_sentiment": df_sent_assets,
+        "cross_asset": df_cross,
+    }
+
+
+def _asof_staleness() -> dict:
+    """Forrásonkénti staleness korlát: ASOF_MAX_STALENESS + a stream bucket méretéből számolt korlát."""
+    return {**ASOF_MAX_STALENESS, "sentiment_stream": stream_max_staleness()}
+
+
+def _stale_limited_columns(slow_sources: dict, columns) -> list:
+    """A staleness-korlátos források oszlopai (ezeket nem ffill-eljük)."""
+    staleness = _asof_staleness()
+    return [
+        col
+        for name, df_src in slow_sources.items()
+        if staleness.get(name) is not None
+        for col in df_src.columns
+        if col in columns
+    ]
+
+
+def _read_csv_tail(path, n_rows: int) -> pd.DataFrame:
+    """
+    A CSV fejléce + utolsó n_rows sora, a fájl végéről visszafelé olvasva
+    (a teljes training store beolvasása nélkül).
+    """
+    block = 1 << 16
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(0, 2)
+        end = f.tell()
+        pos = end
+        data = b""
+        while pos > len(header) and data.count(b"\n") <= n_rows:
+            step = min(block, pos - len(header))
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines()[-n_rows:]
+    text = (header + b"\n".join(lines) + b"\n").decode("utf-8")
+    df = pd.read_csv(io.StringIO(text))
+    df.index = parse_timestamps(df.pop("timestamp")).rename("timestamp")
+    return df
+
+
+def _load_meta() -> dict:
+    try:
+        with open(TRAINING_FEATURES_META_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_meta(meta: dict):
+    TRAINING_FEATURES_META_JSON.parent.mkdir(exist_ok=True, parents=True)
+    with open(TRAINING_FEATURES_META_JSON, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _full_rebuild_due(meta: dict) -> str | None:
+    """Ha teljes újraépítés kell, az oka; különben None."""
+    if not TRAINING_FEATURES_CSV.exists():
+        return "nincs még training store"
+    last_full = meta.get("last_full_build")
+    if not last_full:
+        return "nincs meta információ az utolsó teljes buildről"
+    age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(last_full)
+    if age > pd.Timedelta(days=TRAINING_FULL_REBUILD_DAYS):
+        return f"az utolsó teljes build {age.days} napos (periodikus konzisztencia-ellenőrzés)"
+    return None
+
+
+def _report_consistency(df_old: pd.DataFrame, df_new: pd.DataFrame, tol: float = 1e-3):
+    """
+    Teljes újraépítéskor: a korábbi (inkrementálisan bővített) store és az
+    újraszámolt adatok eltérése a közös sorokon / oszlopokon.
+    Az eltérést az oszlop szórásához viszonyítjuk.
+    """
+    common_idx = df_old.index.intersection(df_new.index)
+    common_cols = df_old.columns.intersection(df_new.columns)
+    if len(common_idx) == 0 or len(common_cols) == 0:
+        return
+
+    old = df_old.loc[common_idx, common_cols].astype(float)
+    new = df_new.loc[common_idx, common_cols].astype(float)
+    scale = new.std().replace(0, 1.0).fillna(1.0)
+    rel_diff = ((old - new).abs().max() / scale).sort_values(ascending=False)
+
+    bad = rel_diff[rel_diff > tol]
+    print(f"Konzisztencia: {len(common_idx)} közös sor, {len(common_cols)} oszlop, "
+          f"max relatív eltérés: {rel_diff.iloc[0]:.2e}")
+    for col, val in bad.head(10).items():
+        print(f"  eltérés: {col} ({val:.2e})")
+
+
+def _build_full():
+    """Teljes újraépítés. Visszaad: (df_all, az adat hiányában eldobott oszlopok)."""
+    df_mkt_1h = _load_market_1h()
+
+    # 2) Technikai indikátorok
+    df_feat = add_all_features(df_mkt_1h)
+    print("Market with features shape:", df_feat.shape)
+
+    # 3) On-chain, 4) Makró, 5) Sentiment (napi), cross-asset -> as-of illesztés az 1h
+    #    indexre (nem gyártjuk le a forrás teljes órás történetét, csak a cél időpontokat)
+    slow_sources = _load_slow_sources(df_mkt_1h)
 
     # 6) Esemény feature-ök
     df_events = build_event_features(df_feat.index)
     print("Events shape:", df_events.shape)
 
     # 7) Join mindenre – market feature-ök a bázis
-    df_all = df_feat.join(df_onchain_1h, how="left")
-    df_all = df_all.join(df_macro_1h, how="left")
-    df_all = df_all.join(df_sent_1h, how="left")
+    df_all = asof_join(df_feat, slow_sources, staleness=_asof_staleness())
     df_all = df_all.join(df_events, how="left")
 
     print("Joined (raw) shape:", df_all.shape)
@@ -124,12 +228,17 @@ def build_training_features():
 
     # NaN / inf kezelése
 
-    # 1) Inf-ekből NaN
+    # 1) Inf-ekből NaN, majd dtype policy (float32 feature-ök, int8 flagek),
+    #    hogy a tisztítás már a feleakkora working seten fusson
     df_all = df_all.replace([np.inf, -np.inf], np.nan)
+    df_all = apply_dtype_policy(df_all)
 
     # 2) Először időben valamennyire simítsunk: ffill/bfill
-    df_all = df_all.ffill()
-    df_all = df_all.bfill()
+    #    (kivéve a staleness-korlátos források oszlopait: az elavult értéket
+    #    ne örököljük tovább, azt a 3) lépés tölti ki a historikus átlaggal)
+    stale_limited = _stale_limited_columns(slow_sources, df_all.columns)
+    fill_cols = df_all.columns.difference(stale_limited, sort=False)
+    df_all[fill_cols] = df_all[fill_cols].ffill().bfill()
 
     # 3) Oszloponként döntés:
     #    - ha egy oszlopban gyakorlatilag soha nincs érték -> dobjuk
@@ -155,14 +264,125 @@ def build_training_features():
         df_all = df_all.drop(columns=cols_to_drop)
 
     print("After cleaning shape:", df_all.shape)
+    return df_all, cols_to_drop
+
+
+def _build_increment(df_tail: pd.DataFrame, dropped_columns=()) -> pd.DataFrame | None:
+    """
+    Az utolsó mentett sor utáni új órák sorai.
+
+    - market feature-ök: a feature registry-vel (last_n), minden spec csak a
+      saját lookback farkán fut; kivétel a három kumulatív oszlop (obv, vwap,
+      avwap_halving): ezek egy-egy vektorizált cumsum a teljes history-n, mert
+      a mentett (float32) utolsó sorból nem folytathatók pontosan (a vwap-hoz
+      a kumulált volumen is kellene, ami nincs a store-ban)
+    - lassú források: as-of az új időpontokra (a legfrissebb ismert érték)
+    - tisztítás: ffill a legutolsó mentett sorból indulva
+
+    None, ha inkrementálisan nem építhető (pl. új/hiányzó oszlop) -> teljes build.
+    """
+    last_ts = df_tail.index[-1]
+    columns = list(df_tail.columns)
+
+    df_mkt_1h = _load_market_1h()
+    new_index = df_mkt_1h.index[df_mkt_1h.index > last_ts]
+    if len(new_index) == 0:
+        return df_tail.iloc[0:0]
+
+    registered = set(list_features())
+    feat_names = [c for c in columns if c in registered]
+    n_new = len(new_index)
+
+    df_feat = df_mkt_1h.loc[new_index, list(BASE_COLUMNS)]
+    df_feat = df_feat.join(compute_features(df_mkt_1h, feat_names, last_n=n_new))
+    df_feat = df_feat.replace([np.inf, -np.inf], np.nan).dropna()
+    if df_feat.empty:
+        return df_tail.iloc[0:0]
+
+    slow_sources = _load_slow_sources(df_mkt_1h)
+    df_new = asof_join(df_feat, slow_sources, staleness=_asof_staleness())
+    df_new = df_new.join(build_event_features(df_feat.index), how="left")
+
+    missing = [c for c in columns if c not in df_new.columns]
+    extra = [c for c in df_new.columns if c not in columns and c not in dropped_columns]
+    if missing or extra:
+        print(f"Inkrementális build nem lehetséges, megváltozott oszlopkészlet "
+              f"(hiányzó: {missing}, új: {extra})")
+        return None
+    df_new = df_new[columns]
+
+    df_new = df_new.replace([np.inf, -np.inf], np.nan)
+    df_new = apply_dtype_policy(df_new)
+
+    # ffill a legutolsó mentett sorból (az már tisztított, NaN-mentes)
+    stale_limited = _stale_limited_columns(slow_sources, columns)
+    fill_cols = df_new.columns.difference(stale_limited, sort=False)
+    seeded = pd.concat([df_tail[fill_cols].iloc[-1:], df_new[fill_cols]])
+    df_new[fill_cols] = seeded.ffill().iloc[1:].astype(df_new[fill_cols].dtypes)
+
+    # staleness miatt üres értékek: a mentett store oszlop-átlaga (mint a teljes buildnél)
+    nan_cols = [c for c in stale_limited if df_new[c].isna().any()]
+    if nan_cols:
+        means = load_timeseries(TRAINING_FEATURES_CSV, columns=nan_cols, use_cache=False).mean()
+        df_new[nan_cols] = df_new[nan_cols].fillna(means)
+
+    return apply_dtype_policy(df_new)
+
+
+def build_training_features(incremental: bool = False):
+    """
+    Training feature store építése.
+
+    incremental=True: csak az utolsó mentett időpont utáni órák sorait számoljuk
+    ki és fűzzük a CSV végére. Teljes újraépítés történik, ha még nincs store,
+    ha az utolsó teljes build TRAINING_FULL_REBUILD_DAYS napnál régebbi, vagy ha
+    az oszlopkészlet megváltozott. Teljes buildkor a korábbi store-t
+    összevetjük az újraszámolt adatokkal (konzisztencia-ellenőrzés), mert a
+    lassú források utólag pótolt értékei csak így kerülnek be a régi sorokba.
+    """
+    meta = _load_meta()
+
+    if incremental:
+        reason = _full_rebuild_due(meta)
+        if reason is None:
+            df_tail = _read_csv_tail(TRAINING_FEATURES_CSV, 1)
+            print("Inkrementális build, utolsó mentett időpont:", df_tail.index[-1])
+            df_new = _build_increment(df_tail, meta.get("dropped_columns", ()))
+            if df_new is not None:
+                if not df_new.empty:
+                    df_new.to_csv(TRAINING_FEATURES_CSV, mode="a", header=False)
+                meta["last_incremental_build"] = pd.Timestamp.now(tz="UTC").isoformat()
+                meta["rows_appended_since_full"] = meta.get("rows_appended_since_full", 0) + len(df_new)
+                _save_meta(meta)
+                print(f"Hozzáfűzött sorok: {len(df_new)}")
+                print(f"Mentve: {TRAINING_FEATURES_CSV}")
+                return
+        else:
+            print(f"Teljes újraépítés: {reason}")
+
+    df_all, cols_dropped = _build_full()
+
+    if TRAINING_FEATURES_CSV.exists() and meta.get("rows_appended_since_full"):
+        df_old = load_timeseries(TRAINING_FEATURES_CSV, use_cache=False)
+        _report_consistency(df_old, df_all)
 
     TRAINING_FEATURES_CSV.parent.mkdir(exist_ok=True, parents=True)
     df_all.to_csv(TRAINING_FEATURES_CSV, index_label="timestamp")
 
+    _save_meta({
+        "last_full_build": pd.Timestamp.now(tz="UTC").isoformat(),
+        "rows_appended_since_full": 0,
+        "dropped_columns": cols_dropped,
+    })
+
     print("Training features shape:", df_all.shape)
     print(f"Mentve: {TRAINING_FEATURES_CSV}")
 
 
-
 if __name__ == "__main__":
-    build_training_features()
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true")
+    args = parser.parse_args()
+    build_training_features(incremental=args.incremental)
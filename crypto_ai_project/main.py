@@ -1,6 +1,5 @@
 # main.py
 import argparse
-import pandas as pd
 
 from modules.config import (
     MARKET_DATA_CSV,
@@ -9,7 +8,7 @@ from modules.config import (
 )
 
 
-def cmd_update_data():
+def cmd_update_data(full_rebuild=False):
     from modules.data_collector import (
         update_market_data_csv,
         update_onchain_data,
@@ -47,7 +46,7 @@ def cmd_update_data():
     print(f"News data shape: {df_news.shape}")
 
     print(">>> Hír + sentiment idősor build (CoinDesk, Reddit, Cointelegraph + Fear&Greed)...")
-    df_sent = build_sentiment_timeseries()
+    df_sent = build_sentiment_timeseries(incremental=not full_rebuild)
     print(f"Sentiment shape: {df_sent.shape}")
     
     print(">>> Intraday 1m OHLCV frissítés (mai nap)...")
@@ -65,9 +64,7 @@ def cmd_update_data():
 
     print(">>> Training feature store frissítése (training_features_1h.csv)...")
     try:
-        from build_training_features import build_training_features
-
-        build_training_features()
+        cmd_build_training_features(full_rebuild=full_rebuild)
     except Exception as e:
         print(f"FIGYELEM: training_features_1h build kihagyva/hibás ({e})")
 
@@ -80,9 +77,10 @@ def cmd_update_data():
 
 def cmd_build_features():
     from modules.feature_engineering import add_all_features
+    from modules.data_loader import load_timeseries
 
     print(">>> Feature engineering (technikai indikátorok)...")
-    df_mkt = pd.read_csv(MARKET_DATA_CSV, parse_dates=["timestamp"]).set_index("timestamp")
+    df_mkt = load_timeseries(MARKET_DATA_CSV)
     df_fe = add_all_features(df_mkt)
     df_fe.to_csv(MARKET_FEATURES_CSV, index_label="timestamp")
     print(f"Market features shape: {df_fe.shape}")
@@ -96,11 +94,35 @@ def cmd_build_all_features():
     print(f"All features shape: {df_all.shape}")
 
 
-def cmd_train(epochs=10):
+def cmd_build_training_features(full_rebuild=False):
+    from build_training_features import build_training_features
+
+    # alapból csak az új órák sorait fűzzük hozzá; --full-rebuild: teljes újraépítés
+    build_training_features(incremental=not full_rebuild)
+
+
+def cmd_train(epochs=10, pca_components=None, streaming=False):
     from modules.forecast_model import train_model
 
     print(">>> Model tanítása (training_features_1h alapján)...")
-    train_model(epochs=epochs)
+    kwargs = {"epochs": epochs, "streaming": streaming}
+    if pca_components is not None:
+        # 0 = tömörítés nélkül, > 0 = PCA komponensek száma (felülírja a configot)
+        kwargs["pca_components"] = pca_components
+    train_model(**kwargs)
+
+
+def cmd_select_features(repeats=None, workers=None, max_features=None):
+    from modules.config import FEATURE_SELECTION_REPEATS, FEATURE_SELECTION_WORKERS
+    from modules.feature_selection import select_features
+
+    print(">>> Feature szelekció (permutation importance a validációs szakaszon)...")
+    select_features(
+        repeats=repeats or FEATURE_SELECTION_REPEATS,
+        workers=workers or FEATURE_SELECTION_WORKERS,
+        max_features=max_features,
+    )
+    print("A következő 'train' már a kiválasztott feature-ökkel tanít.")
 
 
 def cmd_advise():
@@ -151,22 +173,40 @@ if __name__ == "__main__":
         "update_data",
         "build_features",
         "build_all_features",
+        "build_training_features",
         "train",
+        "select_features",
         "advise",
         "build_long_curve", 
         "log_curve",
     ])
     parser.add_argument("--epochs", type=int, default=10)  # most nem használjuk, de maradhat
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="training_features_1h.csv teljes újraépítése (inkrementális hozzáfűzés helyett)")
+    parser.add_argument("--pca-components", type=int, default=None,
+                        help="train: PCA komponensek száma a skálázás után (0 = kikapcsolva)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="train: a training store chunkolt olvasása (nem tölti be egyben a memóriába)")
+    parser.add_argument("--repeats", type=int, default=None,
+                        help="select_features: permutációs ismétlések feature-önként")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="select_features: párhuzamos worker folyamatok száma")
+    parser.add_argument("--max-features", type=int, default=None,
+                        help="select_features: legfeljebb ennyi feature-t tartunk meg")
     args = parser.parse_args()
 
     if args.command == "update_data":
-        cmd_update_data()
+        cmd_update_data(full_rebuild=args.full_rebuild)
     elif args.command == "build_features":
         cmd_build_features()
     elif args.command == "build_all_features":
         cmd_build_all_features()
+    elif args.command == "build_training_features":
+        cmd_build_training_features(full_rebuild=args.full_rebuild)
     elif args.command == "train":
-        cmd_train(epochs=args.epochs)
+        cmd_train(epochs=args.epochs, pca_components=args.pca_components, streaming=args.streaming)
+    elif args.command == "select_features":
+        cmd_select_features(repeats=args.repeats, workers=args.workers, max_features=args.max_features)
     elif args.command == "advise":
         cmd_advise()
     elif args.command == "build_long_curve":
@@ -1,8 +1,9 @@
 import os
 import re
+import numpy as np
 import pandas as pd
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from tqdm import tqdm
+
+from modules.sentiment_backends import score_batch
 
 # Szövegtisztítás
 URL_RE = re.compile(r'https?://\S+|www\.\S+')
@@ -36,21 +37,10 @@ def score_news(df_news: pd.DataFrame) -> pd.DataFrame:
     # Hiányzó értékek kezelése
     df_news['title'] = df_news['title'].fillna('').astype(str)
 
-    analyzer = SentimentIntensityAnalyzer()
-    scores = []
-    labels = []
-
-    for _, row in tqdm(df_news.iterrows(), total=len(df_news), desc="Scoring news"):
-        text = clean_text(row['title'])
-        score = analyzer.polarity_scores(text)['compound']
-        if score >= 0.05:
-            label = 'positive'
-        elif score <= -0.05:
-            label = 'negative'
-        else:
-            label = 'neutral'
-        scores.append(score)
-        labels.append(label)
+    # batch-elt pontozás a beállított backenddel (SENTIMENT_BACKEND, megosztott példány)
+    texts = [clean_text(t) for t in df_news['title']]
+    scores = score_batch(texts)[:, 0]
+    labels = np.select([scores >= 0.05, scores <= -0.05], ['positive', 'negative'], default='neutral')
 
     df_news['sentiment_score'] = scores
     df_news['sentiment_label'] = labels
@@ -6,8 +6,9 @@ from datetime import datetime, timezone
 import numpy as np
 import pandas as pd
 
-from .config import TRAINING_FEATURES_CSV, TRAINING_SENTIMENT_FEATURES_CSV
+from .config import TRAINING_SENTIMENT_FEATURES_CSV, ADVISOR_FEATURES
 from .forecast_model import predict_next_close
+from .feature_store import get_asof, get_features, get_window, store_columns
 
 
 def _to_float_or_none(value):
@@ -34,11 +35,9 @@ def _to_int_or_none(value):
 
 def _get_last_valid_from_training_sentiment(col_name: str):
     try:
-        df = pd.read_csv(TRAINING_SENTIMENT_FEATURES_CSV, parse_dates=["timestamp"])
-        df = df.set_index("timestamp").sort_index()
-        if col_name not in df.columns:
+        if col_name not in store_columns(TRAINING_SENTIMENT_FEATURES_CSV):
             return None
-        s = df[col_name].dropna()
+        s = get_features([col_name], path=TRAINING_SENTIMENT_FEATURES_CSV)[col_name].dropna()
         if s.empty:
             return None
         return s.iloc[-1]
@@ -46,6 +45,24 @@ def _get_last_valid_from_training_sentiment(col_name: str):
         return None
 
 
+def _named_market_features(last_row: pd.Series) -> dict:
+    """
+    Az ADVISOR_FEATURES értékei név szerint: ami a last_row-ban megvan, azt
+    használjuk, a többit a feature store adja (a registry az OHLCV oszlopokból
+    számolja, csak az utolsó sorhoz szükséges előtörténeten).
+    """
+    values = {name: _to_float_or_none(last_row.get(name)) for name in ADVISOR_FEATURES if name in last_row.index}
+    missing = [name for name in ADVISOR_FEATURES if name not in values]
+    if missing:
+        try:
+            computed = get_asof(missing)
+            for name in missing:
+                values[name] = _to_float_or_none(computed.get(name))
+        except Exception:
+            pass
+    return values
+
+
 def generate_advice() -> dict:
     """Tanács generálás a modell predikció + utolsó feature sor alapján.
 
@@ -84,14 +101,15 @@ def generate_advice() -> dict:
     if fear_greed is None:
         fear_greed = _to_int_or_none(_get_last_valid_from_training_sentiment("fear_greed"))
 
-    # market/indikátorok (ha vannak)
-    rsi_14 = _to_float_or_none(last_row.get("rsi_14"))
-    atr_14 = _to_float_or_none(last_row.get("atr_14"))
-    ret_std_30 = _to_float_or_none(last_row.get("ret_std_30"))
-    ma_21 = _to_float_or_none(last_row.get("ma_21"))
-    ma_50 = _to_float_or_none(last_row.get("ma_50"))
-    vwap = _to_float_or_none(last_row.get("vwap"))
-    vol_change = _to_float_or_none(last_row.get("vol_change"))
+    # market/indikátorok név szerint (feature registry fallback-kel)
+    market = _named_market_features(last_row)
+    rsi_14 = market.get("rsi_14")
+    atr_14 = market.get("atr_14")
+    ret_std_30 = market.get("ret_std_30")
+    ma_21 = market.get("ma_21")
+    ma_50 = market.get("ma_50")
+    vwap = market.get("vwap")
+    vol_change = market.get("vol_change")
 
     trend_notes = []
     if ma_21 is not None:
@@ -99,11 +117,10 @@ def generate_advice() -> dict:
     if ma_50 is not None:
         trend_notes.append("above_ma50" if last_close > ma_50 else "below_ma50")
 
-    # rövid távú hozamok a training_features-ből (tail read)
+    # rövid távú hozamok a training_features-ből (utolsó 1 hét + 1 sor)
     recent_returns = {}
     try:
-        df_tail = pd.read_csv(TRAINING_FEATURES_CSV, parse_dates=["timestamp"]).set_index("timestamp").sort_index()
-        close = df_tail["close"].astype(float)
+        close = get_window(["close"], n=24 * 7 + 1)["close"].astype(float)
         def pct(n):
             if len(close) > n:
                 return _to_float_or_none((close.iloc[-1] / close.iloc[-(n + 1)] - 1.0) * 100.0)
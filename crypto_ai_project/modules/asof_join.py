@@ -0,0 +1,98 @@
+# modules/asof_join.py
+"""
+As-of illesztés lassú (napi / ritka) forrásokhoz.
+
+A korábbi megoldás (resample("1h").ffill() + left join) a teljes forrás
+történetére (makró: 1927-től, on-chain: 2009-től) legyártotta az órás sorokat,
+amiknek a nagy részét a join utána eldobta. Itt a cél index minden
+időpontjához közvetlenül kikeressük (searchsorted) az utolsó, nem későbbi
+forrás-megfigyelést:
+
+- a forrást előbb a cél tartományra vágjuk (a tartomány előtti utolsó sort
+  megtartjuk, mert az az első cél-időpontok értéke)
+- max_staleness: ha a legutóbbi megfigyelés ennél régebbi, az érték NaN
+  (None = nincs korlát, ez felel meg a régi ffill viselkedésnek)
+"""
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import to_epoch_ns
+
+
+def _clip_to_target(source: pd.DataFrame, start, end) -> pd.DataFrame:
+    """A forrás azon része, ami a [start, end] cél tartományhoz kell."""
+    first = source.index.searchsorted(start, side="right") - 1
+    last = source.index.searchsorted(end, side="right")
+    return source.iloc[max(first, 0):last]
+
+
+def asof_align(
+    source: pd.DataFrame,
+    target_index: pd.DatetimeIndex,
+    max_staleness=None,
+) -> pd.DataFrame:
+    """
+    A forrás oszlopai a cél index időpontjaira illesztve (as-of, visszafelé).
+
+    source:        DatetimeIndex-es DataFrame (rendezetlen / duplikált index is jó,
+                   duplikátumnál a későbbi sor nyer)
+    target_index:  rendezett DatetimeIndex (pl. az 1h market index)
+    max_staleness: pl. "3D" vagy pd.Timedelta; None = korlátlan
+    """
+    if source.empty or len(target_index) == 0:
+        return pd.DataFrame(index=target_index, columns=source.columns, dtype=float)
+
+    if not source.index.is_monotonic_increasing:
+        source = source.sort_index(kind="stable")
+    if source.index.has_duplicates:
+        source = source[~source.index.duplicated(keep="last")]
+
+    source = _clip_to_target(source, target_index[0], target_index[-1])
+
+    src_ts = to_epoch_ns(source.index)
+    tgt_ts = to_epoch_ns(target_index)
+
+    pos = np.searchsorted(src_ts, tgt_ts, side="right") - 1
+    valid = pos >= 0
+    if max_staleness is not None:
+        limit = pd.Timedelta(max_staleness).value
+        age = tgt_ts - src_ts[np.maximum(pos, 0)]
+        valid &= age <= limit
+    pos = np.where(valid, pos, 0)
+    all_valid = bool(valid.all())
+
+    out = {}
+    for col in source.columns:
+        values = source[col].to_numpy()
+        if len(values) == 0:
+            out[col] = np.full(len(tgt_ts), np.nan)
+            continue
+        taken = values.take(pos)
+        if not all_valid:
+            if taken.dtype.kind in "iub":
+                taken = taken.astype(float)
+            elif taken.dtype.kind != "f":
+                taken = taken.astype(object)
+            taken[~valid] = np.nan
+        out[col] = taken
+
+    return pd.DataFrame(out, index=target_index)
+
+
+def asof_join(base: pd.DataFrame, sources, staleness: dict | None = None) -> pd.DataFrame:
+    """
+    Több lassú forrás as-of illesztése a base indexére, majd oszlopos összefűzés.
+
+    sources:   {név: DataFrame}; üres vagy None forrást kihagyunk
+    staleness: {név: max_staleness}; hiányzó név = korlátlan
+    """
+    staleness = staleness or {}
+    parts = [base]
+    for name, df_src in sources.items():
+        if df_src is None or df_src.empty:
+            continue
+        parts.append(asof_align(df_src, base.index, staleness.get(name)))
+    if len(parts) == 1:
+        return base
+    return pd.concat(parts, axis=1)
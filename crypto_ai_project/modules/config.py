@@ -38,12 +38,21 @@ MARKET_FEATURES_CSV = PROCESSED_DIR / "market_data_features.csv"
 # Rövid távú összevont feature-k (market+onchain+macro+sentiment) – ha használod
 ALL_FEATURES_CSV = PROCESSED_DIR / "all_features.csv"
 
+# Esemény-katalógus (halving, crackdown, ETF, FOMC, ...) – esemény-ablak feature-ökhöz
+EVENTS_CSV = DATA_DIR / "events.csv"
+
 
 
 # Hosszú távú training sentiment store (napi aggregált)
 TRAINING_SENTIMENT_FEATURES_CSV = PROCESSED_DIR / "training_sentiment_features.csv"
+# inkrementális sentiment build állapota (napi hír-ujjlenyomatok, biztos pontok)
+TRAINING_SENTIMENT_META_JSON = PROCESSED_DIR / "training_sentiment_features.meta.json"
 
 TRAINING_FEATURES_CSV = PROCESSED_DIR / "training_features_1h.csv"
+# inkrementális build állapota (utolsó teljes build ideje, eldobott oszlopok)
+TRAINING_FEATURES_META_JSON = PROCESSED_DIR / "training_features_1h.meta.json"
+# ennyi naponta az inkrementális build helyett teljes újraépítés + konzisztencia-ellenőrzés
+TRAINING_FULL_REBUILD_DAYS = int(os.getenv("TRAINING_FULL_REBUILD_DAYS", "7"))
 BINANCE_MARKET_FULL_CSV = PROCESSED_DIR / "binance_market_1h.csv"
 
 MARKET_INTRADAY_1M_CSV = RUNTIME_DIR / "market_intraday_1m.csv"
@@ -56,10 +65,65 @@ SENTIMENT_DATA_CSV = PROCESSED_DIR / "sentiment_data.csv"
 # Rövid távú raw hírek: csak 30 nap, LLM + dashboard
 NEWS_DATA_CSV = RUNTIME_DIR / "news_data_30d.csv"
 
+# Per-cikk sentiment score cache (sqlite; kulcs: normalizált szöveg hash + scorer verzió)
+SENTIMENT_CACHE_DB = RUNTIME_DIR / "sentiment_cache.sqlite"
+
+# Feltételes GET validátorok (ETag / Last-Modified) URL-enként: RSS feedek, Blockchain.com charts
+HTTP_VALIDATORS_JSON = RUNTIME_DIR / "http_validators.json"
+
+# Batch-elt VADER pontozás: worker folyamatok (None = CPU-k száma), szöveg / chunk,
+# és a minimális szövegszám, ami fölött egyáltalán poolt indítunk
+SENTIMENT_WORKERS = int(os.getenv("SENTIMENT_WORKERS", "0")) or None
+SENTIMENT_CHUNK_SIZE = int(os.getenv("SENTIMENT_CHUNK_SIZE", "2000"))
+SENTIMENT_PARALLEL_MIN = int(os.getenv("SENTIMENT_PARALLEL_MIN", "5000"))
+
+# Sentiment scorer backend (sentiment_backends): "vader" vagy "onnx" (helyi CPU
+# transformer: model.onnx + tokenizer.json [+ labels.json] a model könyvtárban).
+# ONNX: max. token / szöveg, és a dinamikus kötegek token-kerete (köteg × leghosszabb)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "vader")
+SENTIMENT_ONNX_MODEL_DIR = Path(os.getenv("SENTIMENT_ONNX_MODEL_DIR", str(MODELS_DIR / "sentiment_onnx")))
+SENTIMENT_ONNX_MAX_TOKENS = int(os.getenv("SENTIMENT_ONNX_MAX_TOKENS", "128"))
+SENTIMENT_BATCH_TOKENS = int(os.getenv("SENTIMENT_BATCH_TOKENS", "8192"))
+
 # Modellfájlok
 LONGTERM_FEATURES_15D_CSV = PROCESSED_DIR / "longterm_features_15d.csv"
 FORECAST_MODEL_PATH = BASE_DIR / "models" / "forecast_model.keras"
 FORECAST_SCALER_PATH = MODELS_DIR / "forecast_scaler.pkl"
+# permutation importance alapján kiválasztott LSTM bemenet (main.py select_features)
+FORECAST_SELECTED_FEATURES_JSON = MODELS_DIR / "forecast_features.json"
+
+# ---------- Dtype policy ----------
+# feature-ök: float32 (a Keras úgyis float32-re castol), esemény-flagek és
+# darabszámok: kompakt egész típus, idő: int64 epoch (ns)
+FEATURE_FLOAT_DTYPE = os.getenv("FEATURE_FLOAT_DTYPE", "float32")
+FLAG_INT_DTYPE = os.getenv("FLAG_INT_DTYPE", "int8")
+COUNT_INT_DTYPE = os.getenv("COUNT_INT_DTYPE", "int32")
+TIME_EPOCH_DTYPE = "int64"
+
+# ---------- Lassú források as-of illesztése ----------
+# Forrásonként a legrégebbi még elfogadott megfigyelés kora (pl. "3D", "36h").
+# None -> korlátlan (az utolsó ismert érték öröklődik, mint a régi ffill-nél).
+ASOF_MAX_STALENESS = {
+    "onchain": None,
+    "macro": None,
+    "sentiment": None,
+    # a hír store csak az utolsó 30 napot fedi: az ablakon kívüli órákra ne
+    # öröklődjön (ffill / bfill) a stream ill. a per-eszköz napi érték.
+    # A sentiment_stream korlátja a SENTIMENT_BUCKET-ből jön (egy bucket + 1 óra,
+    # sentiment_stream.stream_max_staleness), ezért itt nem szerepel.
+    "asset_sentiment": "2D",
+    "cross_asset": None,
+}
+
+# ---------- Cross-asset korreláció / béta ----------
+# oszlop -> "return" (loghozam a megfigyelések között) vagy "level" (szint, pl. sentiment)
+CROSS_ASSET_FACTORS = {
+    "sp500_close": "return",
+    "dxy_close": "return",
+    "hash-rate": "return",
+    "news_sentiment": "level",
+}
+CROSS_ASSET_WINDOWS_DAYS = (30, 90, 180)
 
 # ---------- Crypto beállítások ----------
 
@@ -67,6 +131,27 @@ SYMBOL = "BTCUSDT"
 INTERVAL = "1h"
 LOOKBACK = 60  # LSTM ablak
 
+# Az LSTM bemeneti feature-jei név szerint (feature_registry / training CSV oszlopok).
+# None -> a kiválasztott lista (FORECAST_SELECTED_FEATURES_JSON), ha van,
+# különben a training_features_1h.csv összes oszlopa (close és target nélkül).
+FORECAST_FEATURES = None
+
+# Opcionális PCA tömörítés a skálázás után (IncrementalPCA a tanító szakaszon):
+# komponensek száma, 0 = kikapcsolva; whitening: egységnyi varianciájú komponensek
+FORECAST_PCA_COMPONENTS = int(os.getenv("FORECAST_PCA_COMPONENTS", "0"))
+FORECAST_PCA_WHITEN = os.getenv("FORECAST_PCA_WHITEN", "0") == "1"
+
+# Streaming tanítás (train_model(streaming=True)): ennyi sor egy CSV chunk
+TRAINING_CHUNK_ROWS = int(os.getenv("TRAINING_CHUNK_ROWS", "100000"))
+
+# Permutation importance: ismétlések feature-önként, worker folyamatok (None = CPU-k száma)
+FEATURE_SELECTION_REPEATS = int(os.getenv("FEATURE_SELECTION_REPEATS", "3"))
+FEATURE_SELECTION_WORKERS = int(os.getenv("FEATURE_SELECTION_WORKERS", "0")) or None
+
+# Az advisor által használt market indikátorok (ha a modell bemenetében nincsenek
+# benne, a feature registry számolja ki őket a market adatból)
+ADVISOR_FEATURES = ["rsi_14", "atr_14", "ret_std_30", "ma_21", "ma_50", "vwap", "vol_change"]
+
 BINANCE_BASE_URL = "https://api.binance.com"
 FEAR_GREED_API_URL = "https://api.alternative.me/fng/"
 
@@ -82,6 +167,52 @@ COINTELEGRAPH_TAG_URLS = [
     "https://cointelegraph.com/tags/bitcoin",
 ]
 
+# Hírforrások az update_news_store-hoz; mind párhuzamosan töltődik le, így
+# egy új forrás nem növeli a futásidőt (csak a leglassabb számít).
+#   kind:    "rss" (feedparser) vagy "cointelegraph" (tag oldal HTML)
+#   source:  a news store "source" oszlopa
+#   timeout: opcionális, forrásonkénti felülírás (mp)
+NEWS_SOURCES = [
+    {"kind": "rss", "source": "coindesk", "url": COINDESK_RSS_URL},
+    {"kind": "rss", "source": "reddit_CryptoCurrency", "url": REDDIT_CRYPTO_RSS_URL},
+] + [{"kind": "cointelegraph", "source": "cointelegraph", "url": url} for url in COINTELEGRAPH_TAG_URLS]
+NEWS_FETCH_TIMEOUT_SEC = float(os.getenv("NEWS_FETCH_TIMEOUT_SEC", "10"))
+NEWS_RSS_LIMIT = 100
+NEWS_USER_AGENT = "crypto_ai_project/1.0 (news fetcher)"
+
+# Közel-duplikált hírek (MinHash + LSH, cím + összefoglaló szó-shingle-ök):
+# shingle méret (szó), MinHash permutációk, LSH sávok (permutációk / sáv = sorok),
+# és a becsült Jaccard küszöb, ami fölött két cikk ugyanaz a sztori
+NEWS_SHINGLE_SIZE = 3
+NEWS_MINHASH_PERM = 128
+NEWS_LSH_BANDS = 32
+NEWS_DEDUP_THRESHOLD = float(os.getenv("NEWS_DEDUP_THRESHOLD", "0.6"))
+# a hír store cikkeinek MinHash szignatúrái + LSH sávjai (sqlite), hogy
+# frissítéskor csak az új cikkeket kelljen hash-elni
+NEWS_LSH_DB = RUNTIME_DIR / "news_lsh.sqlite"
+
+# Streaming (órás) sentiment aggregálás: bucket méret (pandas offset, pl. "1h",
+# "15min", "4h"), bucketenkénti futó állapot (darab / átlag / M2 / bull / bear),
+# a már beszámolt klaszterek, és a lecsengő "news pressure" felezési idői (óra)
+SENTIMENT_BUCKET = os.getenv("SENTIMENT_BUCKET", "1h")
+SENTIMENT_STREAM_CSV = PROCESSED_DIR / "sentiment_stream.csv"
+SENTIMENT_STREAM_META_JSON = PROCESSED_DIR / "sentiment_stream.meta.json"
+SENTIMENT_PRESSURE_HALFLIVES_H = (6, 24)
+
+# Entitás-tagelés (entity_tagger, Aho-Corasick): eszköz -> ticker / alias lista
+# (kis-/nagybetű független, csak teljes szóra illeszt); a cikkenkénti eszközök
+# alapján napi per-eszköz sentiment store
+ASSET_ALIASES = {
+    "BTC": ["btc", "xbt", "bitcoin", "bitcoins", "$btc"],
+    "ETH": ["eth", "ether", "ethereum", "$eth"],
+    "SOL": ["sol", "solana", "$sol"],
+    "XRP": ["xrp", "ripple", "$xrp"],
+    "BNB": ["bnb", "binance coin", "$bnb"],
+    "DOGE": ["doge", "dogecoin", "$doge"],
+    "ADA": ["cardano", "$ada"],
+}
+ASSET_SENTIMENT_CSV = PROCESSED_DIR / "asset_sentiment_daily.csv"
+
 # Makró tickerek (pl. S&P 500, DXY)
 YF_TICKERS = [
     "^GSPC",      # S&P 500
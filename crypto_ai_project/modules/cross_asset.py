@@ -0,0 +1,207 @@
+# modules/cross_asset.py
+"""
+Gördülő cross-asset korreláció és béta (BTC vs. S&P500, DXY, hash-rate, sentiment).
+
+A gördülő statisztikák futó összegekből jönnek: páronként n, Σx, Σy, Σx², Σy², Σxy.
+Az összes pár összes összegét egyetlen mátrixba rakjuk, és egy rolling().sum()
+hívással számoljuk (a pandas C implementációja lépésenként O(1), Kahan-kompenzált
+hozzáadás / kivonás), így sok sorozat és több ablak is olcsó marad.
+
+Numerikus stabilitás:
+- minden oszlopot a saját (teljes mintás) átlagával centrálunk, így a
+  Σxy - ΣxΣy/n kivonásnál nincs nagy számok különbsége
+- ahol az ablakban a szórás gyakorlatilag 0 (pl. konstans sentiment), NaN-t adunk
+
+A makró / on-chain források napi felbontásúak, ezért a feature-ök is napi
+hozamokon készülnek; a BTC hozamot mindig ugyanarra az intervallumra
+számoljuk, mint a másik sorozatét (pl. tőzsdei napok között péntek -> hétfő).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import CROSS_ASSET_FACTORS, CROSS_ASSET_WINDOWS_DAYS
+
+
+def _feature_name(col: str) -> str:
+    return col.replace("-", "_")
+
+
+def _min_periods(window: int) -> int:
+    # tőzsdei sorozatnál ~21 megfigyelés jut 30 naptári napra
+    return max(10, window // 3)
+
+
+def rolling_pair_stats(x, y, window: int, min_periods: int | None = None, max_chunk_cells: int = 8_000_000):
+    """
+    Gördülő korreláció és béta oszlop-páronként.
+
+    x, y: (n, k) tömbök; az i. pár (x[:, i], y[:, i]). NaN = hiányzó megfigyelés,
+          a pár csak ott számít, ahol mindkét érték megvan.
+    max_chunk_cells: egyszerre ennyi futó-összeg cellát tartunk memóriában
+          (sok pár esetén a párokat blokkokban dolgozzuk fel)
+    Vissza: (corr, beta), mindkettő (n, k); beta = cov(x, y) / var(y).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+        y = y[:, None]
+    if min_periods is None:
+        min_periods = window
+    min_periods = max(2, min_periods)
+
+    n_rows, k = x.shape
+    corr = np.empty((n_rows, k))
+    beta = np.empty((n_rows, k))
+    step = max(1, max_chunk_cells // max(1, 6 * n_rows))
+    for start in range(0, k, step):
+        stop = min(start + step, k)
+        corr[:, start:stop], beta[:, start:stop] = _pair_stats_block(
+            x[:, start:stop], y[:, start:stop], window, min_periods
+        )
+    return corr, beta
+
+
+def _pair_stats_block(x, y, window: int, min_periods: int):
+    valid = np.isfinite(x) & np.isfinite(y)
+    count = valid.sum(axis=0)
+    safe = np.maximum(count, 1)
+    mean_x = np.where(valid, x, 0.0).sum(axis=0) / safe
+    mean_y = np.where(valid, y, 0.0).sum(axis=0) / safe
+
+    xc = np.where(valid, x - mean_x, 0.0)
+    yc = np.where(valid, y - mean_y, 0.0)
+    k = x.shape[1]
+
+    stacked = np.hstack([valid.astype(float), xc, yc, xc * xc, yc * yc, xc * yc])
+    sums = pd.DataFrame(stacked).rolling(window, min_periods=1).sum().to_numpy()
+    n, sx, sy, sxx, syy, sxy = (sums[:, i * k:(i + 1) * k] for i in range(6))
+
+    # a teljes mintás varianciához mért tűrés: ez alatt a szórás "0"
+    tol_x = 1e-10 * (xc * xc).sum(axis=0) / safe
+    tol_y = 1e-10 * (yc * yc).sum(axis=0) / safe
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        ok = (n >= min_periods) & (var_x > n * tol_x) & (var_y > n * tol_y)
+        corr = np.where(ok, cov / np.sqrt(var_x * var_y), np.nan)
+        beta = np.where(ok, cov / var_y, np.nan)
+
+    return np.clip(corr, -1.0, 1.0), beta
+
+
+def rolling_corr_matrix(df: pd.DataFrame, window: int, min_periods: int | None = None) -> pd.DataFrame:
+    """
+    Az összes oszloppár gördülő korrelációja ("a|b" oszlopnevekkel).
+    k sorozatnál k*(k-1)/2 pár, egyetlen futó-összeg menettel.
+    """
+    cols = list(df.columns)
+    ii, jj = np.triu_indices(len(cols), k=1)
+    values = df.to_numpy(dtype=float)
+    corr, _ = rolling_pair_stats(values[:, ii], values[:, jj], window, min_periods)
+    names = [f"{cols[i]}|{cols[j]}" for i, j in zip(ii, jj)]
+    return pd.DataFrame(corr, index=df.index, columns=names)
+
+
+def _daily_last(series: pd.Series) -> pd.Series:
+    s = series.dropna()
+    s = s.groupby(s.index.floor("D")).last()
+    return s
+
+
+def _pair_inputs(btc_close_daily: pd.Series, factor: pd.Series, kind: str):
+    """
+    Egy faktor (x = BTC, y = faktor) pár a napi rácson.
+
+    kind="return": a faktor saját megfigyelési napjai közötti loghozam, és a BTC
+                   loghozama ugyanazon napok között
+    kind="level":  a faktor szintje (pl. sentiment) és az aznapi BTC loghozam
+    """
+    grid = btc_close_daily.index
+    log_btc = np.log(btc_close_daily)
+    f = _daily_last(factor)
+    f = f[(f.index >= grid[0]) & (f.index <= grid[-1])]
+
+    if f.empty:
+        empty = pd.Series(np.nan, index=grid)
+        return empty, empty.copy()
+
+    pos = grid.searchsorted(f.index, side="right") - 1
+    btc_at = pd.Series(log_btc.to_numpy()[pos], index=f.index)
+
+    if kind == "level":
+        x_obs = log_btc.diff().reindex(f.index)
+        y_obs = f
+    else:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_f = np.log(f.where(f > 0))
+        x_obs = btc_at.diff()
+        y_obs = log_f.diff()
+
+    x = pd.Series(x_obs.to_numpy(), index=f.index).reindex(grid)
+    y = pd.Series(y_obs.to_numpy(), index=f.index).reindex(grid)
+    return x, y
+
+
+def build_cross_asset_daily(
+    btc_close: pd.Series,
+    sources: pd.DataFrame,
+    factors: dict | None = None,
+    windows=None,
+) -> pd.DataFrame:
+    """
+    Napi cross-asset feature-ök: corr_btc_{faktor}_{w}d és beta_btc_{faktor}_{w}d.
+
+    btc_close: BTC záróár (bármilyen felbontás, napi utolsó értéket használunk)
+    sources:   a faktor oszlopokat tartalmazó DataFrame (pl. makró + on-chain + sentiment)
+    factors:   {oszlop: "return" | "level"} (alapból config.CROSS_ASSET_FACTORS)
+    windows:   ablakok napban (alapból config.CROSS_ASSET_WINDOWS_DAYS)
+
+    Az index a nap VÉGE (a napi záró csak ekkor ismert), hogy az órás
+    store-ba as-of illesztve ne legyen előrelátás.
+    """
+    factors = CROSS_ASSET_FACTORS if factors is None else factors
+    windows = CROSS_ASSET_WINDOWS_DAYS if windows is None else windows
+
+    btc_daily = _daily_last(btc_close)
+    btc_daily = btc_daily[btc_daily > 0]
+    if btc_daily.empty:
+        return pd.DataFrame()
+
+    names, xs, ys = [], [], []
+    for col, kind in factors.items():
+        if col not in sources.columns:
+            continue
+        x, y = _pair_inputs(btc_daily, sources[col], kind)
+        names.append(_feature_name(col))
+        xs.append(x.to_numpy())
+        ys.append(y.to_numpy())
+
+    if not names:
+        return pd.DataFrame(index=btc_daily.index)
+
+    x = np.column_stack(xs)
+    y = np.column_stack(ys)
+    out = {}
+    for w in windows:
+        corr, beta = rolling_pair_stats(x, y, w, _min_periods(w))
+        for i, name in enumerate(names):
+            out[f"corr_btc_{name}_{w}d"] = corr[:, i]
+            out[f"beta_btc_{name}_{w}d"] = beta[:, i]
+
+    df = pd.DataFrame(out, index=btc_daily.index + pd.Timedelta(days=1))
+    df.index.name = "timestamp"
+    return df
+
+
+def cross_asset_columns(window: int, factors: dict | None = None) -> list:
+    """Egy ablak corr / beta oszlopnevei (pl. a dashboardhoz)."""
+    factors = CROSS_ASSET_FACTORS if factors is None else factors
+    cols = []
+    for col in factors:
+        name = _feature_name(col)
+        cols += [f"corr_btc_{name}_{window}d", f"beta_btc_{name}_{window}d"]
+    return cols
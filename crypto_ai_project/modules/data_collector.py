@@ -20,6 +20,9 @@ from .config import (
     MARKET_INTRADAY_1M_CSV,
 )
 
+from .data_loader import load_timeseries
+from .http_cache import conditional_get, not_modified, remember_validators
+
 DATA_DIR.mkdir(exist_ok=True, parents=True)
 
 
@@ -56,37 +59,6 @@ def fetch_binance_klines(symbol=SYMBOL, interval=INTERVAL, limit=1000,
     return df[["open", "high", "low", "close", "volume"]]
 
 
-def fetch_blockchain_chart(chart_name: str, timespan: str = "all", rolling_average: str | None = None) -> pd.DataFrame:
-    """
-    Blockchain.com charts API:
-      pl. https://api.blockchain.info/charts/n-transactions?timespan=all&format=json&sampled=false
-    Visszaad egy DataFrame-et: index = timestamp (UTC), value oszlop.
-    """
-    url = f"https://api.blockchain.info/charts/{chart_name}"
-    params = {
-        "timespan": timespan,
-        "format": "json",
-        "sampled": "false",
-    }
-    if rolling_average:
-        params["rollingAverage"] = rolling_average
-
-    r = requests.get(url, params=params, timeout=20)
-    r.raise_for_status()
-    data = r.json()
-
-    values = data.get("values", [])
-    if not values:
-        return pd.DataFrame()
-
-    df = pd.DataFrame(values)
-    # x = unix timestamp, y = value
-    df["timestamp"] = pd.to_datetime(df["x"], unit="s", utc=True)
-    df = df.set_index("timestamp").sort_index()
-    df = df.rename(columns={"y": "value"})
-    return df[["value"]]
-
-
 def update_market_data_csv(symbol=SYMBOL, interval=INTERVAL) -> pd.DataFrame:
     """
     market_data.csv frissítése: ha létezik, az utolsó időponttól felfelé tölt.
@@ -185,24 +157,31 @@ def fetch_blockchair_stats() -> pd.DataFrame:
     return df
 
 
-def fetch_blockchain_chart(chart_name: str, timespan: str = "1month") -> pd.DataFrame:
+def fetch_blockchain_chart(chart_name: str, timespan: str = "1month", use_validators: bool = False):
     """
     Blockchain.com Charts API – pl. n-transactions, hash-rate, n-unique-addresses. :contentReference[oaicite:5]{index=5}
+
+    use_validators=True: feltételes GET a mentett ETag / Last-Modified alapján;
+    ha a chart nem változott (304), None-t adunk vissza (nincs parse). A
+    validátort a hívó menti (remember_validators), ha az adatot eltárolta.
+    Vissza: (DataFrame | None, response)
     """
     url = f"{BLOCKCHAIN_CHARTS_BASE}/{chart_name}"
     params = {"timespan": timespan, "format": "json"}
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
+    r = conditional_get(url, params=params, timeout=10, use_validators=use_validators)
+    if not_modified(r):
+        return None, r
+
     data = r.json()
     values = data.get("values", [])
     if not values:
-        return pd.DataFrame()
+        return pd.DataFrame(), r
 
     df = pd.DataFrame(values)
     df["timestamp"] = pd.to_datetime(df["x"], unit="s", utc=True)
     df = df.set_index("timestamp")
     df[chart_name] = df["y"].astype(float)
-    return df[[chart_name]]
+    return df[[chart_name]], r
 
 
 def update_onchain_data() -> pd.DataFrame:
@@ -229,15 +208,32 @@ def update_onchain_data() -> pd.DataFrame:
         "miners_revenue": "miners-revenue",
     }
 
+    # a helyi CSV-ben meglévő chartokra feltételes GET: ami nem változott (304),
+    # azt nem parse-oljuk, hanem a meglévő oszlopot használjuk
+    df_existing = load_timeseries(ONCHAIN_DATA_CSV)
+
     dfs = []
+    responses = []
+    changed = False
     for col_name, chart_name in mapping.items():
         print(f"  - {col_name} ({chart_name})...")
-        df_chart = fetch_blockchain_chart(chart_name, timespan="all")
+        have_local = chart_name in df_existing.columns
+        df_chart, r = fetch_blockchain_chart(chart_name, timespan="all", use_validators=have_local)
+        if df_chart is None:
+            print("    Nem változott (304), a meglévő adatot használjuk.")
+            dfs.append(df_existing[[chart_name]].dropna())
+            continue
         if df_chart.empty:
             print(f"    Figyelem: {chart_name} üres adatot adott vissza.")
             continue
         df_chart = df_chart.rename(columns={"value": col_name})
         dfs.append(df_chart)
+        responses.append(r)
+        changed = True
+
+    if not changed and not df_existing.empty:
+        print("Egyik on-chain chart sem változott, a CSV-t nem írjuk újra.")
+        return df_existing
 
     if not dfs:
         print("Nem sikerült on-chain adatot lekérni, üres DataFrame-et adunk vissza.")
@@ -256,6 +252,10 @@ def update_onchain_data() -> pd.DataFrame:
     print(f"On-chain shape (full history): {df_onchain.shape}")
     print(f"On-chain mentve ide: {ONCHAIN_DATA_CSV}")
 
+    # a validátorok csak a sikeres mentés után kerülnek eltárolásra
+    for r in responses:
+        remember_validators(r)
+
     return df_onchain
 
 
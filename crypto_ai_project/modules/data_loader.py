@@ -0,0 +1,166 @@
+# modules/data_loader.py
+"""
+Közös idősor-loader a CSV store-okhoz.
+
+Minden store ugyanazt a timestamp formátumot írja ("2025-10-22 00:00:00+00:00"),
+ezért explicit formátummal parse-olunk, formátum-kitalálás nélkül; ha egy fájl
+ettől eltér (pl. tört másodperc, naiv időpont), ISO8601 fallback.
+
+- columns: csak a kért oszlopokat olvassuk be (usecols)
+- start / end: időtartomány (zárt intervallum) a rendezett indexen
+- folyamat-szintű cache (path, mtime, méret, oszlopok) kulccsal: a fájl
+  változásakor automatikusan újraolvasunk; a hívó mindig másolatot kap,
+  így a cache-elt példányt nem tudja elrontani
+"""
+
+import os
+from pathlib import Path
+
+import pandas as pd
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S%z"
+NAIVE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+UTC_SUFFIX = "+00:00"
+CACHE_MAX_ENTRIES = 32
+
+_CACHE = {}
+
+
+def parse_timestamps(values) -> pd.DatetimeIndex:
+    """
+    Timestamp stringek -> UTC DatetimeIndex (hibás érték: NaT).
+
+    Ha minden érték "+00:00"-ra végződik (ezt írják a store-ok), az offsetet
+    levágjuk és naiv formátummal parse-olunk, majd UTC-re lokalizálunk:
+    ez kb. kétszer gyorsabb, mint a %z-s parse.
+    """
+    raw = pd.Series(values, dtype=object)
+    ts = None
+    if len(raw) and raw.notna().all() and raw.str.endswith(UTC_SUFFIX).all():
+        naive = raw.str.slice(0, -len(UTC_SUFFIX))
+        ts = pd.to_datetime(naive, format=NAIVE_TIMESTAMP_FORMAT, errors="coerce").dt.tz_localize("UTC")
+    if ts is None or ts.isna().any():
+        ts = pd.to_datetime(raw, format=TIMESTAMP_FORMAT, utc=True, errors="coerce")
+    if (ts.isna() & raw.notna()).any():
+        ts = pd.to_datetime(raw, format="ISO8601", utc=True, errors="coerce")
+    return pd.DatetimeIndex(ts)
+
+
+def _to_utc(ts):
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _read(path: Path, columns, index_col: str, dtype) -> pd.DataFrame:
+    header = list(pd.read_csv(path, nrows=0).columns)
+    if index_col not in header:
+        print(f"{path} nem tartalmaz '{index_col}' oszlopot, üres DataFrame-et adunk vissza.")
+        return pd.DataFrame()
+
+    if columns is None:
+        usecols = header
+    else:
+        usecols = [index_col] + [c for c in columns if c in header and c != index_col]
+
+    dtype = {c: t for c, t in (dtype or {}).items() if c in usecols}
+    dtype[index_col] = str
+    df = pd.read_csv(path, usecols=usecols, dtype=dtype)
+
+    index = parse_timestamps(df[index_col])
+    df = df.drop(columns=[index_col])
+    df.index = index.rename(index_col)
+    df = df[df.index.notna()]
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    return df
+
+
+def load_timeseries(
+    path,
+    columns=None,
+    start=None,
+    end=None,
+    index_col: str = "timestamp",
+    dtype: dict | None = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """
+    Timestamp-indexelt (tz-aware, UTC, rendezett) DataFrame egy CSV store-ból.
+
+    path:    CSV elérési út
+    columns: beolvasandó oszlopok (None = mind); a nem létezőket kihagyjuk
+    start:   alsó időkorlát (naiv időpont UTC-nek számít), None = nincs
+    end:     felső időkorlát, None = nincs
+    dtype:   read_csv dtype megadás oszloponként (pl. dtypes.read_dtypes)
+
+    Hiányzó fájl / timestamp oszlop esetén üres DataFrame.
+    """
+    path = Path(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+    key = (
+        str(path.resolve()),
+        stat.st_mtime_ns,
+        stat.st_size,
+        tuple(columns) if columns is not None else None,
+        index_col,
+        tuple(sorted((dtype or {}).items())),
+    )
+
+    df = _CACHE.get(key) if use_cache else None
+    if df is None:
+        df = _read(path, columns, index_col, dtype)
+        if use_cache:
+            # ugyanahhoz a fájlhoz tartozó régi (elavult mtime-ú) bejegyzések törlése
+            for old in [k for k in _CACHE if k[0] == key[0] and k[1:3] != key[1:3]]:
+                del _CACHE[old]
+            while len(_CACHE) >= CACHE_MAX_ENTRIES:
+                del _CACHE[next(iter(_CACHE))]
+            _CACHE[key] = df
+
+    if df.empty:
+        return df.copy()
+
+    lo = 0 if start is None else df.index.searchsorted(_to_utc(start), side="left")
+    hi = len(df) if end is None else df.index.searchsorted(_to_utc(end), side="right")
+    return df.iloc[lo:hi].copy()
+
+
+def iter_timeseries_chunks(
+    path,
+    columns=None,
+    chunksize: int = 100_000,
+    index_col: str = "timestamp",
+    dtype: dict | None = None,
+):
+    """
+    A CSV store darabolt olvasása (a load_timeseries-szel azonos parse), a fájl
+    sorrendjében, cache nélkül: egyszerre csak egy chunk van a memóriában.
+    Hiányzó fájl / timestamp oszlop esetén nem ad vissza semmit.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    header = list(pd.read_csv(path, nrows=0).columns)
+    if index_col not in header:
+        print(f"{path} nem tartalmaz '{index_col}' oszlopot.")
+        return
+
+    usecols = header if columns is None else [index_col] + [c for c in columns if c in header and c != index_col]
+    dtype = {c: t for c, t in (dtype or {}).items() if c in usecols}
+    dtype[index_col] = str
+
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtype, chunksize=chunksize):
+        index = parse_timestamps(chunk[index_col])
+        chunk = chunk.drop(columns=[index_col])
+        chunk.index = index.rename(index_col)
+        yield chunk[chunk.index.notna()]
+
+
+def clear_cache():
+    _CACHE.clear()
@@ -0,0 +1,87 @@
+# modules/dtypes.py
+"""
+Dtype policy a feature- és training pipeline-hoz.
+
+- feature oszlopok: FEATURE_FLOAT_DTYPE (alapból float32)
+- esemény-flagek (pl. *_window, supertrend_dir): FLAG_INT_DTYPE (int8)
+- darabszámok (*_count): COUNT_INT_DTYPE (int32)
+- idő: DatetimeIndex marad, numerikus műveletekhez int64 epoch (ns)
+
+Az ár oszlop(ok)at (FLOAT64_COLUMNS) float64-en hagyjuk, mert ezekből
+log-return target és visszaszámolt ár készül, ott a float32 pontatlansága
+már látszana.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    FEATURE_FLOAT_DTYPE,
+    FLAG_INT_DTYPE,
+    COUNT_INT_DTYPE,
+    TIME_EPOCH_DTYPE,
+)
+
+FLAG_SUFFIXES = ("_window",)
+FLAG_COLUMNS = {"supertrend_dir"}
+COUNT_SUFFIXES = ("_count",)
+FLOAT64_COLUMNS = {"close"}
+
+
+def _is_flag(col: str) -> bool:
+    return col in FLAG_COLUMNS or col.endswith(FLAG_SUFFIXES)
+
+
+def _is_count(col: str) -> bool:
+    return col.endswith(COUNT_SUFFIXES)
+
+
+def column_dtype(col: str) -> str:
+    """A policy szerinti cél-dtype egy oszlopnévhez."""
+    if col in FLOAT64_COLUMNS:
+        return "float64"
+    if _is_flag(col):
+        return FLAG_INT_DTYPE
+    if _is_count(col):
+        return COUNT_INT_DTYPE
+    return FEATURE_FLOAT_DTYPE
+
+
+def read_dtypes(columns, index_col: str = "timestamp") -> dict:
+    """
+    read_csv(dtype=...) számára: minden oszlop float a policy szerint.
+    Az egész típusokat csak beolvasás után (apply_dtype_policy) kényszerítjük,
+    mert a CSV-ben lehet NaN, amit egész dtype nem tud tárolni.
+    """
+    out = {}
+    for col in columns:
+        if col == index_col:
+            continue
+        target = column_dtype(col)
+        out[col] = "float64" if target == "float64" else FEATURE_FLOAT_DTYPE
+    return out
+
+
+def apply_dtype_policy(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    A numerikus oszlopok átcastolása a policy szerint.
+    Egész cél-dtype-ot csak akkor használunk, ha az oszlopban nincs NaN,
+    különben az oszlop a float feature dtype-on marad.
+    """
+    casts = {}
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]):
+            continue
+        target = column_dtype(col)
+        if target in (FLAG_INT_DTYPE, COUNT_INT_DTYPE) and df[col].isna().any():
+            target = FEATURE_FLOAT_DTYPE
+        if df[col].dtype != np.dtype(target):
+            casts[col] = target
+    if not casts:
+        return df
+    return df.astype(casts)
+
+
+def to_epoch_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """DatetimeIndex -> int64 epoch nanoszekundum (tz-aware indexnél UTC)."""
+    return index.as_unit("ns").asi8.astype(TIME_EPOCH_DTYPE, copy=False)
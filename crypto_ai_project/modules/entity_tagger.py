@@ -0,0 +1,116 @@
+# modules/entity_tagger.py
+"""
+Eszköz-említések (BTC, ETH, ...) felismerése a hírekben Aho-Corasick automatával.
+
+A ticker / alias szótárból (config.ASSET_ALIASES) egyszer építünk egy
+automatát (trie + failure linkek + kimeneti listák), utána minden cikk
+szövegén egyetlen lineáris menet megy végig: a futásidő a szöveg hosszával
+arányos, a szótár méretétől (aliasok száma) nem függ.
+
+Illesztés: kisbetűsítve, és csak teljes szóra (az egyezés előtti és utáni
+karakter nem betű / szám / "_"), így pl. az "eth" nem talál a "method"-ban,
+a "sol" nem a "solid"-ban.
+
+Kimenet cikkenként: a talált eszközök rendezett, "|"-lel összefűzött listája
+(pl. "BTC|ETH"), üres string, ha nincs találat (CSV-barát).
+"""
+
+from collections import deque
+
+import pandas as pd
+
+from .config import ASSET_ALIASES
+
+ASSET_SEPARATOR = "|"
+
+# az ASSET_ALIASES-ből épített automata (folyamatonként egyszer)
+_AUTOMATON = {}
+
+
+def build_automaton(aliases: dict = ASSET_ALIASES) -> dict:
+    """
+    Aho-Corasick automata: {"goto": [{karakter: állapot}], "fail": [állapot],
+    "out": [[(eszköz, alias hossz)]]}. Az eszköz neve maga is alias.
+    """
+    goto, fail, out = [{}], [0], [[]]
+    for asset, names in aliases.items():
+        for alias in {asset, *names}:
+            key = alias.lower()
+            node = 0
+            for ch in key:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                node = nxt
+            if (asset, len(key)) not in out[node]:
+                out[node].append((asset, len(key)))
+
+    # failure linkek szélességi bejárással; a kimenet örökli a fail állapotét
+    queue = deque(goto[0].values())
+    while queue:
+        node = queue.popleft()
+        for ch, nxt in goto[node].items():
+            queue.append(nxt)
+            f = fail[node]
+            while f and ch not in goto[f]:
+                f = fail[f]
+            target = goto[f].get(ch, 0)
+            fail[nxt] = target if target != nxt else 0
+            out[nxt] = out[nxt] + out[fail[nxt]]
+
+    return {"goto": goto, "fail": fail, "out": out}
+
+
+def default_automaton() -> dict:
+    if "default" not in _AUTOMATON:
+        _AUTOMATON["default"] = build_automaton(ASSET_ALIASES)
+    return _AUTOMATON["default"]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def find_assets(text, automaton: dict | None = None) -> set:
+    """A szövegben (teljes szóként) említett eszközök halmaza, egyetlen menetben."""
+    automaton = automaton or default_automaton()
+    goto, fail, out = automaton["goto"], automaton["fail"], automaton["out"]
+    text = str(text).lower()
+    n = len(text)
+    found = set()
+    node = 0
+    for i, ch in enumerate(text):
+        while node and ch not in goto[node]:
+            node = fail[node]
+        node = goto[node].get(ch, 0)
+        for asset, length in out[node]:
+            if asset in found:
+                continue
+            start = i - length + 1
+            if (start == 0 or not _is_word_char(text[start - 1])) and (i + 1 == n or not _is_word_char(text[i + 1])):
+                found.add(asset)
+    return found
+
+
+def tag_assets(df_news: pd.DataFrame, automaton: dict | None = None) -> pd.Series:
+    """Cikkenként a cím + összefoglaló alapján talált eszközök ("BTC|ETH", ill. "")."""
+    automaton = automaton or default_automaton()
+    parts = [df_news[c].where(df_news[c].notna(), "").astype(str) for c in ("title", "summary") if c in df_news.columns]
+    if not parts:
+        return pd.Series("", index=df_news.index, dtype=object)
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + " " + part
+    tags = [ASSET_SEPARATOR.join(sorted(find_assets(t, automaton))) for t in text]
+    return pd.Series(tags, index=df_news.index, dtype=object)
+
+
+def explode_assets(df: pd.DataFrame, column: str = "assets") -> pd.DataFrame:
+    """Cikk × eszköz sorok ("asset" oszloppal); az eszköz nélküli cikkek kimaradnak."""
+    tags = df[column].where(df[column].notna(), "").astype(str)
+    out = df.assign(asset=tags.str.split(ASSET_SEPARATOR)).explode("asset")
+    return out[out["asset"] != ""]
@@ -1,139 +1,119 @@
 # modules/event_features.py
-from datetime import datetime, timedelta, timezone
+"""
+Esemény-jellegű feature-ök az esemény-katalógusból (EVENTS_CSV).
+
+Minden esemény egy [dátum - window_before_days, dátum + window_after_days]
+intervallum. Az intervallumhatárokat searchsorted-del tesszük a rendezett
+időindexre, a kategória-flageket és az összhatást pedig különbség-tömbből
+(határonként +1 / -1, majd cumsum) kapjuk: O(sorok + események), akárhány
+esemény és kategória van a katalógusban.
+"""
+
+import numpy as np
 import pandas as pd
 
+from .config import EVENTS_CSV
+from .data_loader import parse_timestamps
+from .dtypes import apply_dtype_policy, to_epoch_ns
+
+_NS_PER_DAY = 86_400 * 10**9
+
 
-def _dt(y, m, d):
-    return datetime(y, m, d, tzinfo=timezone.utc)
-
-
-# Események definíciója
-EVENTS = [
-    # Halvingek (széles hatásablakkal, pl. ±90 nap)
-    {
-        "name": "halving_2012",
-        "category": "halving",
-        "date": _dt(2012, 11, 28),
-        "window_before_days": 90,
-        "window_after_days": 90,
-        "impact": +1,
-    },
-    {
-        "name": "halving_2016",
-        "category": "halving",
-        "date": _dt(2016, 7, 9),
-        "window_before_days": 90,
-        "window_after_days": 90,
-        "impact": +1,
-    },
-    {
-        "name": "halving_2020",
-        "category": "halving",
-        "date": _dt(2020, 5, 11),
-        "window_before_days": 90,
-        "window_after_days": 90,
-        "impact": +1,
-    },
-    {
-        "name": "halving_2024",
-        "category": "halving",
-        "date": _dt(2024, 4, 20),
-        "window_before_days": 90,
-        "window_after_days": 90,
-        "impact": +1,
-    },
-
-    # COVID crash – rövidebb, intenzív időszak (pl. ±14 nap)
-    {
-        "name": "covid_crash_2020",
-        "category": "covid_crash",
-        "date": _dt(2020, 3, 12),
-        "window_before_days": 14,
-        "window_after_days": 14,
-        "impact": -1,
-    },
-
-    # China crackdowns
-    {
-        "name": "china_exchanges_shutdown_2017",
-        "category": "china_crackdown",
-        "date": _dt(2017, 9, 15),  # kb. 2017 szeptember közepe
-        "window_before_days": 14,
-        "window_after_days": 30,
-        "impact": -1,
-    },
-    {
-        "name": "china_full_ban_2021",
-        "category": "china_crackdown",
-        "date": _dt(2021, 9, 24),
-        "window_before_days": 14,
-        "window_after_days": 30,
-        "impact": -1,
-    },
-
-    # ETF események
-    {
-        "name": "futures_etf_2021",
-        "category": "etf",
-        "date": _dt(2021, 10, 19),
-        "window_before_days": 7,
-        "window_after_days": 30,
-        "impact": +1,
-    },
-    {
-        "name": "spot_etf_approval_2024",
-        "category": "etf",
-        "date": _dt(2024, 1, 10),
-        "window_before_days": 7,
-        "window_after_days": 60,
-        "impact": +1,
-    },
-]
-
-
-def build_event_features(index: pd.DatetimeIndex) -> pd.DataFrame:
+def load_events(path=EVENTS_CSV) -> pd.DataFrame:
+    """
+    Az esemény-katalógus (timestamp index, name, category,
+    window_before_days, window_after_days, impact), a fájl sorrendjében:
+    a kategória-oszlopok sorrendje a kategóriák első előfordulását követi.
+    """
+    try:
+        df = pd.read_csv(path)
+    except FileNotFoundError:
+        df = pd.DataFrame()
+    if not df.empty:
+        df.index = parse_timestamps(df.pop("timestamp")).rename("timestamp")
+        df = df[df.index.notna()]
+    if df.empty:
+        print(f"{path} üres vagy hiányzik, esemény feature-ök nélkül megyünk tovább.")
+        return pd.DataFrame(
+            columns=["name", "category", "window_before_days", "window_after_days", "impact"],
+            index=pd.DatetimeIndex([], tz="UTC", name="timestamp"),
+        )
+    df["category"] = df["category"].astype(str)
+    df[["window_before_days", "window_after_days", "impact"]] = (
+        df[["window_before_days", "window_after_days", "impact"]].astype(float).fillna(0.0)
+    )
+    return df
+
+
+def event_dates(category: str, path=EVENTS_CSV) -> list:
+    """Egy kategória eseményeinek időpontjai (pl. halving -> anchored VWAP horgonyok)."""
+    df = load_events(path)
+    return list(df.index[df["category"] == category])
+
+
+def build_event_features(index: pd.DatetimeIndex, events: pd.DataFrame | None = None) -> pd.DataFrame:
     """
     Kap egy DatetimeIndex-et (pl. 1H gyertyák időindexe),
-    és visszaad egy DataFrame-et ugyanezzel az indexszel,
-    plusz néhány esemény-jellegű feature-rel:
-
-    - halving_window
-    - covid_crash_window
-    - china_crackdown_window
-    - etf_event_window
-    - event_impact_sum (összegzett hatás)
+    és visszaad egy DataFrame-et ugyanezzel az indexszel:
+
+    - {category}_window: 1, ha az adott időpont a kategória valamelyik
+      eseményének ablakába esik (kategóriánként egy oszlop, a katalógus
+      sorrendjében; pl. halving_window, covid_crash_window, ...)
+    - event_impact_sum: az aktív események impact értékeinek összege
+
+    events: esemény-katalógus (alapból a load_events() eredménye)
     """
     idx = index.tz_convert("UTC") if index.tz is not None else index.tz_localize("UTC")
-    df_ev = pd.DataFrame(index=idx)
-
-    # kategória-szintű maskok + összhatás
-    df_ev["halving_window"] = 0
-    df_ev["covid_crash_window"] = 0
-    df_ev["china_crackdown_window"] = 0
-    df_ev["etf_event_window"] = 0
-    df_ev["event_impact_sum"] = 0.0
-
-    for ev in EVENTS:
-        date = ev["date"]
-        wb = ev["window_before_days"]
-        wa = ev["window_after_days"]
-        impact = ev["impact"]
-        category = ev["category"]
-
-        start = date - timedelta(days=wb)
-        end = date + timedelta(days=wa)
-
-        mask = (idx >= start) & (idx <= end)
-
-        if category == "halving":
-            df_ev.loc[mask, "halving_window"] = 1
-        elif category == "covid_crash":
-            df_ev.loc[mask, "covid_crash_window"] = 1
-        elif category == "china_crackdown":
-            df_ev.loc[mask, "china_crackdown_window"] = 1
-        elif category == "etf":
-            df_ev.loc[mask, "etf_event_window"] = 1
-
-        df_ev.loc[mask, "event_impact_sum"] += impact
-
-    return df_ev
+    if events is None:
+        events = load_events()
+
+    categories = list(dict.fromkeys(events["category"]))
+    n = len(idx)
+
+    if n == 0 or events.empty:
+        df_ev = pd.DataFrame(0, index=idx, columns=[f"{c}_window" for c in categories])
+        df_ev["event_impact_sum"] = 0.0
+        return apply_dtype_policy(df_ev)
+
+    ts = to_epoch_ns(idx)
+    order = None
+    if not idx.is_monotonic_increasing:
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+
+    # esemény-intervallumok határai az időindexen: [lo, hi) sorok tartoznak hozzá
+    ev_ts = to_epoch_ns(events.index)
+    start = ev_ts - (events["window_before_days"].to_numpy() * _NS_PER_DAY).astype(np.int64)
+    end = ev_ts + (events["window_after_days"].to_numpy() * _NS_PER_DAY).astype(np.int64)
+    lo = np.searchsorted(ts, start, side="left")
+    hi = np.searchsorted(ts, end, side="right")
+    hit = lo < hi
+
+    cat_codes = pd.Categorical(events["category"], categories=categories).codes[hit].astype(np.int64)
+    lo, hi = lo[hit], hi[hit]
+    impact = events["impact"].to_numpy()[hit]
+
+    # kategóriánkénti különbség-tömb egyetlen bincount-tal (kategória * (n+1) + pozíció)
+    width = n + 1
+    size = len(categories) * width
+    diff = (
+        np.bincount(cat_codes * width + lo, minlength=size)
+        - np.bincount(cat_codes * width + hi, minlength=size)
+    ).reshape(len(categories), width)
+    active = np.cumsum(diff[:, :n], axis=1)
+
+    impact_diff = np.bincount(lo, weights=impact, minlength=width) - np.bincount(hi, weights=impact, minlength=width)
+    impact_sum = np.cumsum(impact_diff[:n])
+    # ahol nincs aktív esemény, ott pontosan 0 (ne maradjon lebegőpontos maradék)
+    impact_sum[active.sum(axis=0) == 0] = 0.0
+
+    if order is not None:
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(n)
+        active = active[:, inverse]
+        impact_sum = impact_sum[inverse]
+
+    data = {f"{cat}_window": (active[i] > 0).astype(np.int8) for i, cat in enumerate(categories)}
+    data["event_impact_sum"] = impact_sum
+    df_ev = pd.DataFrame(data, index=idx)
+    return apply_dtype_policy(df_ev)
@@ -1,6 +1,5 @@
 # modules/feature_assembler.py
 import pandas as pd
-from datetime import timezone
 
 from .config import (
     MARKET_FEATURES_CSV,
@@ -8,19 +7,10 @@ from .config import (
     MACRO_DATA_CSV,
     SENTIMENT_DATA_CSV,
     ALL_FEATURES_CSV,
+    ASOF_MAX_STALENESS,
 )
-
-
-def _load_df_or_empty(path, index_col="timestamp"):
-    try:
-        df = pd.read_csv(path, parse_dates=[index_col])
-        # Ha nincs timezone, tegyük UTC-re
-        if df[index_col].dt.tz is None:
-            df[index_col] = df[index_col].dt.tz_localize("UTC")
-        df = df.set_index(index_col)
-        return df.sort_index()
-    except FileNotFoundError:
-        return pd.DataFrame()
+from .asof_join import asof_join
+from .data_loader import load_timeseries
 
 
 def build_all_features(resample_rule: str = "1H") -> pd.DataFrame:
@@ -31,35 +21,25 @@ def build_all_features(resample_rule: str = "1H") -> pd.DataFrame:
     """
 
     # 1) Market technikai feature-ök – EZ a baseline (1H)
-    df_mkt = _load_df_or_empty(MARKET_FEATURES_CSV)
+    df_mkt = load_timeseries(MARKET_FEATURES_CSV)
     if df_mkt.empty:
         raise RuntimeError("MARKET_FEATURES_CSV üres vagy nincs. Futtasd: build_features először.")
 
     # biztos ami biztos, resample 1H
     df_mkt = df_mkt.resample(resample_rule).last().dropna()
 
-    # 2) On-chain
-    df_onchain = _load_df_or_empty(ONCHAIN_DATA_CSV)
-    if not df_onchain.empty:
-        df_onchain = df_onchain.resample(resample_rule).ffill()
-
-    # 3) Makró (Yahoo Finance)
-    df_macro = _load_df_or_empty(MACRO_DATA_CSV)
-    if not df_macro.empty:
-        df_macro = df_macro.resample(resample_rule).ffill()
-
-    # 4) Sentiment (news_sentiment + fear_greed – napi idősor)
-    df_sent = _load_df_or_empty(SENTIMENT_DATA_CSV)
-    if not df_sent.empty:
-        # napi → órás, forward fill
-        df_sent = df_sent.resample(resample_rule).ffill()
-
-    # 5) Join – market az alap, a többire left join + ffill
-    df_all = df_mkt.copy()
-
-    for extra_df in [df_onchain, df_macro, df_sent]:
-        if extra_df is not None and not extra_df.empty:
-            df_all = df_all.join(extra_df, how="left")
+    # 2) On-chain, 3) Makró (Yahoo Finance), 4) Sentiment (news_sentiment + fear_greed – napi)
+    #    -> as-of illesztés közvetlenül a market indexre (resample + ffill helyett)
+    df_onchain = load_timeseries(ONCHAIN_DATA_CSV)
+    df_macro = load_timeseries(MACRO_DATA_CSV)
+    df_sent = load_timeseries(SENTIMENT_DATA_CSV)
+
+    # 5) Join – market az alap, a többi as-of illesztve
+    df_all = asof_join(
+        df_mkt,
+        {"onchain": df_onchain, "macro": df_macro, "sentiment": df_sent},
+        staleness=ASOF_MAX_STALENESS,
+    )
 
     # Előre kitöltjük a hiányzó makró/sentiment/on-chain értékeket,
     # hogy az LSTM ne kapjon NaN-t.
@@ -2,6 +2,11 @@
 import numpy as np
 import pandas as pd
 
+from .rolling_stats import rolling_order_stats
+from .event_features import event_dates
+from .dtypes import to_epoch_ns
+from .spectral_features import add_spectral_features
+
 
 def add_basic_price_features(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
@@ -20,11 +25,14 @@ def ema(series: pd.Series, span: int) -> pd.Series:
 
 
 def wma(series: pd.Series, window: int) -> pd.Series:
-    weights = np.arange(1, window + 1)
-    return series.rolling(window).apply(
-        lambda x: np.dot(x, weights) / weights.sum(),
-        raw=True
-    )
+    weights = np.arange(1, window + 1, dtype=float)
+    values = series.to_numpy(dtype=float)
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] >= window:
+        # strided view + egyetlen mátrix-vektor szorzás a rolling().apply helyett
+        view = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1:] = view @ weights / weights.sum()
+    return pd.Series(out, index=series.index)
 
 
 def hma(series: pd.Series, period: int) -> pd.Series:
@@ -78,37 +86,466 @@ def add_momentum_indicators(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def add_volatility_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df["ret_std_7"] = df["ret"].rolling(7).std()
-    df["ret_std_30"] = df["ret"].rolling(30).std()
-
-    # ATR: Average True Range
+def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """ATR: Average True Range (egyszerű mozgóátlaggal)."""
     high_low = df["high"] - df["low"]
     high_close_prev = (df["high"] - df["close"].shift()).abs()
     low_close_prev = (df["low"] - df["close"].shift()).abs()
     tr = pd.concat([high_low, high_close_prev, low_close_prev], axis=1).max(axis=1)
-    df["atr_14"] = tr.rolling(14).mean()
-    return df
+    return tr.rolling(period).mean()
 
 
-def add_volume_indicators(df: pd.DataFrame) -> pd.DataFrame:
+def add_volatility_indicators(df: pd.DataFrame) -> pd.DataFrame:
     df = df.copy()
+    df["ret_std_7"] = df["ret"].rolling(7).std()
+    df["ret_std_30"] = df["ret"].rolling(30).std()
+    df["atr_14"] = atr(df, 14)
+    return df
+
 
-    # OBV
+def obv(df: pd.DataFrame) -> pd.Series:
     direction = np.sign(df["close"].diff().fillna(0))
-    df["obv"] = (direction * df["volume"]).cumsum()
+    return (direction * df["volume"]).cumsum()
+
 
-    # VWAP (egyszerű intraday-mentes verzió, folyamatos kumulált)
+def cumulative_vwap(df: pd.DataFrame) -> pd.Series:
+    """VWAP (egyszerű intraday-mentes verzió, folyamatos kumulált)."""
     typical_price = (df["high"] + df["low"] + df["close"]) / 3
     cum_vp = (typical_price * df["volume"]).cumsum()
     cum_vol = df["volume"].cumsum()
-    df["vwap"] = cum_vp / cum_vol
+    return cum_vp / cum_vol
 
+
+def add_volume_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    df["obv"] = obv(df)
+    df["vwap"] = cumulative_vwap(df)
     df["vol_change"] = df["volume"].pct_change()
     return df
 
 
+# ---------- Bővített indikátor csomag (NumPy-vektorizált) ----------
+
+def _rolling_window_reduce(values: np.ndarray, window: int, func) -> np.ndarray:
+    """
+    Gördülő ablakos redukció egy strided view-n (nincs Python-ciklus, nincs másolat).
+    Az első window-1 elem NaN, mint a pandas rolling(min_periods=window) esetén.
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape[0], np.nan)
+    if values.shape[0] < window:
+        return out
+    view = np.lib.stride_tricks.sliding_window_view(values, window)
+    out[window - 1:] = func(view, axis=1)
+    return out
+
+
+def _ewm_np(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponenciális simítás (adjust=False) – a pandas C-implementációját használjuk."""
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy(dtype=float, copy=True)
+
+
+def _true_range_np(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.empty_like(close)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return tr
+
+
+def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
+    """
+    MACD = EMA(fast) - EMA(slow), signal = EMA(MACD, signal), hist = MACD - signal.
+    """
+    close = series.to_numpy(dtype=float)
+    macd_line = _ewm_np(close, 2.0 / (fast + 1)) - _ewm_np(close, 2.0 / (slow + 1))
+    signal_line = _ewm_np(macd_line, 2.0 / (signal + 1))
+    return pd.DataFrame(
+        {
+            "macd": macd_line,
+            "macd_signal": signal_line,
+            "macd_hist": macd_line - signal_line,
+        },
+        index=series.index,
+    )
+
+
+def bollinger_bands(series: pd.Series, window: int = 20, n_std: float = 2.0) -> pd.DataFrame:
+    """
+    Bollinger szalagok (populációs szórással, ahogy a klasszikus definíció):
+    - bb_upper / bb_lower: MA ± n_std * std
+    - bb_width: (upper - lower) / MA
+    - bb_pctb: a close helye a szalagon belül (0 = alsó, 1 = felső)
+    """
+    close = series.to_numpy(dtype=float)
+    mid = _rolling_window_reduce(close, window, np.mean)
+    std = _rolling_window_reduce(close, window, np.std)
+    upper = mid + n_std * std
+    lower = mid - n_std * std
+    with np.errstate(divide="ignore", invalid="ignore"):
+        width = (upper - lower) / mid
+        pctb = (close - lower) / (upper - lower)
+    return pd.DataFrame(
+        {
+            "bb_upper": upper,
+            "bb_lower": lower,
+            "bb_width": width,
+            "bb_pctb": pctb,
+        },
+        index=series.index,
+    )
+
+
+def stochastic(df: pd.DataFrame, k_period: int = 14, d_period: int = 3) -> pd.DataFrame:
+    """
+    Stochastic oscillator:
+    %K = 100 * (close - LL(k)) / (HH(k) - LL(k)), %D = SMA(%K, d)
+    """
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+
+    highest = _rolling_window_reduce(high, k_period, np.max)
+    lowest = _rolling_window_reduce(low, k_period, np.min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = 100.0 * (close - lowest) / (highest - lowest)
+    d = _rolling_window_reduce(k, d_period, np.mean)
+    return pd.DataFrame({"stoch_k": k, "stoch_d": d}, index=df.index)
+
+
+def adx(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
+    """
+    Average Directional Index (Wilder-simítással, alpha = 1/period):
+    - plus_di / minus_di: irányított mozgás az ATR-hez képest
+    - adx: a DX simított értéke (trend erőssége, iránytól függetlenül)
+    """
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+
+    up_move = np.empty_like(high)
+    down_move = np.empty_like(low)
+    up_move[0] = down_move[0] = np.nan
+    up_move[1:] = high[1:] - high[:-1]
+    down_move[1:] = low[:-1] - low[1:]
+
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+
+    alpha = 1.0 / period
+    atr_w = _ewm_np(_true_range_np(high, low, close), alpha)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = 100.0 * _ewm_np(plus_dm, alpha) / atr_w
+        minus_di = 100.0 * _ewm_np(minus_dm, alpha) / atr_w
+        dx = 100.0 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    adx_line = _ewm_np(np.nan_to_num(dx, nan=0.0), alpha)
+
+    # az első 'period' gyertyán még nincs értelmes simított érték
+    adx_line[:period] = np.nan
+    return pd.DataFrame(
+        {
+            "plus_di": plus_di,
+            "minus_di": minus_di,
+            f"adx_{period}": adx_line,
+        },
+        index=df.index,
+    )
+
+
+def ichimoku(df: pd.DataFrame, tenkan: int = 9, kijun: int = 26, senkou_b: int = 52) -> pd.DataFrame:
+    """
+    Ichimoku felhő komponensei.
+
+    A senkou span-eket a szokásos módon 'kijun' gyertyával előre toljuk, vagyis
+    t időpontban a t-kijun-kor ismert értéket látjuk – nincs jövőbeli szivárgás.
+    A chikou span-t (close visszatolva a múltba) szándékosan kihagyjuk, mert az
+    a jövőbeli close-t tenné a múltbeli sorokba.
+    """
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+
+    def mid(window):
+        return (_rolling_window_reduce(high, window, np.max) + _rolling_window_reduce(low, window, np.min)) / 2.0
+
+    tenkan_line = mid(tenkan)
+    kijun_line = mid(kijun)
+
+    span_a = np.full_like(tenkan_line, np.nan)
+    span_b = np.full_like(tenkan_line, np.nan)
+    span_a[kijun:] = ((tenkan_line + kijun_line) / 2.0)[:-kijun]
+    span_b[kijun:] = mid(senkou_b)[:-kijun]
+
+    return pd.DataFrame(
+        {
+            "ichi_tenkan": tenkan_line,
+            "ichi_kijun": kijun_line,
+            "ichi_senkou_a": span_a,
+            "ichi_senkou_b": span_b,
+        },
+        index=df.index,
+    )
+
+
+def supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0) -> pd.DataFrame:
+    """
+    Supertrend (ATR alapú trendkövető sáv).
+
+    Az alapsávok (hl2 ± multiplier * ATR) vektorizáltan számolódnak; a végső sáv
+    viszont rekurzív (függ az előző végső sávtól és close-tól), ezért azt egyetlen
+    lineáris menetben, natív float listákon léptetjük.
+    - supertrend: az aktív sáv értéke
+    - supertrend_dir: +1 emelkedő trend, -1 csökkenő trend
+    """
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    close = df["close"].to_numpy(dtype=float)
+
+    atr_w = _ewm_np(_true_range_np(high, low, close), 1.0 / period)
+    hl2 = (high + low) / 2.0
+    basic_upper = (hl2 + multiplier * atr_w).tolist()
+    basic_lower = (hl2 - multiplier * atr_w).tolist()
+    closes = close.tolist()
+
+    n = len(closes)
+    st = [np.nan] * n
+    direction = [np.nan] * n
+    if n > period:
+        fu = basic_upper[period]
+        fl = basic_lower[period]
+        trend = 1.0
+        st[period] = fl
+        direction[period] = trend
+        for i in range(period + 1, n):
+            prev_close = closes[i - 1]
+            bu = basic_upper[i]
+            bl = basic_lower[i]
+            fu = bu if (bu < fu or prev_close > fu) else fu
+            fl = bl if (bl > fl or prev_close < fl) else fl
+
+            c = closes[i]
+            if trend > 0 and c < fl:
+                trend = -1.0
+            elif trend < 0 and c > fu:
+                trend = 1.0
+
+            st[i] = fl if trend > 0 else fu
+            direction[i] = trend
+
+    return pd.DataFrame(
+        {"supertrend": st, "supertrend_dir": direction},
+        index=df.index,
+    )
+
+
+def add_extended_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Bővített indikátorok: MACD, Bollinger, Stochastic, ADX, Ichimoku, Supertrend.
+    """
+    df = df.copy()
+    parts = [
+        macd(df["close"]),
+        bollinger_bands(df["close"], 20, 2.0),
+        stochastic(df, 14, 3),
+        adx(df, 14),
+        ichimoku(df),
+        supertrend(df, 10, 3.0),
+    ]
+    return pd.concat([df] + parts, axis=1)
+
+
+def add_rolling_rank_features(
+    df: pd.DataFrame,
+    bars_per_day: int = 24,
+    min_periods: int = 24,
+) -> pd.DataFrame:
+    """
+    Gördülő eloszlás-alapú feature-ök:
+    - close_pctrank_{30,90,365}d: hol van a close a saját 30/90/365 napos eloszlásában
+    - ret_median_30d, ret_mad_30d, ret_q05_30d, ret_q95_30d
+    - volume_median_30d, volume_pctrank_30d
+
+    Az ablakokat napban adjuk meg, bars_per_day (1h adatnál 24) váltja gyertyára.
+    min_periods: a még nem teljes ablakokon a meglévő történetből számolunk,
+    hogy a hosszú (365 napos) ablak ne dobja ki a rövid fájlok összes sorát.
+    """
+    df = df.copy()
+    for days in (30, 90, 365):
+        df[f"close_pctrank_{days}d"] = rolling_order_stats(
+            df["close"], days * bars_per_day, min_periods, rank=True
+        )["rank"]
+
+    win_30d = 30 * bars_per_day
+    ret_stats = rolling_order_stats(
+        df["ret"], win_30d, min_periods, median=True, mad=True, quantiles=(0.05, 0.95)
+    )
+    df["ret_median_30d"] = ret_stats["median"]
+    df["ret_mad_30d"] = ret_stats["mad"]
+    df["ret_q05_30d"] = ret_stats["q05"]
+    df["ret_q95_30d"] = ret_stats["q95"]
+
+    vol_stats = rolling_order_stats(df["volume"], win_30d, min_periods, rank=True, median=True)
+    df["volume_median_30d"] = vol_stats["median"]
+    df["volume_pctrank_30d"] = vol_stats["rank"]
+    return df
+
+
+# ---------- Session / esemény-horgonyzott VWAP + volume profile ----------
+
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def _session_ids(index: pd.DatetimeIndex, session: str) -> np.ndarray:
+    """
+    Egész session-azonosító minden sorra (UTC):
+    - "D": naptári nap
+    - "W": hétfőn kezdődő hét (1970-01-01 csütörtök volt, innen a +3)
+    """
+    days = to_epoch_ns(index) // _NS_PER_DAY
+    if session == "D":
+        return days
+    if session == "W":
+        return (days + 3) // 7
+    raise ValueError(f"Ismeretlen session típus: {session}")
+
+
+def _group_cumsum(values: np.ndarray, group_ids: np.ndarray) -> np.ndarray:
+    """
+    Csoportonként újrainduló kumulált összeg, groupby nélkül:
+    a teljes cumsum-ból kivonjuk a csoport kezdete előtti értéket.
+    Feltételezi, hogy a group_ids időrendben nem csökken (szomszédos csoportok).
+    """
+    cum = np.cumsum(values)
+    starts = np.empty(len(group_ids), dtype=bool)
+    if len(group_ids):
+        starts[0] = True
+        starts[1:] = group_ids[1:] != group_ids[:-1]
+    start_pos = np.maximum.accumulate(np.where(starts, np.arange(len(values)), 0))
+    offset = np.where(start_pos > 0, cum[start_pos - 1], 0.0)
+    return cum - offset
+
+
+def _vwap_by_groups(df: pd.DataFrame, group_ids: np.ndarray) -> np.ndarray:
+    typical_price = ((df["high"] + df["low"] + df["close"]) / 3).to_numpy(dtype=float)
+    volume = np.nan_to_num(df["volume"].to_numpy(dtype=float), nan=0.0)
+    vp = np.nan_to_num(typical_price * volume, nan=0.0)
+    cum_vp = _group_cumsum(vp, group_ids)
+    cum_vol = _group_cumsum(volume, group_ids)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cum_vol > 0, cum_vp / cum_vol, np.nan)
+
+
+def session_vwap(df: pd.DataFrame, session: str = "D") -> pd.Series:
+    """Minden session (nap / hét) elején újrainduló VWAP."""
+    return pd.Series(_vwap_by_groups(df, _session_ids(df.index, session)), index=df.index)
+
+
+def anchored_vwap(df: pd.DataFrame, anchors) -> pd.Series:
+    """
+    Eseményhez horgonyzott VWAP: minden horgony-időpontnál újraindul, és a
+    legutóbbi horgony óta számolt VWAP-ot adja. Az idősor eleje implicit első
+    horgony: az első esemény előtt a kumulatív VWAP (különben a NaN-ek miatt a
+    dropna az első esemény előtti teljes szakaszt eldobná).
+    """
+    anchor_idx = pd.DatetimeIndex(sorted(anchors))
+    if anchor_idx.tz is None:
+        anchor_idx = anchor_idx.tz_localize("UTC")
+    index = df.index if df.index.tz is not None else df.index.tz_localize("UTC")
+
+    segment = np.searchsorted(to_epoch_ns(anchor_idx), to_epoch_ns(index), side="right")
+    return pd.Series(_vwap_by_groups(df, segment), index=df.index)
+
+
+def rolling_volume_profile(
+    df: pd.DataFrame,
+    window: int = 168,
+    bins: int = 24,
+    value_area: float = 0.70,
+    max_chunk_cells: int = 4_000_000,
+) -> pd.DataFrame:
+    """
+    Gördülő volume profile az utolsó 'window' gyertyán:
+    - vp_poc: point of control (legnagyobb volumenű ársáv közepe)
+    - vp_vah / vp_val: value area high / low (a volumen value_area részét
+      tartalmazó, volumen szerint legsűrűbb sávok felső / alsó széle)
+
+    Az ablakokat strided view-n, soronként 'bins' rekeszes hisztogrammal
+    számoljuk egyetlen np.bincount hívással; a memória korlátozásához sor-
+    blokkokban haladunk (max_chunk_cells = sorok * window).
+    """
+    typical_price = ((df["high"] + df["low"] + df["close"]) / 3).to_numpy(dtype=float)
+    volume = df["volume"].to_numpy(dtype=float)
+    n = len(typical_price)
+
+    poc = np.full(n, np.nan)
+    vah = np.full(n, np.nan)
+    val = np.full(n, np.nan)
+    if n < window:
+        return pd.DataFrame({"vp_poc": poc, "vp_vah": vah, "vp_val": val}, index=df.index)
+
+    tp_view = np.lib.stride_tricks.sliding_window_view(typical_price, window)
+    vol_view = np.lib.stride_tricks.sliding_window_view(volume, window)
+    n_windows = tp_view.shape[0]
+    rows_per_chunk = max(1, max_chunk_cells // window)
+    bin_pos = np.arange(bins)
+
+    for start in range(0, n_windows, rows_per_chunk):
+        stop = min(start + rows_per_chunk, n_windows)
+        tp = tp_view[start:stop]
+        vol = vol_view[start:stop]
+        rows = stop - start
+
+        lo = tp.min(axis=1)
+        hi = tp.max(axis=1)
+        span = hi - lo
+        valid = np.isfinite(span) & np.isfinite(vol).all(axis=1)
+        safe_span = np.where(valid & (span > 0), span, 1.0)
+
+        rel = (tp - lo[:, None]) / safe_span[:, None]
+        idx = np.clip(np.nan_to_num(rel * bins, nan=0.0).astype(np.int64), 0, bins - 1)
+        flat = idx + (np.arange(rows) * bins)[:, None]
+        hist = np.bincount(
+            flat.ravel(), weights=np.nan_to_num(vol, nan=0.0).ravel(), minlength=rows * bins
+        ).reshape(rows, bins)
+
+        bin_width = np.where(span > 0, span / bins, 0.0)
+        centers = lo[:, None] + (bin_pos + 0.5) * bin_width[:, None]
+
+        # value area: a sávokat volumen szerint csökkenő sorrendben vesszük,
+        # amíg el nem érjük a teljes volumen value_area részét
+        order = np.argsort(-hist, axis=1, kind="stable")
+        hist_sorted = np.take_along_axis(hist, order, axis=1)
+        cum_before = np.cumsum(hist_sorted, axis=1) - hist_sorted
+        total = hist_sorted.sum(axis=1, keepdims=True)
+        in_va_sorted = cum_before < value_area * total
+        in_va = np.zeros_like(in_va_sorted)
+        np.put_along_axis(in_va, order, in_va_sorted, axis=1)
+
+        ok = valid & (total[:, 0] > 0)
+        out_rows = slice(start + window - 1, stop + window - 1)
+        poc[out_rows] = np.where(ok, np.take_along_axis(centers, order[:, :1], axis=1)[:, 0], np.nan)
+        vah[out_rows] = np.where(ok, np.where(in_va, centers, -np.inf).max(axis=1), np.nan)
+        val[out_rows] = np.where(ok, np.where(in_va, centers, np.inf).min(axis=1), np.nan)
+
+    return pd.DataFrame({"vp_poc": poc, "vp_vah": vah, "vp_val": val}, index=df.index)
+
+
+def add_vwap_profile_features(df: pd.DataFrame, anchors=None) -> pd.DataFrame:
+    """
+    - vwap_day / vwap_week: napi / heti session VWAP
+    - avwap_halving: a legutóbbi halvinghoz horgonyzott VWAP
+      (anchors megadásával tetszőleges eseményekhez horgonyozható)
+    - vp_poc / vp_vah / vp_val: 168 gyertyás (1h adatnál 1 hetes) volume profile
+    """
+    df = df.copy()
+    if anchors is None:
+        anchors = event_dates("halving")
+
+    df["vwap_day"] = session_vwap(df, "D")
+    df["vwap_week"] = session_vwap(df, "W")
+    df["avwap_halving"] = anchored_vwap(df, anchors)
+    return pd.concat([df, rolling_volume_profile(df, window=168, bins=24)], axis=1)
+
+
 def add_all_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     A teljes feature pipeline:
@@ -117,12 +554,20 @@ def add_all_features(df: pd.DataFrame) -> pd.DataFrame:
     - momentum
     - volatility
     - volume
+    - bővített indikátorok (MACD, Bollinger, Stochastic, ADX, Ichimoku, Supertrend)
+    - gördülő rang / medián / MAD feature-ök
+    - session / esemény-horgonyzott VWAP + volume profile
+    - spektrális / ciklus feature-ök (egyhetes ablak)
     """
     df_fe = add_basic_price_features(df)
     df_fe = add_trend_indicators(df_fe)
     df_fe = add_momentum_indicators(df_fe)
     df_fe = add_volatility_indicators(df_fe)
     df_fe = add_volume_indicators(df_fe)
+    df_fe = add_extended_indicators(df_fe)
+    df_fe = add_rolling_rank_features(df_fe)
+    df_fe = add_vwap_profile_features(df_fe)
+    df_fe = add_spectral_features(df_fe, window=168)
 
     # nullák/inf-ek kiszűrése
     df_fe = df_fe.replace([np.inf, -np.inf], np.nan)
@@ -0,0 +1,411 @@
+# modules/feature_registry.py
+"""
+Feature registry: minden feature deklarálja a bemeneteit, a szükséges
+előtörténetet (lookback, gyertyában) és a számoló függvényt.
+
+A fogyasztók (forecast_model, advisor, dashboard) név szerint kérnek
+feature-öket; a compute_features csak a kért feature-ök függőségi
+részgráfját számolja ki, és ha csak az utolsó N sor kell, minden spec-et
+csak a saját farkán (N + a rá épülő lánc lookback-je) futtat; a kumulatív
+spec-ek (és függőségeik) a teljes history-n futnak, a többit ez nem érinti.
+
+Lookback értékek 1h gyertyára vannak megadva:
+- gördülő ablak: window - 1
+- ewm alapú (EMA, Wilder): annyi előtörténet, hogy a kezdőérték hatása
+  ~e^-20 alá csökkenjen (float32 tűréshatáron belül)
+- None: kumulatív feature (obv, vwap, avwap), a teljes history kell hozzá
+"""
+
+import pandas as pd
+
+from . import feature_engineering as fe
+from . import spectral_features as sf
+
+BASE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# ewm "időállandók" száma, ami után a kezdőérték hatása elhanyagolható
+EMA_SETTLE_SPANS = 10
+WILDER_SETTLE_PERIODS = 20
+
+FEATURES = {}
+_OUTPUT_TO_SPEC = {}
+
+
+def register_feature(name, inputs, lookback, outputs=None):
+    """
+    Dekorátor: feature (vagy több kimenetű feature-csoport) regisztrálása.
+
+    name:     a spec neve (egy kimenetnél ez az oszlopnév is)
+    inputs:   bemeneti oszlopok (alap OHLCV vagy más feature kimenete)
+    lookback: szükséges előtörténet gyertyában, None = teljes history
+    outputs:  több kimenet esetén az oszlopnevek (a függvény DataFrame-et ad)
+    """
+    outputs = tuple(outputs) if outputs else (name,)
+
+    def decorator(func):
+        spec = {
+            "name": name,
+            "inputs": tuple(inputs),
+            "lookback": lookback,
+            "outputs": outputs,
+            "func": func,
+        }
+        FEATURES[name] = spec
+        for col in outputs:
+            _OUTPUT_TO_SPEC[col] = spec
+        return func
+
+    return decorator
+
+
+def list_features() -> list:
+    """Az összes regisztrált kimeneti oszlopnév."""
+    return list(_OUTPUT_TO_SPEC)
+
+
+def _spec_for(name: str) -> dict:
+    spec = _OUTPUT_TO_SPEC.get(name)
+    if spec is None:
+        raise ValueError(f"Ismeretlen feature: {name}")
+    return spec
+
+
+def resolve(names) -> list:
+    """A kért feature-ök függőségi részgráfja topologikus sorrendben."""
+    order = []
+    state = {}  # spec name -> "visiting" | "done"
+
+    def visit(spec):
+        mark = state.get(spec["name"])
+        if mark == "done":
+            return
+        if mark == "visiting":
+            raise ValueError(f"Körkörös feature függőség: {spec['name']}")
+        state[spec["name"]] = "visiting"
+        for col in spec["inputs"]:
+            if col not in BASE_COLUMNS:
+                visit(_spec_for(col))
+        state[spec["name"]] = "done"
+        order.append(spec)
+
+    for name in names:
+        if name not in BASE_COLUMNS:
+            visit(_spec_for(name))
+    return order
+
+
+def required_lookback(names):
+    """
+    A kért feature-ökhöz szükséges előtörténet (gyertyában).
+    A függőségi lánc mentén összeadódik; None, ha bármelyik kumulatív.
+    """
+    memo = {}
+
+    def lookback_of(spec):
+        if spec["name"] in memo:
+            return memo[spec["name"]]
+        own = spec["lookback"]
+        result = own
+        if own is not None:
+            deps = [lookback_of(_spec_for(c)) for c in spec["inputs"] if c not in BASE_COLUMNS]
+            if any(d is None for d in deps):
+                result = None
+            else:
+                result = own + max(deps, default=0)
+        memo[spec["name"]] = result
+        return result
+
+    total = 0
+    for name in names:
+        if name in BASE_COLUMNS:
+            continue
+        lb = lookback_of(_spec_for(name))
+        if lb is None:
+            return None
+        total = max(total, lb)
+    return total
+
+
+def _required_rows(order: list, names, last_n: int | None) -> dict:
+    """
+    Specenként hány utolsó kimeneti sor kell (None = teljes history); a spec
+    maga ennél a saját lookback-jével több soron fut.
+
+    A kért feature-ökből last_n sor kell; egy spec függőségeiből ennél a spec
+    saját lookback-jével több. Fogyasztótól a függőség felé haladva
+    (fordított topologikus sorrendben) a maximumot vesszük; kumulatív spec
+    és annak minden függősége a teljes history-n fut.
+    """
+    full = last_n is None
+    rows = {}
+    for name in names:
+        if name not in BASE_COLUMNS:
+            rows[_spec_for(name)["name"]] = None if full else last_n
+
+    for spec in reversed(order):
+        r = rows.get(spec["name"], 0)
+        need = None if r is None or spec["lookback"] is None else r + spec["lookback"]
+        for col in spec["inputs"]:
+            if col in BASE_COLUMNS:
+                continue
+            dep = _spec_for(col)["name"]
+            if dep in rows and rows[dep] is None:
+                continue
+            rows[dep] = None if need is None else max(rows.get(dep, 0), need)
+    return rows
+
+
+def compute_features(df: pd.DataFrame, names, last_n: int | None = None) -> pd.DataFrame:
+    """
+    A kért feature-ök kiszámítása egy OHLCV DataFrame-ből.
+
+    - csak a names által igényelt részgráf fut le
+    - last_n megadásakor minden spec csak a saját szükséges farkán fut
+      (last_n + a rá épülő láncok lookback-je), és csak az utolsó last_n sort
+      adjuk vissza; a kumulatív spec-ek (és függőségeik) a teljes history-n,
+      így egy kumulatív név nem drágítja meg a többi feature-t
+    """
+    names = list(names)
+    order = resolve(names)
+    rows = _required_rows(order, names, last_n)
+
+    n = len(df)
+    base = {c: df[c].to_numpy() for c in BASE_COLUMNS if c in df.columns}
+    computed = {}  # kimeneti oszlop -> (első sor pozíciója, ndarray)
+
+    for spec in order:
+        missing = [c for c in spec["inputs"] if c not in base and c not in computed]
+        if missing:
+            raise RuntimeError(f"{spec['name']} feature-höz hiányzó bemenet(ek): {missing}")
+        r = rows[spec["name"]]
+        start = 0 if r is None or spec["lookback"] is None else max(0, n - r - spec["lookback"])
+        data = {c: v[start:] for c, v in base.items()}
+        for c in spec["inputs"]:
+            if c in computed:
+                first, values = computed[c]
+                data[c] = values[start - first:]
+        result = spec["func"](pd.DataFrame(data, index=df.index[start:]))
+        if isinstance(result, pd.DataFrame):
+            for col in spec["outputs"]:
+                computed[col] = (start, result[col].to_numpy())
+        else:
+            computed[spec["outputs"][0]] = (start, pd.Series(result).to_numpy())
+
+    keep = n if last_n is None else min(last_n, n)
+    out = {}
+    for name in names:
+        if name in computed:
+            first, values = computed[name]
+            out[name] = values[n - keep - first:]
+        else:
+            out[name] = base[name][n - keep:]
+    return pd.DataFrame(out, index=df.index[n - keep:])
+
+
+# ---------- Alap feature-ök (feature_engineering függvényeire építve) ----------
+
+@register_feature("hl_range", ["high", "low"], 0)
+def _hl_range(df):
+    return df["high"] - df["low"]
+
+
+@register_feature("oc_diff", ["open", "close"], 0)
+def _oc_diff(df):
+    return df["close"] - df["open"]
+
+
+@register_feature("ret", ["close"], 1)
+def _ret(df):
+    return df["close"].pct_change()
+
+
+def _register_ma(window):
+    register_feature(f"ma_{window}", ["close"], window - 1)(lambda df: fe.ma(df["close"], window))
+
+
+def _register_ema(span):
+    register_feature(f"ema_{span}", ["close"], EMA_SETTLE_SPANS * span)(lambda df: fe.ema(df["close"], span))
+
+
+for _w in (7, 21, 50):
+    _register_ma(_w)
+for _s in (12, 26):
+    _register_ema(_s)
+
+
+@register_feature("hma_21", ["close"], 21 + 4)
+def _hma_21(df):
+    return fe.hma(df["close"], 21)
+
+
+@register_feature("rsi_14", ["close"], 14)
+def _rsi_14(df):
+    return fe.rsi(df["close"], 14)
+
+
+@register_feature("roc_10", ["close"], 10)
+def _roc_10(df):
+    return fe.roc(df["close"], 10)
+
+
+@register_feature("ret_std_7", ["ret"], 6)
+def _ret_std_7(df):
+    return df["ret"].rolling(7).std()
+
+
+@register_feature("ret_std_30", ["ret"], 29)
+def _ret_std_30(df):
+    return df["ret"].rolling(30).std()
+
+
+@register_feature("atr_14", ["high", "low", "close"], 14)
+def _atr_14(df):
+    return fe.atr(df, 14)
+
+
+@register_feature("obv", ["close", "volume"], None)
+def _obv(df):
+    return fe.obv(df)
+
+
+@register_feature("vwap", ["high", "low", "close", "volume"], None)
+def _vwap(df):
+    return fe.cumulative_vwap(df)
+
+
+@register_feature("vol_change", ["volume"], 1)
+def _vol_change(df):
+    return df["volume"].pct_change()
+
+
+# ---------- Bővített indikátorok ----------
+
+@register_feature(
+    "macd_group", ["close"], EMA_SETTLE_SPANS * (26 + 9),
+    outputs=["macd", "macd_signal", "macd_hist"],
+)
+def _macd(df):
+    return fe.macd(df["close"])
+
+
+@register_feature(
+    "bollinger_20", ["close"], 19,
+    outputs=["bb_upper", "bb_lower", "bb_width", "bb_pctb"],
+)
+def _bollinger(df):
+    return fe.bollinger_bands(df["close"], 20, 2.0)
+
+
+@register_feature("stochastic_14_3", ["high", "low", "close"], 15, outputs=["stoch_k", "stoch_d"])
+def _stochastic(df):
+    return fe.stochastic(df, 14, 3)
+
+
+@register_feature(
+    "adx_group", ["high", "low", "close"], 2 * WILDER_SETTLE_PERIODS * 14,
+    outputs=["plus_di", "minus_di", "adx_14"],
+)
+def _adx(df):
+    return fe.adx(df, 14)
+
+
+@register_feature(
+    "ichimoku", ["high", "low"], 52 + 26,
+    outputs=["ichi_tenkan", "ichi_kijun", "ichi_senkou_a", "ichi_senkou_b"],
+)
+def _ichimoku(df):
+    return fe.ichimoku(df)
+
+
+@register_feature(
+    "supertrend_10_3", ["high", "low", "close"], WILDER_SETTLE_PERIODS * 10,
+    outputs=["supertrend", "supertrend_dir"],
+)
+def _supertrend(df):
+    return fe.supertrend(df, 10, 3.0)
+
+
+# ---------- Gördülő rang / eloszlás feature-ök ----------
+
+def _register_close_pctrank(days):
+    register_feature(f"close_pctrank_{days}d", ["close"], days * 24 - 1)(
+        lambda df: fe.rolling_order_stats(df["close"], days * 24, 24, rank=True)["rank"]
+    )
+
+
+for _d in (30, 90, 365):
+    _register_close_pctrank(_d)
+
+
+@register_feature(
+    "ret_stats_30d", ["ret"], 30 * 24 - 1,
+    outputs=["ret_median_30d", "ret_mad_30d", "ret_q05_30d", "ret_q95_30d"],
+)
+def _ret_stats_30d(df):
+    stats = fe.rolling_order_stats(df["ret"], 30 * 24, 24, median=True, mad=True, quantiles=(0.05, 0.95))
+    return pd.DataFrame(
+        {
+            "ret_median_30d": stats["median"],
+            "ret_mad_30d": stats["mad"],
+            "ret_q05_30d": stats["q05"],
+            "ret_q95_30d": stats["q95"],
+        },
+        index=df.index,
+    )
+
+
+@register_feature(
+    "volume_stats_30d", ["volume"], 30 * 24 - 1,
+    outputs=["volume_median_30d", "volume_pctrank_30d"],
+)
+def _volume_stats_30d(df):
+    stats = fe.rolling_order_stats(df["volume"], 30 * 24, 24, rank=True, median=True)
+    return pd.DataFrame(
+        {"volume_median_30d": stats["median"], "volume_pctrank_30d": stats["rank"]},
+        index=df.index,
+    )
+
+
+# ---------- VWAP variánsok + volume profile ----------
+
+@register_feature("vwap_day", ["high", "low", "close", "volume"], 23)
+def _vwap_day(df):
+    return fe.session_vwap(df, "D")
+
+
+@register_feature("vwap_week", ["high", "low", "close", "volume"], 7 * 24 - 1)
+def _vwap_week(df):
+    return fe.session_vwap(df, "W")
+
+
+@register_feature("avwap_halving", ["high", "low", "close", "volume"], None)
+def _avwap_halving(df):
+    return fe.anchored_vwap(df, fe.event_dates("halving"))
+
+
+@register_feature(
+    "volume_profile_168", ["high", "low", "close", "volume"], 167,
+    outputs=["vp_poc", "vp_vah", "vp_val"],
+)
+def _volume_profile(df):
+    return fe.rolling_volume_profile(df, window=168, bins=24)
+
+
+# ---------- Spektrális / ciklus feature-ök ----------
+
+def _register_spectral(name, window, lookback):
+    stats = ["period", "entropy"] + [f"{band}_ratio" for band in sf.SPECTRAL_BANDS_1H]
+    prefix = f"spec_{name}_{window}"
+    inputs = ["volume"] if name == "volume" else ["close"]
+
+    def _func(df):
+        series, detrend = sf.spectral_input(df, name)
+        return sf.spectral_features(series, window, prefix, detrend=detrend)
+
+    register_feature(f"spectral_{name}_{window}", inputs, lookback,
+                     outputs=[f"{prefix}_{s}" for s in stats])(_func)
+
+
+for _name in sf.SPECTRAL_INPUTS:
+    # a loghozamhoz egy extra gyertya kell
+    _register_spectral(_name, 168, 168 if _name == "ret" else 167)
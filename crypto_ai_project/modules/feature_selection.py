@@ -0,0 +1,192 @@
+# modules/feature_selection.py
+"""
+Feature-szelekció permutation importance alapján az LSTM bemenetéhez.
+
+A tanított modellt a validációs szakaszon (a train_model-lel azonos
+időrendi split) értékeljük ki: egy feature fontossága az, hogy mennyivel
+nő az MSE, ha az adott feature-t a mintákon keresztül összekeverjük
+(a többi változatlan). Ami alig számít, azt kihagyjuk a bemenetből –
+kisebb input szélesség, gyorsabb tanítás és predikció.
+
+Párhuzamosítás:
+- a feature-öket egy folyamat-poolon osztjuk szét; minden worker egyszer
+  tölti be a modellt és a validációs szekvenciákat (initializer), utána
+  csak feature-indexeket kap
+- a predikció nagy batch-ekben megy (PREDICT_BATCH_SIZE), a kevert
+  bemenet workerenként egyetlen újrahasznált másolat
+- "spawn" kontextus: a TensorFlow nem fork-biztos
+
+Ha a modell PCA-tömörített bemenettel tanult, az eredeti (skálázott)
+feature-öket keverjük, és a tömörítést a worker alkalmazza a predikció
+előtt – így a fontosság továbbra is feature-névre vonatkozik.
+"""
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+
+from .config import (
+    FORECAST_MODEL_PATH,
+    FORECAST_SCALER_PATH,
+    FORECAST_SELECTED_FEATURES_JSON,
+    FEATURE_SELECTION_REPEATS,
+    FEATURE_SELECTION_WORKERS,
+    LOOKBACK,
+)
+from .forecast_model import (
+    TRAIN_FRACTION,
+    apply_compressor,
+    build_sequences,
+    load_model_feature_names,
+    load_training_data,
+    _feature_columns,
+)
+
+PREDICT_BATCH_SIZE = 1024
+
+# worker-folyamatonkénti állapot (az initializer tölti ki)
+_WORKER = {}
+
+
+def _init_worker(model_path, X_val, y_val, compressor, repeats, seed):
+    from tensorflow.keras.models import load_model
+
+    _WORKER["model"] = load_model(model_path)
+    _WORKER["compressor"] = compressor
+    _WORKER["X"] = X_val
+    _WORKER["y"] = y_val
+    _WORKER["repeats"] = repeats
+    _WORKER["seed"] = seed
+
+
+def _mse(X) -> float:
+    X = apply_compressor(X, _WORKER["compressor"])
+    pred = _WORKER["model"].predict(X, batch_size=PREDICT_BATCH_SIZE, verbose=0).reshape(-1)
+    return float(((pred - _WORKER["y"].reshape(-1)) ** 2).mean())
+
+
+def _baseline_loss() -> float:
+    return _mse(_WORKER["X"])
+
+
+def _permuted_losses(feature_idx: int):
+    """
+    Egy feature összes ismétlése: a feature oszlopát a minták között keverjük.
+    Egyetlen munkapéldányt használunk, csak a kevert oszlopot írjuk felül.
+    """
+    X = _WORKER["X"]
+    rng = np.random.default_rng(_WORKER["seed"] + feature_idx)
+    X_perm = X.copy()
+    losses = np.empty(_WORKER["repeats"])
+    for r in range(len(losses)):
+        X_perm[:, :, feature_idx] = X[rng.permutation(len(X)), :, feature_idx]
+        losses[r] = _mse(X_perm)
+    return feature_idx, losses
+
+
+def _validation_sequences():
+    """
+    A modell saját feature-listájával, a mentett skálázóval skálázott validációs
+    szakasz (tömörítés nélkül) + a mentett PCA leképezés (vagy None).
+    """
+    feature_names = load_model_feature_names()
+    df, X_raw, y_raw = load_training_data(feature_names)
+    names = _feature_columns(df, feature_names)
+
+    scalers = joblib.load(FORECAST_SCALER_PATH)
+    X_scaled = scalers["scaler_X"].transform(X_raw)
+    y_scaled = scalers["scaler_y"].transform(y_raw)
+    X_seq, y_seq = build_sequences(X_scaled, y_scaled, lookback=LOOKBACK)
+
+    split = int(len(X_seq) * TRAIN_FRACTION)
+    return names, X_seq[split:], y_seq[split:], scalers.get("compressor")
+
+
+def permutation_importance(
+    repeats: int = FEATURE_SELECTION_REPEATS,
+    workers: int | None = FEATURE_SELECTION_WORKERS,
+    seed: int = 42,
+) -> dict:
+    """
+    Permutation importance a tanított modellre, a validációs szakaszon.
+
+    Vissza:
+      {
+        "baseline_loss": float,
+        "importances": {feature: {"mean": float, "std": float}}   # MSE növekmény
+      }
+    """
+    names, X_val, y_val, compressor = _validation_sequences()
+    if len(X_val) < 10:
+        raise RuntimeError("Túl kevés validációs minta a permutation importance-hez.")
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(names)))
+    print(f"Permutation importance: {len(names)} feature, {len(X_val)} validációs minta, "
+          f"{repeats} ismétlés, {workers} worker")
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(str(FORECAST_MODEL_PATH), X_val, y_val, compressor, repeats, seed),
+    ) as pool:
+        baseline = pool.submit(_baseline_loss).result()
+        importances = {}
+        for idx, losses in pool.map(_permuted_losses, range(len(names))):
+            delta = losses - baseline
+            importances[names[idx]] = {"mean": float(delta.mean()), "std": float(delta.std())}
+
+    return {"baseline_loss": baseline, "importances": importances}
+
+
+def select_features(
+    repeats: int = FEATURE_SELECTION_REPEATS,
+    workers: int | None = FEATURE_SELECTION_WORKERS,
+    min_importance: float = 0.0,
+    max_features: int | None = None,
+    min_features: int = 8,
+) -> list:
+    """
+    Feature lista kiválasztása és mentése (FORECAST_SELECTED_FEATURES_JSON).
+
+    Megtartjuk, aminek az átlagos MSE növekménye > min_importance (fontosság
+    szerint rangsorolva); max_features felső, min_features alsó korlát
+    (ha kevés feature "fontos", a legjobb min_features-t akkor is megtartjuk).
+    A train_model alapból ezt a listát használja; a predikció a tanításkor
+    mentett listát (a skálázók mellől).
+    """
+    result = permutation_importance(repeats=repeats, workers=workers)
+    ranked = sorted(result["importances"].items(), key=lambda kv: kv[1]["mean"], reverse=True)
+
+    selected = [name for name, imp in ranked if imp["mean"] > min_importance]
+    if len(selected) < min_features:
+        selected = [name for name, _ in ranked[:min_features]]
+    if max_features is not None:
+        selected = selected[:max_features]
+    # a bemenet oszlopsorrendje marad az eredeti (CSV) sorrend
+    chosen = set(selected)
+    selected = [name for name in result["importances"] if name in chosen]
+
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "baseline_loss": result["baseline_loss"],
+        "repeats": repeats,
+        "features": selected,
+        "importances": dict(ranked),
+    }
+    FORECAST_SELECTED_FEATURES_JSON.parent.mkdir(exist_ok=True, parents=True)
+    with open(FORECAST_SELECTED_FEATURES_JSON, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    print(f"Kiválasztott feature-ök: {len(selected)} / {len(ranked)} -> {FORECAST_SELECTED_FEATURES_JSON}")
+    for name, imp in ranked[:20]:
+        mark = "*" if name in selected else " "
+        print(f"  {mark} {name:40s} {imp['mean']:+.3e} ± {imp['std']:.1e}")
+    return selected
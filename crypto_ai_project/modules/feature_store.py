@@ -0,0 +1,157 @@
+# modules/feature_store.py
+"""
+Point-in-time lekérdezések a feature store-ok (timestamp-indexelt CSV-k) fölött.
+
+A tanítás, az advisor, az LLM kontextus és a dashboardok ugyanazt kérdezik:
+"a feature-ök T időpontban" vagy "az utolsó N sor". Ehelyett, hogy mindenki
+beolvassa és szeletelje a CSV-t, a store-t folyamatonként egyszer töltjük be
+(fájlonként, mtime + méret szerint érvénytelenítve), és oszloponként numpy
+tömbként tartjuk, mellette egy rendezett int64 epoch (ns) indexszel.
+
+- időtartomány / as-of keresés: np.searchsorted a rendezett indexen, O(log n)
+- az eredmény a tárolt tömbök szelete (view, másolás nélkül); a tömbök
+  írásvédettek, tehát a cache-elt store-t a hívó nem tudja elrontani
+  (módosításhoz .copy())
+- a store-ban nem szereplő, de a feature registry-ben regisztrált nevek az
+  OHLCV oszlopokból számolódnak, csak a kért szakasz + a szükséges
+  előtörténet fölött
+
+Minden függvény path paramétere bármely timestamp-indexelt store lehet
+(alapból a training_features_1h.csv).
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import LOOKBACK, TRAINING_FEATURES_CSV
+from .data_loader import load_timeseries
+from .dtypes import to_epoch_ns
+from .feature_registry import BASE_COLUMNS, compute_features, required_lookback
+
+_STORES = {}
+
+
+def _epoch_ns(ts) -> int:
+    """Időpont (str / datetime / Timestamp; a naiv UTC-nek számít) -> epoch ns."""
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+    return int(ts.as_unit("ns").value)
+
+
+def _load_store(path) -> dict:
+    """
+    A store betöltése (vagy a cache-elt példány, ha a fájl nem változott):
+      {"index": DatetimeIndex, "ts": int64 epoch ns, "columns": {név: ndarray}}
+    Hiányzó fájlnál üres store.
+    """
+    path = Path(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {"index": pd.DatetimeIndex([], tz="UTC"), "ts": np.empty(0, dtype=np.int64), "columns": {}}
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    name = str(path.resolve())
+    store = _STORES.get(name)
+    if store is not None and store["key"] == key:
+        return store
+
+    df = load_timeseries(path, use_cache=False)
+    columns = {}
+    for col in df.columns:
+        arr = df[col].to_numpy(copy=True)
+        arr.flags.writeable = False
+        columns[col] = arr
+
+    index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex([], tz="UTC")
+    store = {"key": key, "index": index, "ts": to_epoch_ns(index), "columns": columns}
+    _STORES[name] = store
+    return store
+
+
+def store_columns(path=TRAINING_FEATURES_CSV) -> list:
+    """A store oszlopai (CSV sorrendben, timestamp nélkül)."""
+    return list(_load_store(path)["columns"])
+
+
+def store_range(path=TRAINING_FEATURES_CSV):
+    """(első, utolsó) timestamp a store-ban; üres store-nál (None, None)."""
+    index = _load_store(path)["index"]
+    if len(index) == 0:
+        return None, None
+    return index[0], index[-1]
+
+
+def _frame(store: dict, names, lo: int, hi: int) -> pd.DataFrame:
+    """
+    A [lo, hi) sorok a kért oszlopokkal. A tárolt oszlopok view-k; a
+    registry-ből számolt nevekhez az OHLCV-t lo előtt a lookback-kel bővítjük
+    (kumulatív feature-nél a store elejéig, de a compute_features a többi
+    feature-t ekkor is csak a saját farkán számolja).
+    """
+    columns = store["columns"]
+    index = store["index"][lo:hi]
+    if names is None:
+        names = list(columns)
+    names = list(names)
+
+    data = {c: columns[c][lo:hi] for c in names if c in columns}
+    derived = [c for c in names if c not in columns]
+    if derived and hi > lo:
+        lookback = required_lookback(derived)
+        base_lo = 0 if lookback is None else max(0, lo - lookback)
+        base = pd.DataFrame(
+            {c: columns[c][base_lo:hi] for c in BASE_COLUMNS if c in columns},
+            index=store["index"][base_lo:hi],
+        )
+        computed = compute_features(base, derived, last_n=hi - lo)
+        for c in derived:
+            data[c] = computed[c].to_numpy()
+    elif derived:
+        for c in derived:
+            data[c] = np.empty(0)
+
+    return pd.DataFrame({c: data[c] for c in names}, index=index, copy=False)
+
+
+def get_features(names=None, start=None, end=None, path=TRAINING_FEATURES_CSV) -> pd.DataFrame:
+    """
+    A kért feature-ök a [start, end] zárt időtartományban.
+
+    names: oszlop- / feature-nevek (None = a store összes oszlopa)
+    start, end: időkorlátok (None = nyitott)
+    """
+    store = _load_store(path)
+    ts = store["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, _epoch_ns(start), side="left"))
+    hi = len(ts) if end is None else int(np.searchsorted(ts, _epoch_ns(end), side="right"))
+    return _frame(store, names, lo, max(lo, hi))
+
+
+def get_window(names=None, asof=None, n: int = LOOKBACK, path=TRAINING_FEATURES_CSV) -> pd.DataFrame:
+    """
+    Az utolsó n sor, ami asof-kor már ismert (timestamp <= asof; None = a store vége).
+    Ha nincs elég előtörténet, kevesebb sort adunk vissza.
+    """
+    store = _load_store(path)
+    ts = store["ts"]
+    hi = len(ts) if asof is None else int(np.searchsorted(ts, _epoch_ns(asof), side="right"))
+    return _frame(store, names, max(0, hi - n), hi)
+
+
+def get_asof(names=None, asof=None, path=TRAINING_FEATURES_CSV):
+    """
+    Az asof-kor utolsó ismert sor Series-ként (name = a sor timestamp-je),
+    vagy None, ha asof előtt nincs adat.
+    """
+    window = get_window(names, asof=asof, n=1, path=path)
+    if window.empty:
+        return None
+    return window.iloc[-1]
+
+
+def clear_store_cache():
+    _STORES.clear()
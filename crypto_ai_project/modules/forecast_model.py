@@ -1,9 +1,13 @@
 # modules/forecast_model.py
 
+import json
+
 import numpy as np
 import pandas as pd
 import joblib
+from sklearn.decomposition import IncrementalPCA
 from sklearn.preprocessing import MinMaxScaler
+import tensorflow as tf
 from tensorflow.keras import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
@@ -15,74 +19,379 @@ from .config import (
     FORECAST_MODEL_PATH,
     FORECAST_SCALER_PATH,
     LOOKBACK,
+    FEATURE_FLOAT_DTYPE,
+    FORECAST_FEATURES,
+    FORECAST_SELECTED_FEATURES_JSON,
+    FORECAST_PCA_COMPONENTS,
+    FORECAST_PCA_WHITEN,
+    TRAINING_CHUNK_ROWS,
 )
+from .dtypes import read_dtypes, apply_dtype_policy
+from .data_loader import load_timeseries, iter_timeseries_chunks
+from .streaming_stats import update_stats, minmax_scaler_from_stats
+from .feature_registry import BASE_COLUMNS, compute_features
+from .feature_store import get_asof, get_window, store_columns
+
+# a szekvenciák első 90%-a tanító, a maradék validációs halmaz (időrendben)
+TRAIN_FRACTION = 0.9
+PCA_BATCH_SIZE = 4096
 
 
-def load_training_data():
+def load_training_data(feature_names=None):
     """
-    Teljes training_features_1h.csv betöltése.
+    training_features_1h.csv betöltése.
 
     Target: log-return a close árra:
         log_return_t = ln(close_t / close_{t-1})
 
-    Features: minden oszlop (beleértve a close-t is), kivéve a log_return (target).
+    Features:
+      - feature_names=None: minden oszlop, kivéve a close-t és a log_return-t (target)
+      - feature_names megadva: csak ezek az oszlopok, ebben a sorrendben. Ami a
+        CSV-ben megvan, azt olvassuk be (usecols), a többit a feature registry
+        számolja ki az OHLCV oszlopokból.
+
+    Dtype policy: a feature-ök FEATURE_FLOAT_DTYPE-ként (float32) jönnek be
+    már a CSV parse-nál; a close float64 marad, hogy a log-return pontos legyen.
     """
-    df = pd.read_csv(TRAINING_FEATURES_CSV, parse_dates=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
+    header = list(pd.read_csv(TRAINING_FEATURES_CSV, nrows=0).columns)
+
+    derived = []
+    usecols = None
+    if feature_names:
+        feature_names = list(feature_names)
+        derived = [c for c in feature_names if c not in header]
+        usecols = {"timestamp", "close"} | {c for c in feature_names if c in header}
+        if derived:
+            usecols |= {c for c in BASE_COLUMNS if c in header}
+        usecols = [c for c in header if c in usecols]
+
+    df = load_timeseries(
+        TRAINING_FEATURES_CSV,
+        columns=usecols,
+        dtype=read_dtypes(usecols or header),
+    )
 
     if "close" not in df.columns:
         raise RuntimeError("TRAINING_FEATURES_CSV nem tartalmaz 'close' oszlopot.")
 
-    # log-return kiszámítása
+    if derived:
+        df = df.join(compute_features(df, derived))
+    df = apply_dtype_policy(df)
+
+    # log-return kiszámítása (float64 close-ból)
     df["log_return"] = np.log(df["close"] / df["close"].shift(1))
 
-    # az első sor NaN (mert nincs előző ár) -> dobjuk
-    df = df.dropna(subset=["log_return"])
+    # az első sor NaN (mert nincs előző ár) -> dobjuk;
+    # számolt feature-öknél a bemelegedési sorokat is
+    df = df.dropna(subset=["log_return"] + derived)
 
     # target: log_return (N x 1)
-    y = df["log_return"].values.reshape(-1, 1)
+    y = df["log_return"].to_numpy(dtype=FEATURE_FLOAT_DTYPE).reshape(-1, 1)
 
-    # features: minden más (close-t is benne hagyjuk feature-ként) closet is kiveszem inkább
-    X = df.drop(columns=["log_return", "close"]).values
+    # features: close és target nélkül
+    if feature_names:
+        X = df[feature_names].to_numpy(dtype=FEATURE_FLOAT_DTYPE)
+    else:
+        X = df.drop(columns=["log_return", "close"]).to_numpy(dtype=FEATURE_FLOAT_DTYPE)
 
     return df, X, y
 
 
+def _feature_columns(df: pd.DataFrame, feature_names=None) -> list:
+    """A modell bemeneti oszlopai a load_training_data logikája szerint."""
+    if feature_names:
+        return list(feature_names)
+    return [c for c in df.columns if c not in ("log_return", "close")]
+
+
+def _compressor_from_pca(ipca: IncrementalPCA, n_features: int) -> dict:
+    W = ipca.components_.T
+    if ipca.whiten:
+        W = W / np.sqrt(ipca.explained_variance_)
+    b = -ipca.mean_ @ W
+    explained = float(ipca.explained_variance_ratio_.sum())
+    print(f"PCA: {n_features} feature -> {ipca.n_components_} komponens, magyarázott variancia: {explained:.3f}")
+    return {
+        "W": W.astype(FEATURE_FLOAT_DTYPE),
+        "b": b.astype(FEATURE_FLOAT_DTYPE),
+        "whiten": ipca.whiten,
+        "explained_variance_ratio": ipca.explained_variance_ratio_.tolist(),
+    }
+
+
+def fit_compressor(X_scaled, n_components: int, whiten: bool = False, batch_size: int = PCA_BATCH_SIZE) -> dict:
+    """
+    IncrementalPCA a skálázott feature-ökön (batch-enként illesztve, így nagy
+    training store-nál sem kell a teljes kovariancia-számítás egyszerre).
+
+    A transzformációt egyetlen affin leképezésként mentjük:
+        Z = X @ W + b,  W = komponensek^T (/ sqrt(variancia) whitening esetén),
+                        b = -átlag @ W
+    így inferenciánál sklearn nélkül, egy mátrixszorzással alkalmazható.
+    """
+    n_features = X_scaled.shape[1]
+    n_components = min(n_components, n_features)
+    ipca = IncrementalPCA(
+        n_components=n_components,
+        whiten=whiten,
+        batch_size=max(batch_size, n_components),
+    )
+    ipca.fit(X_scaled)
+    return _compressor_from_pca(ipca, n_features)
+
+
+def fit_compressor_streaming(rows, n_rows: int, n_components: int, whiten: bool = False) -> dict:
+    """
+    fit_compressor skálázott (X, y) sor-chunkokból (partial_fit), csak az első
+    n_rows sorra. A komponensszámnál rövidebb maradék darabot kihagyjuk.
+    """
+    ipca = None
+    seen = 0
+    for X, _ in rows:
+        X = X[: max(0, n_rows - seen)]
+        seen += len(X)
+        if ipca is None:
+            ipca = IncrementalPCA(n_components=min(n_components, X.shape[1]), whiten=whiten)
+        if len(X) >= ipca.n_components:
+            ipca.partial_fit(X)
+        if seen >= n_rows:
+            break
+    if ipca is None or not hasattr(ipca, "components_"):
+        raise RuntimeError("Túl kevés adat a PCA illesztéséhez.")
+    return _compressor_from_pca(ipca, ipca.n_features_in_)
+
+
+def apply_compressor(X, compressor: dict | None):
+    """Z = X @ W + b az utolsó (feature) tengelyen; compressor=None -> X változatlanul."""
+    if compressor is None:
+        return X
+    return (np.asarray(X, dtype=FEATURE_FLOAT_DTYPE) @ compressor["W"]) + compressor["b"]
+
 
 def build_sequences(X, y, lookback=LOOKBACK):
-    Xs, ys = [], []
-    for i in range(len(X) - lookback):
-        Xs.append(X[i:i + lookback])
-        ys.append(y[i + lookback])
-    return np.array(Xs), np.array(ys)
+    """
+    (N, F) -> (N - lookback, lookback, F) ablakok + a következő lépés targetje.
+
+    Strided view-ból egyetlen másolással készül (Python-ciklus nélkül),
+    a kimenet FEATURE_FLOAT_DTYPE (float32) – ennyit lát a Keras is.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    n_seq = len(X) - lookback
+    if n_seq <= 0:
+        return (
+            np.empty((0, lookback, X.shape[1]), dtype=FEATURE_FLOAT_DTYPE),
+            np.empty((0,) + y.shape[1:], dtype=FEATURE_FLOAT_DTYPE),
+        )
+
+    # sliding_window_view: (N - lookback + 1, F, lookback) -> (.., lookback, F)
+    windows = np.lib.stride_tricks.sliding_window_view(X, lookback, axis=0)[:n_seq]
+    X_seq = np.ascontiguousarray(windows.transpose(0, 2, 1), dtype=FEATURE_FLOAT_DTYPE)
+    y_seq = np.asarray(y[lookback:], dtype=FEATURE_FLOAT_DTYPE)
+    return X_seq, y_seq
+
+
+# ---------- Streaming (out-of-core) tanítás ----------
+
+def _streaming_feature_columns(feature_names=None) -> list:
+    header = list(pd.read_csv(TRAINING_FEATURES_CSV, nrows=0).columns)
+    if not feature_names:
+        return [c for c in header if c not in ("timestamp", "close")]
+    missing = [c for c in feature_names if c not in header]
+    if missing:
+        raise RuntimeError(
+            f"Streaming tanításnál csak a store oszlopai használhatók, hiányzó: {missing}"
+        )
+    return list(feature_names)
+
+
+def iter_training_chunks(feature_names=None, chunk_rows: int = TRAINING_CHUNK_ROWS):
+    """
+    A load_training_data chunkonkénti megfelelője: (X, y) párok a CSV
+    sorrendjében. A log-return a chunk-határon átnyúlik (az előző chunk utolsó
+    close-ából), így az eredmény soronként azonos a teljes betöltésével.
+    A registry által számolt (store-ban nem szereplő) feature-ök itt nem támogatottak.
+    """
+    features = _streaming_feature_columns(feature_names)
+    usecols = ["close"] + [c for c in features if c != "close"]
+    prev_close = np.nan
+
+    for chunk in iter_timeseries_chunks(
+        TRAINING_FEATURES_CSV, columns=usecols, chunksize=chunk_rows, dtype=read_dtypes(usecols)
+    ):
+        if chunk.empty:
+            continue
+        close = chunk["close"].to_numpy(dtype=float)
+        prev = np.empty_like(close)
+        prev[0] = prev_close
+        prev[1:] = close[:-1]
+        prev_close = close[-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_return = np.log(close / prev)
+
+        keep = ~np.isnan(log_return)
+        X = chunk[features].to_numpy(dtype=FEATURE_FLOAT_DTYPE)[keep]
+        y = log_return[keep].astype(FEATURE_FLOAT_DTYPE).reshape(-1, 1)
+        yield X, y
+
+
+def fit_streaming_scalers(feature_names=None, chunk_rows: int = TRAINING_CHUNK_ROWS):
+    """
+    scaler_X / scaler_y egyetlen chunkolt olvasással (streaming min / max),
+    a teljes mátrix betöltése nélkül. Vissza: (scaler_X, scaler_y, sorok száma).
+    """
+    stats_X = stats_y = None
+    for X, y in iter_training_chunks(feature_names, chunk_rows):
+        stats_X = update_stats(stats_X, X)
+        stats_y = update_stats(stats_y, y)
+    if stats_y is None:
+        raise RuntimeError("TRAINING_FEATURES_CSV üres vagy hiányzik.")
+    return minmax_scaler_from_stats(stats_X), minmax_scaler_from_stats(stats_y), int(stats_y["n"][0])
+
 
+def iter_scaled_chunks(feature_names, scaler_X, scaler_y, compressor=None, chunk_rows: int = TRAINING_CHUNK_ROWS):
+    """Skálázott (és opcionálisan tömörített) (X, y) chunkok, menet közben transzformálva."""
+    for X, y in iter_training_chunks(feature_names, chunk_rows):
+        X_scaled = scaler_X.transform(X).astype(FEATURE_FLOAT_DTYPE)
+        yield apply_compressor(X_scaled, compressor), scaler_y.transform(y).astype(FEATURE_FLOAT_DTYPE)
 
-def train_model(epochs: int = 50, batch_size: int = 32, patience: int = 5):
+
+def iter_sequence_batches(rows, start: int, stop: int, batch_size: int, lookback: int = LOOKBACK, shuffle: bool = False):
+    """
+    A build_sequences szekvenciái [start, stop) indexszel, batch-enként, sor-chunkokból.
+
+    A k. szekvencia: X[k : k + lookback], target y[k + lookback]. A chunk-határon
+    az előző chunk utolsó lookback sorát visszük tovább; egy batch-et a strided
+    view-ból másolunk ki, így egyszerre csak egy batch szekvenciái léteznek.
+    shuffle=True: chunkon belüli keverés (a chunk végén rövidebb batch lehet).
+    """
+    rng = np.random.default_rng() if shuffle else None
+    buf_X = buf_y = None
+    offset = 0  # a puffer első sorának globális indexe
+
+    for X, y in rows:
+        if buf_X is not None:
+            X = np.concatenate([buf_X, X])
+            y = np.concatenate([buf_y, y])
+        n_seq = len(X) - lookback
+        if n_seq <= 0:
+            buf_X, buf_y = X, y
+            continue
+
+        lo = max(start - offset, 0)
+        hi = min(stop - offset, n_seq)
+        if lo < hi:
+            idx = np.arange(lo, hi)
+            if rng is not None:
+                rng.shuffle(idx)
+            windows = np.lib.stride_tricks.sliding_window_view(X, lookback, axis=0)
+            for b in range(0, len(idx), batch_size):
+                sel = idx[b:b + batch_size]
+                yield (
+                    np.ascontiguousarray(windows[sel].transpose(0, 2, 1), dtype=FEATURE_FLOAT_DTYPE),
+                    np.asarray(y[sel + lookback], dtype=FEATURE_FLOAT_DTYPE),
+                )
+
+        offset += n_seq
+        buf_X, buf_y = X[n_seq:], y[n_seq:]
+        if offset >= stop:
+            break
+
+
+def _sequence_dataset(make_rows, start: int, stop: int, batch_size: int, n_inputs: int, shuffle: bool):
+    """tf.data.Dataset a streaming batch-ekből (epochonként újra végigolvassa a store-t)."""
+    return tf.data.Dataset.from_generator(
+        lambda: iter_sequence_batches(make_rows(), start, stop, batch_size, shuffle=shuffle),
+        output_signature=(
+            tf.TensorSpec(shape=(None, LOOKBACK, n_inputs), dtype=FEATURE_FLOAT_DTYPE),
+            tf.TensorSpec(shape=(None, 1), dtype=FEATURE_FLOAT_DTYPE),
+        ),
+    ).prefetch(tf.data.AUTOTUNE)
+
+
+def train_model(
+    epochs: int = 50,
+    batch_size: int = 32,
+    patience: int = 5,
+    feature_names=None,
+    pca_components: int = FORECAST_PCA_COMPONENTS,
+    pca_whiten: bool = FORECAST_PCA_WHITEN,
+    streaming: bool = False,
+    chunk_rows: int = TRAINING_CHUNK_ROWS,
+):
     """
     LSTM modell betanítása a training_features_1h.csv alapján.
 
     Target: a következő időlépés (1H) log-return-je a close árra.
     A modell tehát log-return-t jósol, amit utána ár-változásként tudunk visszafejteni.
-    """
-    df, X_raw, y_raw = load_training_data()
-
-    scaler_X = MinMaxScaler()
-    scaler_y = MinMaxScaler()
 
-    X_scaled = scaler_X.fit_transform(X_raw)
-    y_scaled = scaler_y.fit_transform(y_raw)
+    feature_names: a bemeneti feature-ök listája (alapból config.FORECAST_FEATURES,
+    ennek hiányában a select_features által mentett lista, végül minden oszlop).
+    A listát a skálázók mellé mentjük, a predikció ugyanezt használja.
 
-    X_seq, y_seq = build_sequences(X_scaled, y_scaled, lookback=LOOKBACK)
+    pca_components: > 0 esetén a skálázott feature-öket PCA-val ennyi komponensre
+    tömörítjük a szekvenciák előtt (csak a tanító szakaszra illesztve); a
+    leképezés a skálázók mellé kerül ("compressor").
 
-    if len(X_seq) < 10:
+    streaming=True: a store-t chunk_rows soronként olvassuk; a skálázók streaming
+    min / max statisztikából jönnek, a skálázás, tömörítés és a szekvenciák
+    batch-enként, menet közben készülnek (nincs teljes skálázott másolat).
+    """
+    if feature_names is None:
+        feature_names = FORECAST_FEATURES or load_selected_features()
+
+    if streaming:
+        used_features = _streaming_feature_columns(feature_names)
+        scaler_X, scaler_y, n_rows = fit_streaming_scalers(feature_names, chunk_rows)
+        n_inputs = len(used_features)
+    else:
+        df, X_raw, y_raw = load_training_data(feature_names)
+        used_features = _feature_columns(df, feature_names)
+
+        scaler_X = MinMaxScaler()
+        scaler_y = MinMaxScaler()
+
+        X_scaled = scaler_X.fit_transform(X_raw)
+        y_scaled = scaler_y.fit_transform(y_raw)
+        n_rows, n_inputs = X_scaled.shape
+
+    n_seq = n_rows - LOOKBACK
+    if n_seq < 10:
         raise RuntimeError("Túl kevés adat a tanításhoz. Ellenőrizd a training_features_1h.csv méretét.")
-
-    split = int(len(X_seq) * 0.9)
-    X_train, X_test = X_seq[:split], X_seq[split:]
-    y_train, y_test = y_seq[:split], y_seq[split:]
+    split = int(n_seq * TRAIN_FRACTION)
+
+    compressor = None
+    if pca_components and pca_components < n_inputs:
+        # csak a tanító szekvenciák sorain illesztünk (a validációs szakasz ne szivárogjon be)
+        if streaming:
+            compressor = fit_compressor_streaming(
+                iter_scaled_chunks(feature_names, scaler_X, scaler_y, chunk_rows=chunk_rows),
+                split + LOOKBACK, pca_components, whiten=pca_whiten,
+            )
+        else:
+            compressor = fit_compressor(X_scaled[:split + LOOKBACK], pca_components, whiten=pca_whiten)
+            X_scaled = apply_compressor(X_scaled, compressor)
+        n_inputs = compressor["W"].shape[1]
+
+    if streaming:
+        def make_rows():
+            return iter_scaled_chunks(feature_names, scaler_X, scaler_y, compressor, chunk_rows)
+
+        fit_data = {
+            "x": _sequence_dataset(make_rows, 0, split, batch_size, n_inputs, shuffle=True),
+            "validation_data": _sequence_dataset(make_rows, split, n_seq, batch_size, n_inputs, shuffle=False),
+        }
+    else:
+        X_seq, y_seq = build_sequences(X_scaled, y_scaled, lookback=LOOKBACK)
+        fit_data = {
+            "x": X_seq[:split],
+            "y": y_seq[:split],
+            "validation_data": (X_seq[split:], y_seq[split:]),
+            "batch_size": batch_size,
+        }
 
     model = Sequential([
-        LSTM(128, return_sequences=True, input_shape=(LOOKBACK, X_seq.shape[2])),
+        LSTM(128, return_sequences=True, input_shape=(LOOKBACK, n_inputs)),
         Dropout(0.2),
         LSTM(64),
         Dropout(0.2),
@@ -102,18 +411,23 @@ def train_model(epochs: int = 50, batch_size: int = 32, patience: int = 5):
     )
 
     model.fit(
-        X_train,
-        y_train,
-        validation_data=(X_test, y_test),
+        **fit_data,
         epochs=epochs,
-        batch_size=batch_size,
         callbacks=[early, checkpoint_cb],
         verbose=1,
     )
 
     # Modell + skálázók mentése
     model.save(FORECAST_MODEL_PATH)
-    joblib.dump({"scaler_X": scaler_X, "scaler_y": scaler_y}, FORECAST_SCALER_PATH)
+    joblib.dump(
+        {
+            "scaler_X": scaler_X,
+            "scaler_y": scaler_y,
+            "feature_names": used_features,
+            "compressor": compressor,
+        },
+        FORECAST_SCALER_PATH,
+    )
 
     print("Model trained and saved:", FORECAST_MODEL_PATH)
     print("Scalers saved:", FORECAST_SCALER_PATH)
@@ -130,6 +444,33 @@ def load_trained_model():
     return model, scaler_X, scaler_y
 
 
+def load_model_feature_names():
+    """
+    A tanításkor használt feature lista (a skálázók mellől).
+    Régebbi mentésnél nincs ilyen kulcs -> None (minden oszlop).
+    """
+    scalers = joblib.load(FORECAST_SCALER_PATH)
+    return scalers.get("feature_names")
+
+
+def load_compressor():
+    """A tanításkor illesztett PCA leképezés (W, b), vagy None, ha nem volt tömörítés."""
+    scalers = joblib.load(FORECAST_SCALER_PATH)
+    return scalers.get("compressor")
+
+
+def load_selected_features():
+    """
+    A permutation importance alapján kiválasztott feature lista
+    (FORECAST_SELECTED_FEATURES_JSON). Ha nincs ilyen fájl -> None.
+    """
+    try:
+        with open(FORECAST_SELECTED_FEATURES_JSON, "r", encoding="utf-8") as f:
+            return json.load(f).get("features") or None
+    except FileNotFoundError:
+        return None
+
+
 def predict_next_close():
     """
     A training_features_1h.csv utolsó LOOKBACK sorából becsüli a következő close árat.
@@ -143,15 +484,17 @@ def predict_next_close():
     Visszaadja:
         (predicted_close, last_close, last_row_df)
     """
-    df, X_raw, y_raw = load_training_data()
-    if len(df) <= LOOKBACK:
-        raise RuntimeError("Nincs elég sor a training_features_1h.csv-ben a predikcióhoz.")
-
     model, scaler_X, scaler_y = load_trained_model()
+    feature_names = load_model_feature_names()
+    names = feature_names or [c for c in store_columns() if c != "close"]
 
-    # csak az utolsó LOOKBACK sor kell input window-nak
-    X_last_window_raw = X_raw[-LOOKBACK:]
-    X_last_window_scaled = scaler_X.transform(X_last_window_raw)
+    # csak az utolsó LOOKBACK sor kell input window-nak (point-in-time lekérdezés)
+    window = get_window(names, n=LOOKBACK)
+    if len(window) < LOOKBACK:
+        raise RuntimeError("Nincs elég sor a training_features_1h.csv-ben a predikcióhoz.")
+
+    X_last_window_raw = window.to_numpy(dtype=FEATURE_FLOAT_DTYPE)
+    X_last_window_scaled = apply_compressor(scaler_X.transform(X_last_window_raw), load_compressor())
     X_input = X_last_window_scaled.reshape(1, LOOKBACK, X_last_window_scaled.shape[1])
 
     # modell kimenete: skálázott log-return
@@ -160,12 +503,13 @@ def predict_next_close():
     # skálázás visszaforgatása -> valódi log-return
     pred_log_return = scaler_y.inverse_transform(y_pred_scaled)[0, 0]
 
-    # utolsó valódi close ár (y_raw nem kell hozzá, df-ből vesszük)
-    last_close = float(df["close"].iloc[-1])
+    # utolsó sor: a store összes oszlopa + a registry-ből számolt feature-ök
+    last_row = get_asof()
+    extra = window.iloc[-1].drop(last_row.index, errors="ignore")
+    last_row = pd.concat([last_row, extra])
+    last_close = float(last_row["close"])
 
     # következő ár kiszámítása log-return alapján
     predicted_close = last_close * np.exp(pred_log_return)
 
-    last_row = df.iloc[-1]
-
     return float(predicted_close), last_close, last_row
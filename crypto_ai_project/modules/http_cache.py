@@ -0,0 +1,92 @@
+# modules/http_cache.py
+"""
+Feltételes HTTP GET (ETag / Last-Modified) a gyakran lekérdezett forrásokhoz
+(RSS feedek, Blockchain.com charts).
+
+A validátorokat URL-enként (a query paraméterekkel együtt) egy runtime
+JSON-ben tartjuk (HTTP_VALIDATORS_JSON). A kérés If-None-Match /
+If-Modified-Since fejlécet küld; 304 esetén a hívó kihagyja a parse-t és az
+összefésülést.
+
+A validátort csak akkor mentjük, ha a hívó a választ sikeresen feldolgozta
+(remember_validators), különben egy félbeszakadt futás után a következő
+304 miatt elveszne az adat.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import requests
+
+from .config import HTTP_VALIDATORS_JSON, NEWS_USER_AGENT
+
+_LOCK = threading.Lock()
+
+
+def _load(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def request_key(url: str, params=None) -> str:
+    """A teljes (query paraméteres) URL, a validátorok kulcsa."""
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+def conditional_get(
+    url: str,
+    params=None,
+    timeout: float = 10,
+    headers: dict | None = None,
+    use_validators: bool = True,
+    path=HTTP_VALIDATORS_JSON,
+) -> requests.Response:
+    """
+    GET a mentett validátorokkal. A válasz cache_key attribútuma a validátor kulcs.
+    304 -> not_modified(response) igaz, a body üres; egyéb hibakódra kivétel.
+    use_validators=False: feltétel nélküli letöltés (pl. ha a helyi adat hiányzik).
+    """
+    key = request_key(url, params)
+    headers = {"User-Agent": NEWS_USER_AGENT, **(headers or {})}
+    if use_validators:
+        with _LOCK:
+            saved = _load(path).get(key, {})
+        if saved.get("etag"):
+            headers["If-None-Match"] = saved["etag"]
+        if saved.get("last_modified"):
+            headers["If-Modified-Since"] = saved["last_modified"]
+
+    r = requests.get(url, params=params, timeout=timeout, headers=headers)
+    if r.status_code != 304:
+        r.raise_for_status()
+    r.cache_key = key
+    return r
+
+
+def not_modified(response: requests.Response) -> bool:
+    return response.status_code == 304
+
+
+def remember_validators(response: requests.Response, path=HTTP_VALIDATORS_JSON):
+    """A sikeresen feldolgozott válasz ETag / Last-Modified fejléceinek mentése."""
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    entry = {
+        "etag": etag,
+        "last_modified": last_modified,
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with _LOCK:
+        data = _load(path)
+        data[getattr(response, "cache_key", None) or response.url] = entry
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
@@ -13,13 +13,16 @@ from .config import (
     TRAINING_SENTIMENT_FEATURES_CSV,
     LONGTERM_FEATURES_15D_CSV,
 )
+from .data_loader import load_timeseries
+from .cross_asset import build_cross_asset_daily
+from .asof_join import asof_align
+from .spectral_features import SPECTRAL_BANDS_1D, add_spectral_features
 
 
 def _load_market_data() -> pd.DataFrame:
-    df = pd.read_csv(MARKET_DATA_FULL_CSV)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
+    df = load_timeseries(MARKET_DATA_FULL_CSV, columns=["open", "high", "low", "close", "volume"])
+    if df.empty:
+        return df
 
     # Napi OHLC aggregálás
     df_daily = df.resample("1D").agg({
@@ -33,33 +36,15 @@ def _load_market_data() -> pd.DataFrame:
     return df_daily
 
 def _load_onchain_data() -> pd.DataFrame:
-    try:
-        df = pd.read_csv(ONCHAIN_DATA_CSV)
-    except FileNotFoundError:
-        return pd.DataFrame()
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    return df
+    return load_timeseries(ONCHAIN_DATA_CSV)
 
 
 def _load_macro_data() -> pd.DataFrame:
-    try:
-        df = pd.read_csv(MACRO_DATA_CSV)
-    except FileNotFoundError:
-        return pd.DataFrame()
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    return df
+    return load_timeseries(MACRO_DATA_CSV)
 
 
 def _load_sentiment_data() -> pd.DataFrame:
-    try:
-        df = pd.read_csv(TRAINING_SENTIMENT_FEATURES_CSV, parse_dates=["timestamp"])
-    except FileNotFoundError:
-        return pd.DataFrame()
-    df = df.set_index("timestamp").sort_index()
+    df = load_timeseries(TRAINING_SENTIMENT_FEATURES_CSV)
     # várjuk, hogy legyen: news_sentiment, fear_greed
     return df
 
@@ -73,6 +58,7 @@ def build_longterm_btc_features() -> pd.DataFrame:
       - onchain_data.csv (tx_count, active_addresses, stb.)
       - macro_data.csv   (sp500, dxy, stb.)
       - training_sentiment_features.csv (news_sentiment, fear_greed)
+      - gördülő BTC vs. S&P500 / DXY / hash-rate / sentiment korreláció és béta
 
     Kimenet:
       - LONGTERM_FEATURES_15D_CSV
@@ -103,6 +89,11 @@ def build_longterm_btc_features() -> pd.DataFrame:
     rolling_max_180 = df_mkt["close"].rolling(window=180).max()
     df_mkt["drawdown_180d"] = df_mkt["close"] / rolling_max_180 - 1.0
 
+    # spektrális / ciklus feature-ök 90 napos ablakon (domináns ciklus napban)
+    df_spec = add_spectral_features(df_mkt[["close", "volume"]], window=90, bands=SPECTRAL_BANDS_1D)
+    spec_cols = [c for c in df_spec.columns if c.startswith("spec_")]
+    df_mkt = df_mkt.join(df_spec[spec_cols])
+
     # --- 2) 15 napos rácsra aggregálás (áras feature-ök) ---
 
     # 15 napos záróár (ablak vége)
@@ -125,7 +116,8 @@ def build_longterm_btc_features() -> pd.DataFrame:
     ).apply(lambda x: math.log(x) if x > 0 else float("nan"))
 
     # napi rolling mutatók 15 napos rácsra átszedve (utolsó érték az ablak végén)
-    df_roll_15d = df_mkt[["sma_30d", "sma_90d", "sma_180d", "vol_30d", "vol_90d", "drawdown_180d"]] \
+    roll_cols = ["sma_30d", "sma_90d", "sma_180d", "vol_30d", "vol_90d", "drawdown_180d"] + spec_cols
+    df_roll_15d = df_mkt[roll_cols] \
         .resample("15D", label="right", closed="right").last()
 
     df_price_15d = df_price_15d.join(df_roll_15d, how="left")
@@ -178,11 +170,21 @@ def build_longterm_btc_features() -> pd.DataFrame:
     else:
         df_sent_15d = pd.DataFrame(index=df_price_15d.index)
 
+    # --- 5b) Cross-asset: gördülő korreláció / béta, az ablak végén ismert érték ---
+
+    factors = [df for df in (df_on, df_macro, df_sent) if not df.empty]
+    if factors:
+        df_cross = build_cross_asset_daily(df_mkt["close"], pd.concat(factors, axis=1, sort=True))
+        df_cross_15d = asof_align(df_cross, df_price_15d.index)
+    else:
+        df_cross_15d = pd.DataFrame(index=df_price_15d.index)
+
     # --- 6) Minden feature összefésülése 15 napos rácson ---
 
     df_15d = df_price_15d.join(df_on_15d, how="left")
     df_15d = df_15d.join(df_macro_15d, how="left")
     df_15d = df_15d.join(df_sent_15d, how="left")
+    df_15d = df_15d.join(df_cross_15d, how="left")
 
     # --- 7) Célváltozók: jövőbeli hozam + volatilitás ---
 
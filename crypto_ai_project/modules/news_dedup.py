@@ -0,0 +1,266 @@
+# modules/news_dedup.py
+"""
+Közel-duplikált hírek felismerése MinHash + LSH indexszel.
+
+Ugyanaz a (szindikált) cikk több feedben is megjelenik, kicsit eltérő URL-lel
+és címmel; az URL szerinti dedup ezeket nem fogja meg. Itt a cím + összefoglaló
+szó-shingle-jeinek Jaccard-hasonlóságát becsüljük MinHash szignatúrával, és
+a jelölteket LSH sávokkal keressük: egy új cikkhez csak a vele legalább egy
+sávban egyező cikkeket nézzük meg (nem az egész store-t), a jelölteket a
+szignatúra-egyezés arányával (becsült Jaccard) ellenőrizzük.
+
+Minden cikk kap egy cluster_id-t: az első (legkorábbi) cikk a klaszter
+reprezentánsa, a későbbi közel-duplikátumok az ő cluster_id-ját öröklik.
+A pontozás és a napi arányok csak a reprezentánsokra mennek.
+
+Az index perzisztens (NEWS_LSH_DB, sqlite WAL, mint a score cache): cikkenként
+(kulcs: URL, ennek hiányában a szöveg hash-e) a szignatúra, a cluster_id és az
+időbélyeg, sávonként pedig a sáv-hash -> cikk sorok (indexelt tábla). Egy
+frissítés így csak az új cikkeket shingle-özi / hash-eli, a jelölteket indexelt
+lekérdezéssel kapja; az INDEX_RETENTION-nél régebbi cikkek kikerülnek.
+Más paraméterekkel (permutációk, sávok, shingle méret) épült indexet eldobunk.
+"""
+
+import hashlib
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    NEWS_DEDUP_THRESHOLD,
+    NEWS_LSH_BANDS,
+    NEWS_LSH_DB,
+    NEWS_MINHASH_PERM,
+    NEWS_SHINGLE_SIZE,
+)
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN_RE = re.compile(r"[a-z0-9$%.]+")
+_HTML_RE = re.compile(r"<[^>]+>")
+
+SQLITE_MAX_PARAMS = 900
+BUSY_TIMEOUT_SEC = 30
+
+# a hír store 30 napos; a határon lévő cikkek miatt egy nap ráhagyással
+INDEX_RETENTION = pd.Timedelta(days=31)
+
+
+def _hash_params(num_perm: int, seed: int = 1):
+    """A (a * x + b) mod p hash-család paraméterei (a, b < p, így nincs uint64 túlcsordulás)."""
+    rng = np.random.default_rng(seed)
+    p = int(_MERSENNE_PRIME)
+    a = rng.integers(1, p, num_perm, dtype=np.uint64)
+    b = rng.integers(0, p, num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingles(text: str, k: int = NEWS_SHINGLE_SIZE) -> set:
+    """Kisbetűs szó k-shingle-ök (rövid szövegnél az egész szöveg egy shingle)."""
+    tokens = _TOKEN_RE.findall(_HTML_RE.sub(" ", str(text)).lower())
+    if not tokens:
+        return set()
+    if len(tokens) < k:
+        return {" ".join(tokens)}
+    return {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+def minhash_signature(shingle_set, a: np.ndarray, b: np.ndarray) -> np.ndarray | None:
+    """MinHash szignatúra (len(a),) uint64; üres shingle-halmaznál None."""
+    if not shingle_set:
+        return None
+    x = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set))
+    x %= _MERSENNE_PRIME
+    return ((x[:, None] * a[None, :] + b[None, :]) % _MERSENNE_PRIME).min(axis=0)
+
+
+def _index_params(num_perm: int, bands: int) -> str:
+    return f"perm={num_perm};bands={bands};shingle={NEWS_SHINGLE_SIZE}"
+
+
+def _connect(path, num_perm: int = NEWS_MINHASH_PERM, bands: int = NEWS_LSH_BANDS) -> sqlite3.Connection:
+    """
+    Az LSH index (path=None: memóriában, nem perzisztens). Ha a mentett index
+    más paraméterekkel épült, a táblákat újrakezdjük.
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) nem osztható a sávok számával ({bands}).")
+    conn = sqlite3.connect(":memory:" if path is None else str(path), timeout=BUSY_TIMEOUT_SEC)
+    if path is not None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    params = _index_params(num_perm, bands)
+    row = conn.execute("SELECT value FROM meta WHERE name = 'params'").fetchone()
+    with conn:
+        if row is not None and row[0] != params:
+            print(f"LSH index: a paraméterek megváltoztak ({row[0]} -> {params}), újraépítjük.")
+            conn.execute("DROP TABLE IF EXISTS articles")
+            conn.execute("DROP TABLE IF EXISTS bands")
+        conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('params', ?)", (params,))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles (key TEXT PRIMARY KEY, cluster_id TEXT NOT NULL, "
+            "ts INTEGER NOT NULL, sig BLOB NOT NULL) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, bkey BLOB NOT NULL, key TEXT NOT NULL, "
+            "ts INTEGER NOT NULL, PRIMARY KEY (band, bkey, key)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS articles_ts ON articles (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS bands_ts ON bands (ts)")
+    return conn
+
+
+def _band_keys(sig: np.ndarray, bands: int = NEWS_LSH_BANDS):
+    r = len(sig) // bands
+    for band in range(bands):
+        yield band, sig[band * r:(band + 1) * r].tobytes()
+
+
+def _indexed_keys(conn, keys: list) -> set:
+    """A keys közül az indexben már szereplők."""
+    found = set()
+    for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+        part = keys[start:start + SQLITE_MAX_PARAMS]
+        marks = ",".join("?" * len(part))
+        found.update(k for (k,) in conn.execute(f"SELECT key FROM articles WHERE key IN ({marks})", part))
+    return found
+
+
+def _add_to_index(conn, key: str, sig: np.ndarray, cluster_id: str, ts: int):
+    conn.execute(
+        "INSERT OR REPLACE INTO articles (key, cluster_id, ts, sig) VALUES (?, ?, ?, ?)",
+        (key, cluster_id, ts, sig.tobytes()),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO bands (band, bkey, key, ts) VALUES (?, ?, ?, ?)",
+        [(band, bkey, key, ts) for band, bkey in _band_keys(sig)],
+    )
+
+
+def _query_index(conn, sig: np.ndarray, threshold: float = NEWS_DEDUP_THRESHOLD):
+    """
+    A leghasonlóbb, legalább threshold becsült Jaccard-hasonlóságú cikk
+    cluster_id-ja (vagy None). Csak az LSH jelölteket hasonlítjuk össze
+    (azonos hasonlóságnál a korábbi cikk nyer).
+    """
+    candidates = set()
+    for band, bkey in _band_keys(sig):
+        candidates.update(k for (k,) in conn.execute("SELECT key FROM bands WHERE band = ? AND bkey = ?", (band, bkey)))
+    rows = []
+    candidates = sorted(candidates)
+    for start in range(0, len(candidates), SQLITE_MAX_PARAMS):
+        part = candidates[start:start + SQLITE_MAX_PARAMS]
+        marks = ",".join("?" * len(part))
+        rows += conn.execute(f"SELECT key, cluster_id, ts, sig FROM articles WHERE key IN ({marks})", part).fetchall()
+    rows.sort(key=lambda row: (row[2], row[0]))
+    best, best_sim = None, threshold
+    for _, cluster_id, _, blob in rows:
+        sim = float((np.frombuffer(blob, dtype=np.uint64) == sig).mean())
+        if sim > best_sim or (best is None and sim >= best_sim):
+            best, best_sim = cluster_id, sim
+    return best
+
+
+def _evict(conn, cutoff: int):
+    conn.execute("DELETE FROM articles WHERE ts < ?", (cutoff,))
+    conn.execute("DELETE FROM bands WHERE ts < ?", (cutoff,))
+
+
+def _article_text(df: pd.DataFrame) -> pd.Series:
+    parts = [df[c].where(df[c].notna(), "").astype(str) for c in ("title", "summary") if c in df.columns]
+    if not parts:
+        return pd.Series("", index=df.index)
+    text = parts[0]
+    for part in parts[1:]:
+        text = text + " " + part
+    return text
+
+
+def _time_order(df: pd.DataFrame) -> np.ndarray:
+    """Pozíciók időrendben (stabil; érvénytelen timestamp a végén)."""
+    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    return np.argsort(ts.dt.tz_convert(None).to_numpy(), kind="stable")
+
+
+def _new_cluster_id(row_key: str) -> str:
+    return hashlib.blake2b(row_key.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _article_keys(df: pd.DataFrame, texts: np.ndarray) -> np.ndarray:
+    """Index kulcs cikkenként: az URL, ennek hiányában a szöveg hash-e."""
+    urls = df["url"] if "url" in df.columns else pd.Series(None, index=df.index, dtype=object)
+    urls = urls.where(urls.notna(), "").astype(str).to_numpy()
+    return np.array(
+        [u if u else "text:" + _new_cluster_id(t) for u, t in zip(urls, texts)],
+        dtype=object,
+    )
+
+
+def assign_clusters(df_news: pd.DataFrame, threshold: float = NEWS_DEDUP_THRESHOLD, path=NEWS_LSH_DB) -> pd.DataFrame:
+    """
+    cluster_id oszlop a hírekhez (időrendben feldolgozva).
+
+    A már meglévő cluster_id-k (a rolling store korábbi futásaiból) megmaradnak;
+    csak a cluster_id nélküli (új) cikkeket klaszterezzük, a perzisztens index
+    ellen (path=None: csak memóriában, az adott DataFrame-en belül).
+    Szignatúrát csak az új, ill. az indexből hiányzó (pl. régi store) cikkekre
+    számolunk. Új klaszter azonosítója a reprezentáns URL-jének (ill.
+    szövegének) hash-e.
+    """
+    df = df_news.copy()
+    if "cluster_id" not in df.columns:
+        df["cluster_id"] = None
+    if df.empty:
+        return df
+
+    order = _time_order(df)
+    texts = _article_text(df).to_numpy()
+    keys = _article_keys(df, texts)
+    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    now = pd.Timestamp.now(tz="UTC")
+    epoch = (ts.fillna(now) - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1)
+    epoch = epoch.astype("int64").tolist()
+    cluster_ids = df["cluster_id"].to_numpy(dtype=object, copy=True)
+    known = pd.notna(cluster_ids)
+
+    a, b = _hash_params(NEWS_MINHASH_PERM)
+    conn = _connect(path)
+    try:
+        with conn:
+            indexed = _indexed_keys(conn, list(dict.fromkeys(keys[known])))
+            # először a meglévő klaszterek (ezek nem változnak; csak az indexből
+            # hiányzókat hash-eljük), utána az új cikkek időrendben
+            for pos in order[known[order]]:
+                if keys[pos] in indexed:
+                    continue
+                sig = minhash_signature(shingles(texts[pos]), a, b)
+                if sig is not None:
+                    _add_to_index(conn, keys[pos], sig, cluster_ids[pos], epoch[pos])
+                indexed.add(keys[pos])
+            for pos in order[~known[order]]:
+                sig = minhash_signature(shingles(texts[pos]), a, b)
+                match = _query_index(conn, sig, threshold) if sig is not None else None
+                cluster_ids[pos] = match or _new_cluster_id(keys[pos])
+                if sig is not None:
+                    _add_to_index(conn, keys[pos], sig, cluster_ids[pos], epoch[pos])
+            _evict(conn, int((now - INDEX_RETENTION).timestamp()))
+    finally:
+        conn.close()
+
+    df["cluster_id"] = cluster_ids
+    return df
+
+
+def cluster_representatives(df_news: pd.DataFrame) -> pd.DataFrame:
+    """
+    Klaszterenként egy cikk (a legkorábbi). Ha nincs cluster_id oszlop
+    (régi store), előbb klaszterezünk.
+    """
+    if df_news.empty:
+        return df_news
+    if "cluster_id" not in df_news.columns or df_news["cluster_id"].isna().any():
+        df_news = assign_clusters(df_news)
+    return df_news.iloc[_time_order(df_news)].drop_duplicates("cluster_id", keep="first")
@@ -0,0 +1,150 @@
+# modules/rolling_stats.py
+"""
+Gördülő rendezett statisztikák (rank, percentilis, medián, MAD) hosszú ablakokra.
+
+- rank / medián / kvantilis: a pandas rolling() ezekre már skip-list alapú
+  C implementációt használ (O(log w) lépésenként), ezt hívjuk.
+- MAD (median absolute deviation): erre a pandas-ban csak rolling().apply van,
+  ami ablakonként újrarendez (O(w log w) lépésenként, 1m-es adaton használhatatlan).
+  Itt egy rendezett ablakot tartunk karban (bisect): lépésenként egy beszúrás
+  + egy törlés, a mediántól balra és jobbra eső távolságok pedig két rendezett
+  sorozatot adnak, amelyek k-adik eleme bináris kereséssel O(log w) alatt megvan.
+
+  Komplexitás: a pozíció keresése O(log w), de a lista insort / del az elemek
+  elmozgatása miatt O(w) lépésenként, így ez NEM teljesíti az O(log w) célt
+  (összesen O(n * w) memmove). A mozgatás egyetlen memmove (w = 720-nál
+  elhanyagolható); egy valódi O(log w)-os szerkezet (sortedcontainers.SortedList)
+  mérve lassabb volt w = 100 000-ig, mert a k-adik elem keresésének pozíció
+  szerinti indexelése ott O(log w) és drága.
+"""
+
+import math
+from bisect import bisect_left, insort
+
+import numpy as np
+import pandas as pd
+
+
+def _quantile_sorted(win: list, q: float) -> float:
+    """Kvantilis lineáris interpolációval (mint a pandas/numpy 'linear')."""
+    pos = q * (len(win) - 1)
+    lo = int(math.floor(pos))
+    hi = min(lo + 1, len(win) - 1)
+    frac = pos - lo
+    return win[lo] + (win[hi] - win[lo]) * frac
+
+
+def _kth_abs_deviation(win: list, split: int, center: float, k: int) -> float:
+    """
+    A |x - center| távolságok k-adik (0-bázisú) legkisebb eleme.
+
+    A = center - win[split-1], center - win[split-2], ...  (növekvő)
+    B = win[split] - center,   win[split+1] - center, ...  (növekvő)
+    Két rendezett sorozat k-adik eleme: bináris keresés azon, hány elemet
+    veszünk az A-ból.
+    """
+    n_a = split
+    n_b = len(win) - split
+    need = k + 1
+    lo = max(0, need - n_b)
+    hi = min(n_a, need)
+    while lo <= hi:
+        i = (lo + hi) // 2
+        j = need - i
+        # A[i] = center - win[split-1-i], B[j] = win[split+j] - center
+        if i < n_a and j > 0 and win[split + j - 1] - center > center - win[split - 1 - i]:
+            lo = i + 1
+        elif i > 0 and j < n_b and center - win[split - i] > win[split + j] - center:
+            hi = i - 1
+        else:
+            if i == 0:
+                return win[split + j - 1] - center
+            if j == 0:
+                return center - win[split - i]
+            return max(center - win[split - i], win[split + j - 1] - center)
+    raise RuntimeError("MAD keresés nem konvergált (hibás rendezett ablak?)")
+
+
+def _mad_sorted(win: list, median: float) -> float:
+    n = len(win)
+    split = bisect_left(win, median)
+    k = n // 2
+    if n % 2 == 1:
+        return _kth_abs_deviation(win, split, median, k)
+    return 0.5 * (
+        _kth_abs_deviation(win, split, median, k - 1)
+        + _kth_abs_deviation(win, split, median, k)
+    )
+
+
+def _rolling_mad_sorted_window(values: list, window: int, min_periods: int) -> np.ndarray:
+    n = len(values)
+    out = np.full(n, np.nan)
+    win = []
+    for i in range(n):
+        x = values[i]
+        if x == x:  # NaN != NaN
+            insort(win, x)
+        if i >= window:
+            old = values[i - window]
+            if old == old:
+                del win[bisect_left(win, old)]
+
+        cnt = len(win)
+        if cnt == 0 or cnt < min_periods:
+            continue
+        out[i] = _mad_sorted(win, _quantile_sorted(win, 0.5))
+    return out
+
+
+def rolling_order_stats(
+    series: pd.Series,
+    window: int,
+    min_periods: int | None = None,
+    rank: bool = False,
+    median: bool = False,
+    mad: bool = False,
+    quantiles: tuple = (),
+) -> pd.DataFrame:
+    """
+    A kért gördülő rendezett statisztikák egy DataFrame-ben.
+
+    - rank:      a jelenlegi érték percentilis-rangja az ablakon belül (0..1],
+                 azonos értékeknél átlagos ranggal (mint rank(pct=True))
+    - median:    gördülő medián
+    - mad:       gördülő median absolute deviation
+    - quantiles: pl. (0.05, 0.95) -> q05, q95 oszlopok
+
+    A NaN értékek nem számítanak bele az ablakba; egy sor akkor kap értéket,
+    ha az ablakban legalább min_periods (alapból window) érvényes elem van.
+    """
+    if min_periods is None:
+        min_periods = window
+    min_periods = max(1, min_periods)
+
+    series = series.astype(float)
+    roll = series.rolling(window=window, min_periods=min_periods)
+
+    out = {}
+    if rank:
+        out["rank"] = roll.rank(method="average", pct=True)
+    if median:
+        out["median"] = roll.median()
+    if mad:
+        out["mad"] = _rolling_mad_sorted_window(series.tolist(), window, min_periods)
+    for q in quantiles:
+        out[f"q{int(round(q * 100)):02d}"] = roll.quantile(q, interpolation="linear")
+
+    return pd.DataFrame(out, index=series.index)
+
+
+def rolling_rank(series: pd.Series, window: int, min_periods: int | None = None) -> pd.Series:
+    return rolling_order_stats(series, window, min_periods, rank=True)["rank"]
+
+
+def rolling_median(series: pd.Series, window: int, min_periods: int | None = None) -> pd.Series:
+    return rolling_order_stats(series, window, min_periods, median=True)["median"]
+
+
+def rolling_mad(series: pd.Series, window: int, min_periods: int | None = None) -> pd.Series:
+    return rolling_order_stats(series, window, min_periods, mad=True)["mad"]
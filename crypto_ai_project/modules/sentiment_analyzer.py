@@ -1,12 +1,19 @@
 # modules/sentiment_analyzer.py
+import hashlib
+import io
+import json
 import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timedelta, timezone
 from pandas.errors import EmptyDataError
+import numpy as np
 import requests
 import pandas as pd
 import feedparser
 from bs4 import BeautifulSoup
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from lxml import etree
 
 from .config import (
     COINDESK_RSS_URL,
@@ -16,14 +23,26 @@ from .config import (
     NEWS_DATA_CSV,
     SENTIMENT_DATA_CSV,
     TRAINING_SENTIMENT_FEATURES_CSV,
+    TRAINING_SENTIMENT_META_JSON,
     DATA_DIR,
     NEWS_ALLTIME_CSV,
+    ASSET_ALIASES,
+    ASSET_SENTIMENT_CSV,
+    NEWS_SOURCES,
+    NEWS_FETCH_TIMEOUT_SEC,
+    NEWS_RSS_LIMIT,
+    NEWS_USER_AGENT,
 )
+from .data_loader import load_timeseries, parse_timestamps
+from .entity_tagger import explode_assets, tag_assets
+from .sentiment_cache import cached_scores
+from .http_cache import conditional_get, not_modified, remember_validators
+from .news_dedup import assign_clusters, cluster_representatives
+from .sentiment_backends import get_backend
+from .sentiment_stream import update_sentiment_stream
 
 DATA_DIR.mkdir(exist_ok=True, parents=True)
 
-analyzer = SentimentIntensityAnalyzer()
-
 
 # ---------- Segédfüggvények ----------
 
@@ -37,11 +56,41 @@ def _one_month_ago():
 
 # ---------- RSS alapú hírek ----------
 
-def fetch_coindesk_rss(limit=100) -> pd.DataFrame:
+NEWS_COLUMNS = ["timestamp", "source", "title", "summary", "url"]
+
+
+def _http_get(url: str, timeout: float = NEWS_FETCH_TIMEOUT_SEC, **kwargs):
+    r = requests.get(url, timeout=timeout, headers={"User-Agent": NEWS_USER_AGENT}, **kwargs)
+    r.raise_for_status()
+    return r
+
+
+def fetch_rss(
+    url: str,
+    source: str,
+    limit: int = NEWS_RSS_LIMIT,
+    timeout: float = NEWS_FETCH_TIMEOUT_SEC,
+    responses: list | None = None,
+) -> pd.DataFrame:
     """
-    CoinDesk összes hír RSS-ből. :contentReference[oaicite:7]{index=7}
+    Egy RSS feed hírei. A letöltés requests-szel megy (timeout-tal), a
+    feedparser csak a letöltött tartalmat parse-olja.
+
+    Feltételes GET: ha a feed az előző sikeres letöltés óta nem változott
+    (304), nem parse-olunk, és üres DataFrame-et adunk vissza (nincs mit
+    összefésülni).
+
+    A validátorokat (ETag / Last-Modified) itt NEM mentjük: a választ a
+    responses listába tesszük, és a hívó csak a hír store sikeres kiírása után
+    menti őket (remember_validators). Különben egy elveszett frissítés után a
+    következő futás 304-et kapna, és a cikkek soha nem kerülnének be.
     """
-    feed = feedparser.parse(COINDESK_RSS_URL)
+    r = conditional_get(url, timeout=timeout)
+    if not_modified(r):
+        print(f"{source}: a feed nem változott (304), kihagyjuk.")
+        return pd.DataFrame(columns=NEWS_COLUMNS)
+
+    feed = feedparser.parse(r.content)
     rows = []
     for entry in feed.entries[:limit]:
         # published_parsed lehet None, ezért fallback
@@ -52,36 +101,30 @@ def fetch_coindesk_rss(limit=100) -> pd.DataFrame:
         rows.append(
             {
                 "timestamp": ts,
-                "source": "coindesk",
+                "source": source,
                 "title": entry.get("title", ""),
                 "summary": entry.get("summary", ""),
                 "url": entry.get("link", ""),
             }
         )
-    return pd.DataFrame(rows)
+    df = pd.DataFrame(rows, columns=NEWS_COLUMNS)
+    if responses is not None:
+        responses.append(r)
+    return df
+
+
+def fetch_coindesk_rss(limit=NEWS_RSS_LIMIT) -> pd.DataFrame:
+    """
+    CoinDesk összes hír RSS-ből. :contentReference[oaicite:7]{index=7}
+    """
+    return fetch_rss(COINDESK_RSS_URL, "coindesk", limit=limit)
 
 
-def fetch_reddit_crypto_rss(limit=100) -> pd.DataFrame:
+def fetch_reddit_crypto_rss(limit=NEWS_RSS_LIMIT) -> pd.DataFrame:
     """
     Reddit r/CryptoCurrency RSS. Friss posztok. 
     """
-    feed = feedparser.parse(REDDIT_CRYPTO_RSS_URL)
-    rows = []
-    for entry in feed.entries[:limit]:
-        if hasattr(entry, "published_parsed") and entry.published_parsed:
-            ts = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-        else:
-            ts = _now_utc()
-        rows.append(
-            {
-                "timestamp": ts,
-                "source": "reddit_CryptoCurrency",
-                "title": entry.get("title", ""),
-                "summary": entry.get("summary", ""),
-                "url": entry.get("link", ""),
-            }
-        )
-    return pd.DataFrame(rows)
+    return fetch_rss(REDDIT_CRYPTO_RSS_URL, "reddit_CryptoCurrency", limit=limit)
 
 
 # ---------- Cointelegraph HTML parsolás ----------
@@ -124,16 +167,134 @@ def _parse_cointelegraph_relative_date(text: str) -> datetime:
     return now
 
 
-def fetch_cointelegraph_tag_page(tag_url: str) -> pd.DataFrame:
+COINTELEGRAPH_BASE_URL = "https://cointelegraph.com"
+COINTELEGRAPH_SECTIONS = ("/news/", "/markets/", "/bitcoin/")
+
+
+def _cointelegraph_url(href: str) -> str:
+    return href if href.startswith("http") else COINTELEGRAPH_BASE_URL + href
+
+
+def _parse_cointelegraph_time(text: str, attr: str | None) -> datetime:
+    """
+    <time datetime="2025-11-27">3 hours ago</time>: a relatív szöveg pontosabb
+    (órát is tartalmaz), egyébként a datetime attribútum, végül a szöveg.
+    """
+    text = text.strip()
+    if "ago" in text.lower():
+        return _parse_cointelegraph_relative_date(text)
+    if attr:
+        try:
+            ts = datetime.fromisoformat(attr.strip())
+            return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+        except ValueError:
+            pass
+    return _parse_cointelegraph_relative_date(text)
+
+
+class _CointelegraphArticles:
+    """
+    lxml parser target: fát nem épít, a tokenizer eseményeiből csak az
+    <article> elemeken belülieket dolgozza fel. Cikkenként az első szöveges,
+    hír-szekcióba mutató link (cím + href) és az első <time> (szöveg +
+    datetime attribútum) kell. Egymásba ágyazott <article>-ök külön cikkek.
+    """
+
+    def __init__(self):
+        self.articles = []   # lezárt cikkek (kezdő sorszám, adatok)
+        self.stack = []      # nyitott cikkek
+        self.started = 0
+
+    def start(self, tag, attrib):
+        for cur in self.stack:
+            if tag == "a" and cur["title"] is None and "href" in attrib:
+                cur["link"] = (attrib["href"], [])
+            elif tag == "time":
+                if cur["time"] is None:
+                    cur["time"], cur["time_attr"] = [], attrib.get("datetime")
+                    cur["in_time"] = 1
+                elif cur["in_time"]:
+                    cur["in_time"] += 1
+        if tag == "article":
+            self.stack.append({
+                "order": self.started, "title": None, "href": None, "link": None,
+                "time": None, "time_attr": None, "in_time": 0,
+            })
+            self.started += 1
+
+    def end(self, tag):
+        if tag == "article" and self.stack:
+            self.articles.append(self.stack.pop())
+            return
+        for cur in self.stack:
+            if tag == "a" and cur["link"] is not None:
+                href, parts = cur["link"]
+                cur["link"] = None
+                text = "".join(parts).strip()
+                if text and any(sec in href for sec in COINTELEGRAPH_SECTIONS):
+                    cur["title"], cur["href"] = text, href
+            elif tag == "time" and cur["in_time"]:
+                cur["in_time"] -= 1
+
+    def data(self, data):
+        # a szöveg minden nyitott cikk nyitott linkjébe / <time>-jába számít
+        for cur in self.stack:
+            if cur["link"] is not None:
+                cur["link"][1].append(data)
+            if cur["in_time"]:
+                cur["time"].append(data)
+
+    def close(self):
+        return sorted(self.articles, key=lambda a: a["order"])
+
+
+def parse_cointelegraph_tag_page(html: str) -> pd.DataFrame:
     """
-    Egyszerű scraper Cointelegraph tag oldalakról (markets, bitcoin). :contentReference[oaicite:8]{index=8}
+    Cointelegraph tag oldal -> hírek (timestamp, source, title, summary, url).
+
+    Csak a cikklista elemeit (<article>, benne <time>) dolgozzuk fel, lxml
+    parser targettel (_CointelegraphArticles): a dokumentumot a tokenizer
+    végigolvassa, de DOM fa nem épül, és csak a cikkeken belüli eseményekkel
+    foglalkozunk. Cikkenként az első szöveges, hír-szekcióba mutató link a
+    cím + url, a <time> az időpont; a navigáció / lábléc linkjei nem kerülnek be.
 
-    Az oldal HTML-je változhat a jövőben, ez egy best-effort parser:
-    - Keressük azokat a részeket, ahol link + időpont (pl. '3 hours ago' / 'Nov 27, 2025') egymás közelében van.
+    Ha az oldalszerkezet megváltozik és egyetlen cikket sem találunk, a régi
+    (teljes DOM-os, heurisztikus) parserre esünk vissza.
     """
-    r = requests.get(tag_url, timeout=10)
-    r.raise_for_status()
-    soup = BeautifulSoup(r.text, "lxml")
+    if not html or not html.strip():
+        return pd.DataFrame(columns=NEWS_COLUMNS)
+    articles = etree.fromstring(html, etree.HTMLParser(target=_CointelegraphArticles()))
+    rows = []
+    seen = set()
+    for article in articles:
+        if article["time"] is None or not article["title"]:
+            continue
+        url = _cointelegraph_url(article["href"])
+        if url in seen:
+            continue
+        seen.add(url)
+        rows.append(
+            {
+                "timestamp": _parse_cointelegraph_time("".join(article["time"]), article["time_attr"]),
+                "source": "cointelegraph",
+                "title": article["title"],
+                "summary": "",
+                "url": url,
+            }
+        )
+
+    if not rows:
+        return _parse_cointelegraph_soup(html)
+    return pd.DataFrame(rows, columns=NEWS_COLUMNS)
+
+
+def _parse_cointelegraph_soup(html: str) -> pd.DataFrame:
+    """
+    Régi, best-effort parser (fallback): minden <a>-t megnézünk, és a szülő
+    testvérei között keresünk időpont jellegű szöveget (pl. '3 hours ago' /
+    'Nov 27, 2025').
+    """
+    soup = BeautifulSoup(html, "lxml")
 
     rows = []
 
@@ -196,7 +357,16 @@ def fetch_cointelegraph_tag_page(tag_url: str) -> pd.DataFrame:
             }
         )
 
-    df = pd.DataFrame(rows)
+    return pd.DataFrame(rows)
+
+
+def fetch_cointelegraph_tag_page(tag_url: str, timeout: float = NEWS_FETCH_TIMEOUT_SEC) -> pd.DataFrame:
+    """
+    Scraper Cointelegraph tag oldalakról (markets, bitcoin). :contentReference[oaicite:8]{index=8}
+    A parse: parse_cointelegraph_tag_page (cikklista elemek, lxml parser target).
+    """
+    r = _http_get(tag_url, timeout=timeout)
+    df = parse_cointelegraph_tag_page(r.text)
     # Szűrés: csak 1 hónapon belüli hírek
     if not df.empty:
         df = df[df["timestamp"] >= _one_month_ago()]
@@ -204,33 +374,81 @@ def fetch_cointelegraph_tag_page(tag_url: str) -> pd.DataFrame:
 
 
 def fetch_cointelegraph_all_tags() -> pd.DataFrame:
-    dfs = []
-    for url in COINTELEGRAPH_TAG_URLS:
-        try:
-            df = fetch_cointelegraph_tag_page(url)
-            if not df.empty:
-                dfs.append(df)
-        except Exception as e:
-            print(f"Cointelegraph hiba ({url}):", e)
+    sources = [{"kind": "cointelegraph", "source": "cointelegraph", "url": url} for url in COINTELEGRAPH_TAG_URLS]
+    dfs = [df for df in fetch_news_sources(sources) if not df.empty]
     if not dfs:
-        return pd.DataFrame(columns=["timestamp", "source", "title", "summary", "url"])
+        return pd.DataFrame(columns=NEWS_COLUMNS)
     df_all = pd.concat(dfs, axis=0)
     # duplikált cikkek kiszűrése (URL alapján)
     df_all = df_all.drop_duplicates(subset=["url"])
     return df_all
 
 
+# ---------- Párhuzamos letöltés ----------
+
+def _fetch_source(spec: dict, responses: list | None = None) -> pd.DataFrame:
+    timeout = spec.get("timeout", NEWS_FETCH_TIMEOUT_SEC)
+    if spec["kind"] == "rss":
+        return fetch_rss(
+            spec["url"], spec["source"], limit=spec.get("limit", NEWS_RSS_LIMIT), timeout=timeout, responses=responses
+        )
+    if spec["kind"] == "cointelegraph":
+        return fetch_cointelegraph_tag_page(spec["url"], timeout=timeout)
+    raise ValueError(f"Ismeretlen hírforrás típus: {spec['kind']}")
+
+
+def fetch_news_sources(sources=None, responses: list | None = None) -> list:
+    """
+    Az összes hírforrás párhuzamos letöltése (forrásonként egy szál; a
+    letöltés I/O-kötött, a parse kicsi). Forrásonként timeout: a requests
+    timeout-ja mellett a forrás eredményére is legfeljebb ennyit várunk, a
+    lassú / hibás forrást kihagyjuk (a többi eredménye megmarad).
+
+    sources:   forrás leírások (alapból config.NEWS_SOURCES)
+    responses: ha lista, ide kerülnek a sikeres (és határidőn belüli) RSS
+               letöltések HTTP válaszai, a validátorok későbbi mentéséhez
+    Vissza: DataFrame-ek listája (a sikeres források, a sources sorrendjében)
+    """
+    sources = NEWS_SOURCES if sources is None else sources
+    if not sources:
+        return []
+
+    pool = ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="news")
+    try:
+        started = time.monotonic()
+        # forrásonként külön gyűjtő: a lejárt forrás válasza nem kerülhet be
+        pending = [[] for _ in sources]
+        futures = [pool.submit(_fetch_source, spec, got) for spec, got in zip(sources, pending)]
+        results = []
+        for spec, future, got in zip(sources, futures, pending):
+            limit = spec.get("timeout", NEWS_FETCH_TIMEOUT_SEC)
+            remaining = max(0.0, started + limit - time.monotonic())
+            try:
+                results.append(future.result(timeout=remaining))
+                if responses is not None:
+                    responses.extend(got)
+            except FutureTimeout:
+                print(f"{spec['source']} hírforrás időtúllépés ({spec['url']})")
+            except Exception as e:
+                print(f"{spec['source']} hírforrás hiba ({spec['url']}):", e)
+        return results
+    finally:
+        # a lejárt források szálait nem várjuk meg (a requests timeout úgyis leállítja őket)
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 # ---------- Hírek egyesítése + tárolása 1 hónapig ----------
 
 def update_news_store() -> pd.DataFrame:
     """
-    Hírek összegyűjtése:
+    Hírek összegyűjtése (config.NEWS_SOURCES, párhuzamosan):
       - CoinDesk RSS
       - Reddit r/CryptoCurrency RSS
       - Cointelegraph tags (markets, bitcoin)
-    + Deduplikálás URL szerint
+    + Deduplikálás URL szerint, közel-duplikátumok klaszterezése (cluster_id)
+    + Említett eszközök (assets, pl. "BTC|ETH") az entity_tagger-rel
     + Csak az utolsó 30 nap marad meg
-    + Mentés: NEWS_DATA_CSV
+    + Mentés: NEWS_DATA_CSV, utána az RSS feedek HTTP validátorai
     """
     # --- RÉGI CSV BIZTONSÁGOS BEOLVASÁSA ---
     try:
@@ -254,25 +472,8 @@ def update_news_store() -> pd.DataFrame:
             print("NEWS_DATA_CSV nem tartalmaz 'timestamp' oszlopot, eldobjuk a régi adatot.")
             df_old = pd.DataFrame(columns=["timestamp", "source", "title", "summary", "url"])
 
-    dfs_new = []
-
-    try:
-        df_cd = fetch_coindesk_rss(limit=100)
-        dfs_new.append(df_cd)
-    except Exception as e:
-        print("CoinDesk RSS hiba:", e)
-
-    try:
-        df_rd = fetch_reddit_crypto_rss(limit=100)
-        dfs_new.append(df_rd)
-    except Exception as e:
-        print("Reddit RSS hiba:", e)
-
-    try:
-        df_ct = fetch_cointelegraph_all_tags()
-        dfs_new.append(df_ct)
-    except Exception as e:
-        print("Cointelegraph hiba:", e)
+    responses = []
+    dfs_new = fetch_news_sources(responses=responses)
 
     if dfs_new:
         df_new = pd.concat(dfs_new, axis=0)
@@ -298,7 +499,19 @@ def update_news_store() -> pd.DataFrame:
     # rendezés idő szerint
     df_all = df_all.sort_values("timestamp")
 
+    # közel-duplikált (szindikált) cikkek klaszterezése: a régiek cluster_id-ja
+    # marad, az újakat a rolling store LSH indexe ellen soroljuk be
+    df_all = assign_clusters(df_all)
+
+    # eszköz-említések (minden cikkre újra: lineáris, és így az alias szótár
+    # bővítése a régebbi cikkekre is érvényes)
+    df_all["assets"] = tag_assets(df_all)
+
     df_all.to_csv(NEWS_DATA_CSV, index=False)
+
+    # a feedek validátorai csak most, hogy az új cikkek biztosan a store-ban vannak
+    for r in responses:
+        remember_validators(r)
     return df_all
 
 
@@ -344,34 +557,34 @@ def fetch_fear_and_greed_history(days: int = 0) -> pd.DataFrame:
     df_daily["fear_greed"] = df_daily["fear_greed"].ffill()
     return df_daily
 
-def analyze_news_sentiment(df_news: pd.DataFrame) -> pd.DataFrame:
-    if df_news.empty:
-        return df_news
+def score_texts(texts) -> np.ndarray:
+    """
+    Score mátrix (SCORE_FIELDS oszlopokkal: compound, pos, neg, neu) a beállított
+    backenddel (SENTIMENT_BACKEND, alapból VADER).
+    A perzisztens cache-en keresztül: minden szöveg csak egyszer kerül pontozásra,
+    a cache-ben még nem szereplőket batch-ben pontozzuk.
+    """
+    backend = get_backend()
+    return cached_scores(list(texts), backend.score_batch, backend.version)
 
-    def score_row(row):
-        title = row.get("title")
-        summary = row.get("summary")
 
-        # NaN / None → "" és mindenből stringet csinálunk
-        if pd.isna(title):
-            title = ""
-        else:
-            title = str(title)
+def _text_column(df: pd.DataFrame, col: str) -> pd.Series:
+    # NaN / None / hiányzó oszlop -> "", minden más stringgé
+    if col not in df.columns:
+        return pd.Series("", index=df.index)
+    return df[col].where(df[col].notna(), "").astype(str)
 
-        if pd.isna(summary):
-            summary = ""
-        else:
-            summary = str(summary)
 
-        text = title + " " + summary
-        vs = analyzer.polarity_scores(text)
-        return vs["compound"]
+def analyze_news_sentiment(df_news: pd.DataFrame) -> pd.DataFrame:
+    if df_news.empty:
+        return df_news
 
     df = df_news.copy()
-    df["sentiment"] = df.apply(score_row, axis=1)
+    texts = _text_column(df, "title") + " " + _text_column(df, "summary")
+    df["sentiment"] = score_texts(texts)[:, 0]
     return df
 
-def build_sentiment_timeseries() -> pd.DataFrame:
+def build_sentiment_timeseries(incremental: bool = False) -> pd.DataFrame:
     """
     - update_news_store() továbbra is frissíti a NEWS_DATA_CSV-t.
     - Biztos sentiment pontok:
@@ -389,9 +602,27 @@ def build_sentiment_timeseries() -> pd.DataFrame:
         * így a korábbi „mindenhol 0” ratio-k is eltűnnek.
     - SENTIMENT_DATA_CSV:
         * az utolsó 60 nap: timestamp, news_sentiment, fear_greed
+
+    incremental=True: csak azokat a napokat számoljuk újra, amelyek cikkei
+    (klaszter-reprezentánsai) az előző build óta változtak, plusz az
+    interpolációs szakaszt a szomszédos biztos pontok között, és a store-nak
+    csak a végét írjuk felül (_build_sentiment_increment). Teljes build
+    történik, ha még nincs store vagy meta, ill. ha a news_alltime.csv változott.
     """
-    # 0) Friss hírek store (RSS)
+    # 0) Friss hírek store (RSS) + az új cikkek beolvasztása az órás stream állapotba
     df_news = update_news_store()
+    update_sentiment_stream(df_news, analyze_news_sentiment)
+    update_asset_sentiment_store(df_news)
+
+    meta = _load_sentiment_meta()
+    if incremental:
+        reason = _sentiment_full_rebuild_due(meta)
+        if reason is None:
+            df_short = _build_sentiment_increment(df_news, meta)
+            if df_short is not None:
+                return df_short
+        else:
+            print(f"Teljes sentiment újraépítés: {reason}")
 
     # 1) Alltime backbone pontok
     df_alltime_points = compute_alltime_sentiment_points()  # index=date, col=news_sentiment
@@ -492,7 +723,19 @@ def build_sentiment_timeseries() -> pd.DataFrame:
         f"shape: {df_long.shape}"
     )
 
+    _save_sentiment_meta({
+        "last_full_build": pd.Timestamp.now(tz="UTC").isoformat(),
+        "alltime_key": _file_key(NEWS_ALLTIME_CSV),
+        "anchor_dates": [d.strftime("%Y-%m-%d") for d in df_points.index],
+        "day_fingerprints": _day_fingerprints(df_news),
+    })
+
     # 11) Rövid távú idősor a dashboardnak – utolsó 60 nap
+    return _export_short_sentiment(df_long)
+
+
+def _export_short_sentiment(df_long: pd.DataFrame) -> pd.DataFrame:
+    """Az utolsó 60 nap (news_sentiment, fear_greed) a dashboardnak: SENTIMENT_DATA_CSV."""
     cutoff = datetime.now(timezone.utc) - timedelta(days=60)
     df_short = df_long[df_long.index >= cutoff].copy()
 
@@ -506,6 +749,193 @@ def build_sentiment_timeseries() -> pd.DataFrame:
     return df_short
 
 
+# ---------- Inkrementális sentiment build ----------
+
+def _load_sentiment_meta() -> dict:
+    try:
+        with open(TRAINING_SENTIMENT_META_JSON, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_sentiment_meta(meta: dict):
+    TRAINING_SENTIMENT_META_JSON.parent.mkdir(exist_ok=True, parents=True)
+    with open(TRAINING_SENTIMENT_META_JSON, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def _file_key(path):
+    """[mtime_ns, méret] (JSON-ba írható), hiányzó fájlnál None."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _sentiment_full_rebuild_due(meta: dict) -> str | None:
+    """Ha teljes újraépítés kell, az oka; különben None."""
+    if not TRAINING_SENTIMENT_FEATURES_CSV.exists():
+        return "nincs még training_sentiment store"
+    if not meta.get("anchor_dates"):
+        return "nincs meta információ a biztos pontokról"
+    if meta.get("alltime_key") != _file_key(NEWS_ALLTIME_CSV):
+        return "a news_alltime.csv megváltozott"
+    return None
+
+
+def _news_days(df_news: pd.DataFrame) -> pd.Series:
+    """A cikkek napja (tz-naiv, napra kerekítve; hibás timestamp: NaT)."""
+    ts = pd.to_datetime(df_news["timestamp"], errors="coerce", utc=True)
+    return ts.dt.tz_convert(None).dt.floor("D")
+
+
+def _day_fingerprints(df_news: pd.DataFrame) -> dict:
+    """
+    Napi ujjlenyomat: {"YYYY-MM-DD": a nap klaszter-reprezentánsainak rendezett
+    cluster_id-jaiból képzett hash}. Új (nem duplikált) cikk -> változik a nap hash-e.
+    """
+    if df_news.empty:
+        return {}
+    reps = cluster_representatives(df_news)
+    days = _news_days(reps).dt.strftime("%Y-%m-%d")
+    fingerprints = {}
+    for day, ids in reps["cluster_id"].astype(str).groupby(days.to_numpy()):
+        digest = hashlib.blake2b("\n".join(sorted(ids)).encode("utf-8"), digest_size=8)
+        fingerprints[day] = digest.hexdigest()
+    return fingerprints
+
+
+def _read_store_tail(path, n_rows: int):
+    """
+    A CSV utolsó n_rows sora (a fájl végéről visszafelé olvasva, a teljes store
+    beolvasása nélkül) és az első visszaadott sor byte-offsetje: a fájl ettől
+    kezdve csonkolható és írható újra.
+    """
+    block = 1 << 16
+    with open(path, "rb") as f:
+        header = f.readline()
+        f.seek(0, 2)
+        pos = f.tell()
+        data = b""
+        while pos > len(header) and data.count(b"\n") <= n_rows:
+            step = min(block, pos - len(header))
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines(keepends=True)
+    skipped, lines = lines[:-n_rows], lines[-n_rows:]
+    offset = pos + sum(len(line) for line in skipped)
+    df = pd.read_csv(io.StringIO((header + b"".join(lines)).decode("utf-8")))
+    df.index = parse_timestamps(df.pop("timestamp")).rename("timestamp")
+    return offset, df
+
+
+def _build_sentiment_increment(df_news: pd.DataFrame, meta: dict) -> pd.DataFrame | None:
+    """
+    A training_sentiment store frissítése helyben, csak a változott szakaszon.
+
+    - érintett napok: a 30 napos ablak teljes napjai, amelyek ujjlenyomata
+      eltér a metában tárolttól (az ablak első, csonka napját kihagyjuk,
+      különben a kieső cikkek miatt újraszámolnánk)
+    - ezekre a napokra újra aggregálunk (a score-ok a cache-ből jönnek),
+      és biztos ponttá válnak
+    - news_sentiment: az első érintett (ill. új) nap előtti legközelebbi
+      biztos ponttól a store végéig újrainterpolálunk
+    - Fear & Greed: csak az utolsó mentett nap óta
+    - a fájl a felülírt szakasz elejétől csonkolva, újraírva (legalább az utolsó
+      60 nap, ebből lesz a SENTIMENT_DATA_CSV)
+
+    A 30 napos ablakból kiesett napok értékei (és arányai) maradnak.
+    None: az inkrementális út nem járható (pl. nincs korábbi biztos pont), teljes build kell.
+    """
+    path = TRAINING_SENTIMENT_FEATURES_CSV
+    today = pd.Timestamp(datetime.now().date())
+    first_full_day = pd.Timestamp(_one_month_ago().date()) + pd.Timedelta(days=1)
+
+    fingerprints = _day_fingerprints(df_news)
+    old_fingerprints = meta.get("day_fingerprints", {})
+    affected = sorted(
+        pd.Timestamp(day)
+        for day, fp in fingerprints.items()
+        if pd.Timestamp(day) >= first_full_day and old_fingerprints.get(day) != fp
+    )
+
+    _, df_last = _read_store_tail(path, 1)
+    if df_last.empty:
+        print("A training_sentiment store üres, teljes build.")
+        return None
+    store_last = df_last.index[-1].tz_convert(None)
+
+    anchors = pd.DatetimeIndex(pd.to_datetime(meta["anchor_dates"])).union(pd.DatetimeIndex(affected))
+    changed = affected + ([store_last + pd.Timedelta(days=1)] if store_last < today else [])
+    rewrite_from = min(today - pd.Timedelta(days=60), store_last)
+    interp_from = None
+    if changed:
+        before = anchors[anchors < min(changed)]
+        if before.empty:
+            print("Nincs biztos pont az érintett napok előtt, teljes build.")
+            return None
+        interp_from = before[-1]
+        rewrite_from = min(rewrite_from, interp_from)
+
+    n_rows = (store_last - rewrite_from).days + 1
+    offset, df_tail = _read_store_tail(path, n_rows)
+    expected = pd.date_range(rewrite_from, store_last, freq="1D", tz="UTC")
+    if not df_tail.index.equals(expected):
+        print("A training_sentiment store nem folytonos napi idősor, teljes build.")
+        return None
+
+    df_tail = df_tail.reindex(pd.date_range(rewrite_from, max(today, store_last), freq="1D", tz="UTC"))
+    df_tail.index.name = "timestamp"
+
+    # 1) érintett napok újra-aggregálása (a klaszter-reprezentánsokat a teljes ablakon választjuk)
+    if affected:
+        reps = cluster_representatives(df_news)
+        df_stats = build_recent_news_sentiment_from_store(reps[_news_days(reps).isin(affected)])
+        df_stats.index = df_stats.index.tz_localize("UTC")
+        for col in df_stats.columns:
+            df_tail.loc[df_stats.index, col] = df_stats[col].to_numpy()
+
+    # 2) interpoláció a módosult szakaszon (a biztos pontok értéke marad)
+    if interp_from is not None:
+        seg = df_tail.index >= interp_from.tz_localize("UTC")
+        is_anchor = df_tail.index.tz_convert(None).isin(anchors)
+        points = df_tail.loc[seg, "news_sentiment"].where(is_anchor[seg])
+        df_tail.loc[seg, "news_sentiment"] = points.interpolate(method="time", limit_direction="both")
+    df_tail["news_sentiment_std"] = df_tail["news_sentiment_std"].fillna(0.0)
+
+    # 3) Fear & Greed az utolsó mentett nap óta (+ az utolsó nap, ha közben frissült)
+    fng_days = min(60, max(2, (today - store_last).days + 2))
+    try:
+        df_fng_daily = fetch_fear_and_greed_history(days=fng_days)
+    except Exception as e:
+        print(f"Fear&Greed history lekérése nem sikerült: {e}")
+        df_fng_daily = pd.DataFrame(columns=["fear_greed"])
+    if not df_fng_daily.empty:
+        fng = df_fng_daily["fear_greed"].dropna()
+        fng.index = fng.index.tz_localize("UTC")
+        fng = fng[fng.index.isin(df_tail.index)]
+        df_tail.loc[fng.index, "fear_greed"] = fng.to_numpy(dtype=float)
+
+    # 4) a store vége: csonkolás a felülírt szakasz elejéig, majd hozzáfűzés
+    with open(path, "r+b") as f:
+        f.truncate(offset)
+    df_tail.to_csv(path, mode="a", header=False)
+    print(
+        f"Training_sentiment_features frissítve (inkrementális): {path}, "
+        f"érintett napok: {len(affected)}, újraírt sorok: {len(df_tail)}"
+    )
+
+    meta["anchor_dates"] = [d.strftime("%Y-%m-%d") for d in anchors]
+    meta["day_fingerprints"] = fingerprints
+    meta["last_incremental_build"] = pd.Timestamp.now(tz="UTC").isoformat()
+    _save_sentiment_meta(meta)
+
+    return _export_short_sentiment(df_tail)
+
+
 def build_news_sentiment_from_alltime_csv() -> pd.DataFrame:
     """
     Az új data/raw/news_alltime.csv alapján épít egy NAPI news_sentiment idősor history-t.
@@ -534,16 +964,8 @@ def build_news_sentiment_from_alltime_csv() -> pd.DataFrame:
 
     df["date"] = df["date"].dt.floor("D")
 
-    # VADER sentiment minden sorra
-    def score_text(txt: str) -> float:
-        if pd.isna(txt):
-            txt = ""
-        else:
-            txt = str(txt)
-        vs = analyzer.polarity_scores(txt)
-        return vs["compound"]
-
-    df["news_sentiment"] = df["news"].apply(score_text)
+    # VADER sentiment minden sorra (cache-elt)
+    df["news_sentiment"] = score_texts(_text_column(df, "news"))[:, 0]
 
     # 🔹 NAPI aggregálás: ha ugyanarra a napra több sor van, átlagoljuk
     grouped = df.groupby("date")
@@ -593,6 +1015,7 @@ def build_recent_news_sentiment_from_store(df_news: pd.DataFrame) -> pd.DataFram
       - bullish_ratio
       - bearish_ratio
     (itt van értelme a ratio-knak, mert több cikk/napi sor van)
+    Közel-duplikált cikkekből (cluster_id) csak egy számít.
     """
     if df_news.empty:
         return pd.DataFrame(
@@ -610,7 +1033,8 @@ def build_recent_news_sentiment_from_store(df_news: pd.DataFrame) -> pd.DataFram
             columns=["news_sentiment", "news_sentiment_std", "bullish_ratio", "bearish_ratio"]
         )
 
-    df_scored = analyze_news_sentiment(df_news)
+    # közel-duplikátumokból csak a klaszter reprezentánsa számít (pontozás + arányok)
+    df_scored = analyze_news_sentiment(cluster_representatives(df_news))
 
     # tz-aware → tz-naiv, napra kerekítve
     df_scored["date"] = df_scored["timestamp"].dt.tz_convert(None).dt.floor("D")
@@ -628,6 +1052,73 @@ def build_recent_news_sentiment_from_store(df_news: pd.DataFrame) -> pd.DataFram
     return df_daily
 
 
+def build_asset_sentiment_daily(df_news: pd.DataFrame) -> pd.DataFrame:
+    """
+    Napi per-eszköz sentiment a hír store-ból (klaszter-reprezentánsok, assets oszlop).
+    Vissza: index = date (tz-naiv), eszközönként (a = kisbetűs ticker):
+      news_sentiment_a, news_sentiment_std_a, news_count_a, bullish_ratio_a, bearish_ratio_a
+    Egy cikk minden említett eszközéhez beszámít; ahol egy eszközről aznap nincs
+    cikk: count 0, a többi NaN.
+    """
+    if df_news.empty:
+        return pd.DataFrame()
+
+    df_reps = cluster_representatives(df_news)
+    if "assets" not in df_reps.columns:
+        df_reps = df_reps.assign(assets=tag_assets(df_reps))
+    df_scored = analyze_news_sentiment(df_reps)
+    df_scored["date"] = _news_days(df_scored)
+    df_scored = explode_assets(df_scored.dropna(subset=["date"]))
+    if df_scored.empty:
+        return pd.DataFrame()
+
+    grouped = df_scored.groupby(["date", "asset"])["sentiment"]
+    stats = pd.DataFrame({
+        "news_sentiment": grouped.mean(),
+        "news_sentiment_std": grouped.std().fillna(0.0),
+        "news_count": grouped.size(),
+        "bullish_ratio": grouped.agg(lambda x: (x > 0).mean()),
+        "bearish_ratio": grouped.agg(lambda x: (x < 0).mean()),
+    }).unstack("asset")
+
+    days = pd.date_range(stats.index.min(), stats.index.max(), freq="1D", name="date")
+    stats = stats.reindex(days)
+    out = {}
+    for asset in ASSET_ALIASES:
+        for col in ("news_sentiment", "news_sentiment_std", "news_count", "bullish_ratio", "bearish_ratio"):
+            values = stats[(col, asset)] if (col, asset) in stats.columns else pd.Series(float("nan"), index=days)
+            out[f"{col}_{asset.lower()}"] = values.fillna(0) if col == "news_count" else values
+    return pd.DataFrame(out, index=days)
+
+
+def update_asset_sentiment_store(df_news: pd.DataFrame) -> pd.DataFrame:
+    """
+    ASSET_SENTIMENT_CSV frissítése: a hír store teljes napjai felülírják a
+    korábbi értékeket, a 30 napos ablakból kiesett napok maradnak (az ablak
+    első, csonka napja csak akkor kerül be, ha még nincs a store-ban).
+
+    A sorok időbélyege a nap VÉGE (másnap 00:00 UTC), mint a cross_asset és a
+    sentiment_stream feature-öknél: a napi érték csak ekkor ismert, így az
+    as-of illesztés nem lát a jövőbe.
+    """
+    df_new = build_asset_sentiment_daily(df_news)
+    df_old = load_timeseries(ASSET_SENTIMENT_CSV, use_cache=False)
+    if df_new.empty:
+        return df_old
+
+    df_new.index = df_new.index.tz_localize("UTC") + pd.Timedelta(days=1)
+    df_new.index.name = "timestamp"
+    if not df_old.empty:
+        # az első teljes nap vége (a címkék nap végiek)
+        first_full_day_end = pd.Timestamp(_one_month_ago().date(), tz="UTC") + pd.Timedelta(days=2)
+        df_new = df_new[(df_new.index >= first_full_day_end) | ~df_new.index.isin(df_old.index)]
+        df_new = pd.concat([df_old[~df_old.index.isin(df_new.index)], df_new], axis=0).sort_index()
+
+    ASSET_SENTIMENT_CSV.parent.mkdir(exist_ok=True, parents=True)
+    df_new.to_csv(ASSET_SENTIMENT_CSV, index_label="timestamp")
+    print(f"Per-eszköz sentiment mentve: {ASSET_SENTIMENT_CSV}, shape: {df_new.shape}")
+    return df_new
+
 def compute_alltime_sentiment_points() -> pd.DataFrame:
     """
     news_alltime.csv -> biztos pontok (ritkább, pl. havi) sentiment értékkel.
@@ -653,15 +1144,7 @@ def compute_alltime_sentiment_points() -> pd.DataFrame:
 
     df["date"] = df["date"].dt.floor("D")
 
-    def score_text(txt: str) -> float:
-        if pd.isna(txt):
-            txt = ""
-        else:
-            txt = str(txt)
-        vs = analyzer.polarity_scores(txt)
-        return vs["compound"]
-
-    df["news_sentiment"] = df["news"].apply(score_text)
+    df["news_sentiment"] = score_texts(_text_column(df, "news"))[:, 0]
 
     # ha egy napra több sor van, átlagoljuk
     df_daily = (
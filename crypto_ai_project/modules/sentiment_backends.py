@@ -0,0 +1,189 @@
+# modules/sentiment_backends.py
+"""
+Cserélhető sentiment scorer backendek közös interfésszel.
+
+Minden backend:
+    name                -> "vader", "onnx", ...
+    version             -> a score cache kulcsának része (backend / modell váltásnál
+                           a régi score-ok automatikusan érvénytelenek)
+    warm_up()           -> a modell / analyzer betöltése (az első hívás előtt)
+    score_batch(texts)  -> ndarray (len(texts), len(SCORE_FIELDS)),
+                           oszlopok: compound, pos, neg, neu
+
+Backendek:
+- vader: a batch-elt VADER motor (sentiment_batch.score_matrix; nagy bemenetnél
+  folyamat-pool, kicsinél a hívó folyamat egyetlen analyzere)
+- onnx:  helyi CPU transformer (pl. FinBERT / twitter-roberta exportja) ONNX
+  Runtime-mal, SENTIMENT_ONNX_MODEL_DIR alatt: model.onnx, tokenizer.json és
+  opcionálisan labels.json (a kimeneti osztályok sorrendje, alapból
+  negative, neutral, positive). compound = P(pos) - P(neg). Opcionális függőség
+  (onnxruntime, tokenizers), csak ennek a backendnek a létrehozásakor kell.
+  Dinamikus kötegelés: a szövegeket token-hossz szerint rendezve úgy kötegeljük,
+  hogy köteg × leghosszabb elem <= SENTIMENT_BATCH_TOKENS (minimális padding).
+
+get_backend() folyamatonként egy, már bemelegített példányt ad vissza
+(a modell betöltése csak egyszer történik meg).
+"""
+
+import hashlib
+import json
+from importlib.metadata import PackageNotFoundError, version as package_version
+from pathlib import Path
+
+import numpy as np
+
+from .config import (
+    SENTIMENT_BACKEND,
+    SENTIMENT_BATCH_TOKENS,
+    SENTIMENT_ONNX_MAX_TOKENS,
+    SENTIMENT_ONNX_MODEL_DIR,
+)
+from . import sentiment_batch
+from .sentiment_cache import SCORE_FIELDS
+
+ONNX_DEFAULT_LABELS = ("negative", "neutral", "positive")
+
+# backend név -> bemelegített példány (folyamatonként)
+_INSTANCES = {}
+
+
+class VaderBackend:
+    name = "vader"
+
+    def __init__(self):
+        try:
+            self.version = f"vader-{package_version('vaderSentiment')}"
+        except PackageNotFoundError:
+            self.version = "vader"
+
+    def warm_up(self):
+        # a hívó folyamat analyzere (kis bemenetnél ezt használja a score_matrix)
+        sentiment_batch.warm_up()
+
+    def score_batch(self, texts) -> np.ndarray:
+        return sentiment_batch.score_matrix(texts)
+
+
+def _dynamic_batches(lengths, budget: int) -> list:
+    """
+    Index-kötegek token-hossz szerint rendezve: egy kötegbe addig kerül elem,
+    amíg (elemszám × a leghosszabb elem) <= budget. Egyetlen túl hosszú elem
+    is külön köteget kap.
+    """
+    order = np.argsort(np.asarray(lengths), kind="stable")
+    batches, current, longest = [], [], 0
+    for i in order:
+        longest_new = max(longest, int(lengths[i]))
+        if current and longest_new * (len(current) + 1) > budget:
+            batches.append(np.array(current))
+            current, longest_new = [], int(lengths[i])
+        current.append(i)
+        longest = longest_new
+    if current:
+        batches.append(np.array(current))
+    return batches
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(
+        self,
+        model_dir=SENTIMENT_ONNX_MODEL_DIR,
+        max_tokens: int = SENTIMENT_ONNX_MAX_TOKENS,
+        batch_tokens: int = SENTIMENT_BATCH_TOKENS,
+    ):
+        model_dir = Path(model_dir)
+        self.model_path = model_dir / "model.onnx"
+        self.tokenizer_path = model_dir / "tokenizer.json"
+        if not self.model_path.exists() or not self.tokenizer_path.exists():
+            raise RuntimeError(
+                f"Az ONNX sentiment modell hiányzik: {model_dir} (model.onnx + tokenizer.json kell)."
+            )
+        labels_path = model_dir / "labels.json"
+        labels = ONNX_DEFAULT_LABELS
+        if labels_path.exists():
+            with open(labels_path, "r", encoding="utf-8") as f:
+                labels = tuple(l.lower() for l in json.load(f))
+        try:
+            self.label_pos = [labels.index(l) for l in ("positive", "negative", "neutral")]
+        except ValueError:
+            raise RuntimeError(f"labels.json-ben positive / negative / neutral kell, ez van: {labels}")
+
+        digest = hashlib.blake2b(digest_size=8)
+        with open(self.model_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        self.version = f"onnx-{digest.hexdigest()}-{max_tokens}"
+        self.max_tokens = max_tokens
+        self.batch_tokens = batch_tokens
+        self.session = None
+        self.tokenizer = None
+
+    def warm_up(self):
+        if self.session is not None:
+            return
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise RuntimeError(f"Az onnx backendhez onnxruntime és tokenizers kell ({e}).") from e
+
+        self.tokenizer = Tokenizer.from_file(str(self.tokenizer_path))
+        self.tokenizer.enable_truncation(self.max_tokens)
+        self.tokenizer.no_padding()
+        self.session = ort.InferenceSession(str(self.model_path), providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _run(self, encodings) -> np.ndarray:
+        width = max(len(e.ids) for e in encodings)
+        ids = np.zeros((len(encodings), width), dtype=np.int64)
+        mask = np.zeros_like(ids)
+        for row, enc in enumerate(encodings):
+            ids[row, :len(enc.ids)] = enc.ids
+            mask[row, :len(enc.ids)] = 1
+        feed = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feed["token_type_ids"] = np.zeros_like(ids)
+        logits = self.session.run(None, {k: v for k, v in feed.items() if k in self.input_names})[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+    def score_batch(self, texts) -> np.ndarray:
+        self.warm_up()
+        texts = list(texts)
+        out = np.empty((len(texts), len(SCORE_FIELDS)))
+        if not texts:
+            return out
+        encodings = self.tokenizer.encode_batch(texts)
+        lengths = [max(1, len(e.ids)) for e in encodings]
+        for idx in _dynamic_batches(lengths, self.batch_tokens):
+            probs = self._run([encodings[i] for i in idx])
+            pos, neg, neu = (probs[:, k] for k in self.label_pos)
+            out[idx] = np.column_stack([pos - neg, pos, neg, neu])
+        return out
+
+
+BACKENDS = {
+    "vader": VaderBackend,
+    "onnx": OnnxBackend,
+}
+
+
+def get_backend(name: str | None = None):
+    """A megnevezett (None = SENTIMENT_BACKEND) backend megosztott, bemelegített példánya."""
+    name = (name or SENTIMENT_BACKEND).lower()
+    backend = _INSTANCES.get(name)
+    if backend is None:
+        if name not in BACKENDS:
+            raise ValueError(f"Ismeretlen sentiment backend: {name} (választható: {', '.join(BACKENDS)})")
+        backend = BACKENDS[name]()
+        backend.warm_up()
+        _INSTANCES[name] = backend
+    return backend
+
+
+def score_batch(texts, backend: str | None = None) -> np.ndarray:
+    """Score mátrix (len(texts), len(SCORE_FIELDS)) a kiválasztott backenddel (cache nélkül)."""
+    return get_backend(backend).score_batch(texts)
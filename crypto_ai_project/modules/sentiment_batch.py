@@ -0,0 +1,78 @@
+# modules/sentiment_batch.py
+"""
+Batch-elt VADER pontozás nagy hír-korpuszokra (több éves backfill).
+
+A szövegeket SENTIMENT_CHUNK_SIZE méretű darabokra bontjuk, és egy
+folyamat-poolon pontozzuk (a VADER tisztán Python, a GIL miatt szálakkal nem
+gyorsulna). Minden worker egyszer hozza létre az analyzert (initializer), utána
+csak szöveg-chunkokat kap, és chunkonként egyetlen numpy tömböt ad vissza.
+
+Kis bemenetnél (SENTIMENT_PARALLEL_MIN alatt) a pool indítása többe kerülne,
+mint a pontozás, ilyenkor a hívó folyamatban pontozunk.
+
+Eredmény: (szöveg, SCORE_FIELDS) mátrix a bemenet sorrendjében; a pipeline a
+sentiment_backends "vader" backendjén keresztül használja.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import SENTIMENT_CHUNK_SIZE, SENTIMENT_PARALLEL_MIN, SENTIMENT_WORKERS
+from .sentiment_cache import SCORE_FIELDS
+
+# worker-folyamatonkénti analyzer (az initializer, ill. az első hívás hozza létre)
+_WORKER = {}
+
+
+def _init_worker():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    _WORKER["analyzer"] = SentimentIntensityAnalyzer()
+
+
+def warm_up():
+    """A hívó folyamat analyzerének létrehozása (ha még nincs)."""
+    if "analyzer" not in _WORKER:
+        _init_worker()
+
+
+def _score_chunk(texts) -> np.ndarray:
+    warm_up()
+    polarity = _WORKER["analyzer"].polarity_scores
+    out = np.empty((len(texts), len(SCORE_FIELDS)))
+    for i, text in enumerate(texts):
+        vs = polarity(text)
+        out[i] = [vs[f] for f in SCORE_FIELDS]
+    return out
+
+
+def score_matrix(
+    texts,
+    workers: int | None = SENTIMENT_WORKERS,
+    chunk_size: int = SENTIMENT_CHUNK_SIZE,
+    min_parallel: int = SENTIMENT_PARALLEL_MIN,
+) -> np.ndarray:
+    """
+    VADER score mátrix (len(texts), len(SCORE_FIELDS)).
+
+    texts:        stringek (a hívó normalizál / tisztít)
+    workers:      folyamatok száma (None = CPU-k száma, 1 = a hívó folyamatban)
+    chunk_size:   ennyi szöveg megy egy worker-hívásba
+    min_parallel: ez alatt a szövegszám alatt nincs pool
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    n_chunks = -(-len(texts) // chunk_size)
+    workers = max(1, min(workers, n_chunks))
+    if workers == 1 or len(texts) < min_parallel:
+        return _score_chunk(texts)
+
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+        parts = list(pool.map(_score_chunk, chunks))
+    return np.concatenate(parts, axis=0)
+
@@ -0,0 +1,124 @@
+# modules/sentiment_cache.py
+"""
+Perzisztens per-cikk sentiment score cache (sqlite).
+
+Kulcs: a normalizált szöveg tartalom-hash-e + a scorer verziója, így
+ugyanaz a cikk (bármelyik forrásból, bármelyik futásban / folyamatban)
+pontosan egyszer kerül pontozásra; scorer-váltásnál (pl. új VADER verzió)
+a régi score-ok automatikusan érvénytelenek.
+
+Normalizálás: Unicode NFC, a whitespace-sorozatok egy szóközre, a szélek
+levágva. A kis-/nagybetűt és az írásjeleket megtartjuk, mert a VADER
+ezekre érzékeny (pl. "GREAT!!!" erősebb, mint "great").
+
+Tárolás: sqlite WAL módban (egyidejű olvasók + egy író, busy timeout-tal),
+cikkenként a teljes score vektor (SCORE_FIELDS).
+"""
+
+import hashlib
+import re
+import sqlite3
+import unicodedata
+
+import numpy as np
+
+from .config import SENTIMENT_CACHE_DB
+
+SCORE_FIELDS = ("compound", "pos", "neg", "neu")
+SQLITE_MAX_PARAMS = 900
+BUSY_TIMEOUT_SEC = 30
+
+_WS_RE = re.compile(r"\s+")
+
+
+def normalize_text(text) -> str:
+    """NaN / None -> "", egyébként NFC + whitespace összevonás."""
+    if text is None or (isinstance(text, float) and text != text):
+        return ""
+    text = unicodedata.normalize("NFC", str(text))
+    return _WS_RE.sub(" ", text).strip()
+
+
+def text_key(normalized: str) -> str:
+    """A (már normalizált) szöveg tartalom-hash-e."""
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _connect(path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SEC)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    cols = ", ".join(f"{f} REAL NOT NULL" for f in SCORE_FIELDS)
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS scores (key TEXT NOT NULL, version TEXT NOT NULL, {cols}, "
+        "PRIMARY KEY (key, version)) WITHOUT ROWID"
+    )
+    return conn
+
+
+def _lookup(conn, keys: list, version: str) -> dict:
+    found = {}
+    fields = ", ".join(SCORE_FIELDS)
+    for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+        part = keys[start:start + SQLITE_MAX_PARAMS]
+        marks = ",".join("?" * len(part))
+        rows = conn.execute(
+            f"SELECT key, {fields} FROM scores WHERE version = ? AND key IN ({marks})",
+            [version] + part,
+        )
+        for key, *values in rows:
+            found[key] = values
+    return found
+
+
+def _store(conn, keys: list, scores: np.ndarray, version: str):
+    marks = ",".join("?" * (2 + len(SCORE_FIELDS)))
+    with conn:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO scores (key, version, {', '.join(SCORE_FIELDS)}) VALUES ({marks})",
+            [(k, version, *map(float, row)) for k, row in zip(keys, scores)],
+        )
+
+
+def cached_scores(texts, score_fn, version: str, path=SENTIMENT_CACHE_DB) -> np.ndarray:
+    """
+    Score mátrix (len(texts), len(SCORE_FIELDS)) a cache-en keresztül.
+
+    score_fn: list[str] (normalizált, egyedi szövegek) -> (m, len(SCORE_FIELDS)) tömb;
+              csak a cache-ben még nem szereplő szövegekre hívjuk
+    version:  a scorer azonosítója (a kulcs része)
+    path:     sqlite fájl; None = cache nélkül (minden egyedi szöveget pontozunk)
+    """
+    normalized = [normalize_text(t) for t in texts]
+    keys = [text_key(t) for t in normalized]
+    unique = dict(zip(keys, normalized))
+
+    conn = _connect(path) if path is not None else None
+    try:
+        found = _lookup(conn, list(unique), version) if conn is not None else {}
+        missing = [k for k in unique if k not in found]
+        if missing:
+            scores = np.asarray(score_fn([unique[k] for k in missing]), dtype=float)
+            scores = scores.reshape(len(missing), len(SCORE_FIELDS))
+            found.update(zip(missing, scores))
+            if conn is not None:
+                _store(conn, missing, scores, version)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    out = np.empty((len(keys), len(SCORE_FIELDS)))
+    for i, k in enumerate(keys):
+        out[i] = found[k]
+    return out
+
+
+def cache_size(version: str | None = None, path=SENTIMENT_CACHE_DB) -> int:
+    """A cache-elt score-ok száma (version megadásával csak az adott scorer-é)."""
+    conn = _connect(path)
+    try:
+        if version is None:
+            return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+        return conn.execute("SELECT COUNT(*) FROM scores WHERE version = ?", (version,)).fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,217 @@
+# modules/sentiment_stream.py
+"""
+Streaming (órás / SENTIMENT_BUCKET felbontású) hírsentiment aggregálás.
+
+A napi sentiment store (TRAINING_SENTIMENT_FEATURES_CSV) az órás training
+store-ban lépcsős függvény. Itt bucketenként futó állapotot tartunk:
+
+    count, mean, m2 (Welford), bull (compound > 0), bear (compound < 0)
+
+Az új cikkek score-jait bucketenként csoportosítjuk, és a meglévő állapottal
+Chan-féle párhuzamos képlettel vonjuk össze, így egy frissítés csak az új
+cikkeken fut (a hír store-t és a korábbi score-okat nem kell újra végignézni).
+Hogy melyik cikk új, a már beszámolt cluster_id-k halmaza dönti el (közel-duplikált
+cikkekből csak a klaszter reprezentánsa számít, egyszer, az első látott bucketben).
+
+Feature-ök (stream_features): bucketenkénti darabszám, átlag, szórás, bull / bear
+arány, valamint lecsengő "news pressure" (a cikkszám, ill. a compound összeg
+exponenciálisan súlyozott összege, SENTIMENT_PRESSURE_HALFLIVES_H felezési
+idővel). A sorok időbélyege a bucket VÉGE: a bucket értéke csak ekkor ismert,
+így az as-of illesztés nem lát a jövőbe.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import (
+    SENTIMENT_BUCKET,
+    SENTIMENT_PRESSURE_HALFLIVES_H,
+    SENTIMENT_STREAM_CSV,
+    SENTIMENT_STREAM_META_JSON,
+)
+from .data_loader import load_timeseries
+from .news_dedup import cluster_representatives
+
+STATE_COLUMNS = ("count", "mean", "m2", "bull", "bear")
+
+# a beszámolt klasztereket ennyi ideig tartjuk számon (a hír store 30 napos)
+SEEN_RETENTION = pd.Timedelta(days=35)
+
+
+def empty_state() -> pd.DataFrame:
+    index = pd.DatetimeIndex([], tz="UTC", name="timestamp")
+    return pd.DataFrame({c: np.empty(0) for c in STATE_COLUMNS}, index=index)
+
+
+def fold_scores(state: pd.DataFrame, timestamps, compound, bucket: str = SENTIMENT_BUCKET) -> pd.DataFrame:
+    """
+    Új score-ok beolvasztása a bucket-állapotba (index = bucket kezdete, UTC).
+
+    Bucketenként a batch (n_b, mean_b, m2_b) és a meglévő (n_a, mean_a, m2_a)
+    összevonása:
+        n = n_a + n_b,  delta = mean_b - mean_a
+        mean = mean_a + delta * n_b / n
+        m2 = m2_a + m2_b + delta^2 * n_a * n_b / n
+    """
+    ts = pd.DatetimeIndex(pd.to_datetime(timestamps, utc=True, errors="coerce"))
+    x = np.asarray(compound, dtype=float)
+    ok = ~(ts.isna() | np.isnan(x))
+    if not ok.any():
+        return state
+
+    df = pd.DataFrame({"x": x[ok]}, index=ts[ok].floor(bucket))
+    grouped = df.groupby(level=0)["x"]
+    n_b = grouped.count().astype(float)
+    mean_b = grouped.mean()
+    m2_b = (df["x"] - mean_b.reindex(df.index).to_numpy()).pow(2).groupby(level=0).sum()
+    bull_b = (df["x"] > 0).groupby(level=0).sum().astype(float)
+    bear_b = (df["x"] < 0).groupby(level=0).sum().astype(float)
+
+    index = state.index.union(n_b.index)
+    old = state.reindex(index, fill_value=0.0)
+    n_a, mean_a, m2_a = old["count"], old["mean"], old["m2"]
+    n_b, mean_b, m2_b = (s.reindex(index, fill_value=0.0) for s in (n_b, mean_b, m2_b))
+
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    share = (n_b / n.where(n > 0)).fillna(0.0)
+
+    out = pd.DataFrame(index=index)
+    out["count"] = n
+    out["mean"] = mean_a + delta * share
+    out["m2"] = m2_a + m2_b + delta.pow(2) * n_a * share
+    out["bull"] = old["bull"] + bull_b.reindex(index, fill_value=0.0)
+    out["bear"] = old["bear"] + bear_b.reindex(index, fill_value=0.0)
+    out.index.name = "timestamp"
+    return out
+
+
+def _load_meta(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def load_stream(path=SENTIMENT_STREAM_CSV, meta_path=SENTIMENT_STREAM_META_JSON, bucket: str = SENTIMENT_BUCKET):
+    """(állapot, meta). Más bucket mérettel mentett állapotot nem használunk."""
+    meta = _load_meta(meta_path)
+    if meta.get("bucket") != bucket:
+        if meta:
+            print(f"Sentiment stream: a bucket méret megváltozott ({meta.get('bucket')} -> {bucket}), "
+                  "az állapot a hír store-ból épül újra.")
+        return empty_state(), {"bucket": bucket, "seen": {}}
+    state = load_timeseries(path, use_cache=False)
+    if state.empty:
+        state = empty_state()
+    return state[list(STATE_COLUMNS)], meta
+
+
+def update_sentiment_stream(
+    df_news: pd.DataFrame,
+    score_fn,
+    path=SENTIMENT_STREAM_CSV,
+    meta_path=SENTIMENT_STREAM_META_JSON,
+    bucket: str = SENTIMENT_BUCKET,
+) -> pd.DataFrame:
+    """
+    A még be nem számolt klaszter-reprezentánsok hozzáadása a bucket-állapothoz.
+
+    df_news:  a hír store (timestamp, title, summary, cluster_id)
+    score_fn: DataFrame -> ugyanaz "sentiment" (compound) oszloppal
+              (sentiment_analyzer.analyze_news_sentiment, a score cache-en át)
+    Vissza: a frissített állapot.
+    """
+    state, meta = load_stream(path, meta_path, bucket)
+    seen = meta.get("seen", {})
+
+    reps = cluster_representatives(df_news) if not df_news.empty else df_news
+    new = reps[~reps["cluster_id"].astype(str).isin(seen.keys())] if not reps.empty else reps
+    if not new.empty:
+        df_scored = score_fn(new)
+        state = fold_scores(state, df_scored["timestamp"], df_scored["sentiment"], bucket)
+        buckets = pd.to_datetime(df_scored["timestamp"], utc=True, errors="coerce").dt.floor(bucket)
+        for cid, b in zip(df_scored["cluster_id"].astype(str), buckets):
+            seen[cid] = None if pd.isna(b) else b.isoformat()
+
+    cutoff = pd.Timestamp.now(tz="UTC") - SEEN_RETENTION
+    meta = {
+        "bucket": bucket,
+        "seen": {cid: b for cid, b in seen.items() if b is not None and pd.Timestamp(b) >= cutoff},
+    }
+
+    Path(path).parent.mkdir(exist_ok=True, parents=True)
+    state.to_csv(path, index_label="timestamp")
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    print(f"Sentiment stream: {len(new)} új cikk, {len(state)} bucket ({bucket}), mentve: {path}")
+    return state
+
+
+def _decayed_sum(x: np.ndarray, decay: float) -> np.ndarray:
+    """
+    p_t = decay * p_{t-1} + x_t (p_-1 = 0), vektorizáltan: az adjust=False EWM
+    (alpha = 1 - decay) egy 0 kezdőértékkel pontosan p_t * (1 - decay).
+    """
+    ewm = pd.Series(np.concatenate([[0.0], x])).ewm(alpha=1.0 - decay, adjust=False).mean()
+    return ewm.to_numpy()[1:] / (1.0 - decay)
+
+
+def stream_max_staleness(bucket: str = SENTIMENT_BUCKET) -> pd.Timedelta:
+    """
+    Az as-of illesztés staleness korlátja a stream feature-ökhöz: a sorok
+    bucketenként jönnek, így egy bucket + 1 óra (órás cél indexnél a bucket
+    vége utáni órák még a lezárt bucket értékét kapják).
+    """
+    return pd.Timedelta(bucket) + pd.Timedelta(hours=1)
+
+
+def stream_features(
+    state: pd.DataFrame | None = None,
+    bucket: str = SENTIMENT_BUCKET,
+    halflives_h=SENTIMENT_PRESSURE_HALFLIVES_H,
+    now=None,
+) -> pd.DataFrame:
+    """
+    Bucketenkénti feature-ök szabályos rácson (üres bucket: count 0, átlag / arányok NaN),
+    a bucket végével indexelve, az utolsó lezárt bucketig.
+    state=None: a mentett állapot (SENTIMENT_STREAM_CSV).
+    """
+    if state is None:
+        state, _ = load_stream(bucket=bucket)
+    if state.empty:
+        return pd.DataFrame()
+
+    step = pd.Timedelta(bucket)
+    now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+    last = max(state.index.max(), now.floor(bucket) - step)
+    grid = pd.date_range(state.index.min(), last, freq=step)
+    s = state.reindex(grid, fill_value=0.0)
+
+    n = s["count"].to_numpy()
+    has = n > 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(has, s["mean"].to_numpy(), np.nan)
+        std = np.where(n > 1, np.sqrt(s["m2"].to_numpy() / (n - 1)), np.where(has, 0.0, np.nan))
+        bull = np.where(has, s["bull"].to_numpy() / n, np.nan)
+        bear = np.where(has, s["bear"].to_numpy() / n, np.nan)
+
+    out = {
+        f"news_count_{bucket}": n,
+        f"news_sent_mean_{bucket}": mean,
+        f"news_sent_std_{bucket}": std,
+        f"news_bull_ratio_{bucket}": bull,
+        f"news_bear_ratio_{bucket}": bear,
+    }
+    sent_sum = np.where(has, s["mean"].to_numpy() * n, 0.0)
+    hours = step / pd.Timedelta(hours=1)
+    for hl in halflives_h:
+        decay = 0.5 ** (hours / hl)
+        out[f"news_pressure_{hl:g}h"] = _decayed_sum(n, decay)
+        out[f"news_sent_pressure_{hl:g}h"] = _decayed_sum(sent_sum, decay)
+
+    return pd.DataFrame(out, index=pd.DatetimeIndex(grid + step, name="timestamp"))
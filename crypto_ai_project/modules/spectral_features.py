@@ -0,0 +1,175 @@
+# modules/spectral_features.py
+"""
+Spektrális / ciklus feature-ök gördülő ablakokon (close, hozam, volumen).
+
+Ablakonként:
+- domináns periódus (gyertyában): a legnagyobb teljesítményű frekvencia-bin
+- spektrális entrópia (0..1): 1 = fehér zaj (lapos spektrum), 0 = egyetlen ciklus
+- sáv-arányok: a teljesítmény hányada periódus-sávonként (pl. >= 24 gyertya,
+  6-24 gyertya, 2-6 gyertya)
+
+Az ablakokat nem egyenként transzformáljuk: a sorozat strided view-jából
+(sliding_window_view, másolás nélkül) sor-blokkonként egyetlen np.fft.rfft
+hívás megy az összes ablakra (axis=1). A memóriát max_chunk_cells
+(blokk-sorok * ablak) korlátozza, így 1m adaton is lineárisan skálázódik.
+
+Előkészítés ablakonként: átlag- vagy lineáris trend levonása (különben a
+trend a legalacsonyabb frekvenciára "szivárog"), majd Hann-ablak.
+A DC komponenst kihagyjuk.
+"""
+
+import numpy as np
+import pandas as pd
+
+# periódus-sávok gyertyában: név -> (alsó, felső); None = nyitott
+SPECTRAL_BANDS_1H = {
+    "low": (24, None),   # napi és annál hosszabb ciklusok
+    "mid": (6, 24),
+    "high": (2, 6),
+}
+SPECTRAL_BANDS_1D = {
+    "low": (14, None),   # kéthetes és hosszabb ciklusok
+    "mid": (4, 14),
+    "high": (2, 4),
+}
+
+
+def _detrend(x: np.ndarray, detrend: str) -> np.ndarray:
+    """Ablakonkénti (soronkénti) átlag- vagy lineáris trend levonás."""
+    x = x - x.mean(axis=1, keepdims=True)
+    if detrend == "linear":
+        t = np.arange(x.shape[1], dtype=float)
+        t -= t.mean()
+        slope = x @ t / (t @ t)
+        x -= slope[:, None] * t
+    elif detrend != "mean":
+        raise ValueError(f"Ismeretlen detrend mód: {detrend}")
+    return x
+
+
+def rolling_spectral_stats(
+    values,
+    window: int,
+    bands: dict | None = None,
+    detrend: str = "mean",
+    step: int = 1,
+    max_chunk_cells: int = 1_000_000,
+) -> dict:
+    """
+    Gördülő spektrális statisztikák egy 1D tömbön.
+
+    window:  ablakhossz gyertyában (az ablak a t. elemmel zárul, nincs előrelátás)
+    bands:   {név: (alsó periódus, felső periódus)} gyertyában (alapból SPECTRAL_BANDS_1H)
+    detrend: "mean" vagy "linear"
+    step:    csak minden step-edik ablakot számoljuk (plusz mindig az utolsót),
+             a köztes sorok az utolsó kiszámolt értéket tartják
+    Vissza: {"period", "entropy", "{band}_ratio", ...} -> n hosszú tömbök
+            (az első window-1 elem és a NaN-t tartalmazó ablakok: NaN)
+    """
+    bands = SPECTRAL_BANDS_1H if bands is None else bands
+    values = np.asarray(values, dtype=float)
+    n = values.shape[0]
+    keys = ["period", "entropy"] + [f"{name}_ratio" for name in bands]
+    out = {k: np.full(n, np.nan) for k in keys}
+    if n < window or window < 4:
+        return out
+
+    view = np.lib.stride_tricks.sliding_window_view(values, window)
+    n_windows = view.shape[0]
+    positions = np.arange(0, n_windows, max(1, step))
+    if positions[-1] != n_windows - 1:
+        positions = np.append(positions, n_windows - 1)
+
+    freqs = np.fft.rfftfreq(window)[1:]
+    periods = 1.0 / freqs
+    band_masks = {}
+    for name, (lo, hi) in bands.items():
+        mask = periods >= lo
+        if hi is not None:
+            mask &= periods < hi
+        band_masks[name] = mask
+    taper = np.hanning(window)
+    log_n_bins = np.log(len(freqs)) if len(freqs) > 1 else 1.0
+
+    rows_per_chunk = max(1, max_chunk_cells // window)
+    for start in range(0, len(positions), rows_per_chunk):
+        pos = positions[start:start + rows_per_chunk]
+        x = view[pos] if step > 1 else view[pos[0]:pos[-1] + 1]
+        valid = np.isfinite(x).all(axis=1)
+
+        x = _detrend(np.where(np.isfinite(x), x, 0.0), detrend)
+        x *= taper
+        spec = np.fft.rfft(x, axis=1)[:, 1:]
+        power = spec.real ** 2
+        power += spec.imag ** 2
+        total = power.sum(axis=1)
+        ok = valid & (total > 0)
+
+        p = power
+        p /= np.where(ok, total, 1.0)[:, None]
+        # 0 * log(0) = 0: a nulla teljesítményű bineket egy apró alsó korlát kezeli
+        entropy = -(p * np.log(np.maximum(p, 1e-300))).sum(axis=1) / log_n_bins
+
+        rows = pos + window - 1
+        out["period"][rows] = np.where(ok, periods[np.argmax(p, axis=1)], np.nan)
+        out["entropy"][rows] = np.where(ok, entropy, np.nan)
+        for name, mask in band_masks.items():
+            out[f"{name}_ratio"][rows] = np.where(ok, p[:, mask].sum(axis=1), np.nan)
+
+    if step > 1:
+        # a köztes sorok az utolsó kiszámolt ablak értékét tartják
+        for k in keys:
+            out[k][window - 1:] = pd.Series(out[k][window - 1:]).ffill().to_numpy()
+    return out
+
+
+def spectral_features(
+    series: pd.Series,
+    window: int,
+    prefix: str,
+    bands: dict | None = None,
+    detrend: str = "mean",
+    step: int = 1,
+) -> pd.DataFrame:
+    """rolling_spectral_stats DataFrame-ként, {prefix}_{stat} oszlopnevekkel."""
+    stats = rolling_spectral_stats(series.to_numpy(dtype=float), window, bands, detrend, step)
+    return pd.DataFrame({f"{prefix}_{k}": v for k, v in stats.items()}, index=series.index)
+
+
+SPECTRAL_INPUTS = ("close", "ret", "volume")
+
+
+def spectral_input(df: pd.DataFrame, name: str):
+    """
+    A spektrumhoz használt bemenet és a detrend mód:
+    - close: log ár, lineáris trend nélkül
+    - ret:   loghozam, átlag nélkül
+    - volume: log(1 + volumen), lineáris trend nélkül
+    """
+    if name == "volume":
+        return np.log1p(df["volume"].astype(float).clip(lower=0)), "linear"
+    close = df["close"].astype(float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_close = np.log(close.where(close > 0))
+    if name == "close":
+        return log_close, "linear"
+    if name == "ret":
+        return log_close.diff(), "mean"
+    raise ValueError(f"Ismeretlen spektrális bemenet: {name}")
+
+
+def add_spectral_features(
+    df: pd.DataFrame,
+    window: int = 168,
+    bands: dict | None = None,
+    step: int = 1,
+) -> pd.DataFrame:
+    """
+    spec_{close,ret,volume}_{window}_{period,entropy,low_ratio,mid_ratio,high_ratio}
+    (1h adaton window=168: egyhetes ablak).
+    """
+    parts = []
+    for name in SPECTRAL_INPUTS:
+        series, detrend = spectral_input(df, name)
+        parts.append(spectral_features(series, window, f"spec_{name}_{window}", bands, detrend, step))
+    return pd.concat([df] + parts, axis=1)
@@ -0,0 +1,94 @@
+# modules/streaming_stats.py
+"""
+Oszloponkénti streaming statisztikák (darabszám, min, max, átlag, M2) a
+feature store darabolt olvasásához.
+
+A statisztika egy sima dict (numpy tömbökkel), ami összefésülhető:
+két részeredmény merge_stats-szal egyesíthető (Chan-féle párhuzamos
+variancia-képlet), így chunkonként, akár külön folyamatokban is számolható,
+és a sorrend nem számít. NaN-t oszloponként kihagyunk.
+
+A végén a statisztikából sklearn MinMaxScaler-t állítunk elő (ugyanazokkal
+az attribútumokkal, mintha fit-et hívtunk volna), így a mentés, a
+transform / inverse_transform és a predikció változatlanul működik.
+"""
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+
+def empty_stats(n_columns: int) -> dict:
+    return {
+        "n": np.zeros(n_columns, dtype=np.int64),
+        "min": np.full(n_columns, np.inf),
+        "max": np.full(n_columns, -np.inf),
+        "mean": np.zeros(n_columns),
+        "m2": np.zeros(n_columns),
+    }
+
+
+def chunk_stats(X) -> dict:
+    """Egy (sorok, oszlopok) chunk statisztikája."""
+    X = np.asarray(X, dtype=float)
+    if X.ndim == 1:
+        X = X[:, None]
+    finite = np.isfinite(X)
+    n = finite.sum(axis=0)
+    safe_n = np.maximum(n, 1)
+    filled = np.where(finite, X, 0.0)
+    mean = filled.sum(axis=0) / safe_n
+    m2 = (np.where(finite, X - mean, 0.0) ** 2).sum(axis=0)
+    return {
+        "n": n.astype(np.int64),
+        "min": np.where(finite, X, np.inf).min(axis=0, initial=np.inf),
+        "max": np.where(finite, X, -np.inf).max(axis=0, initial=-np.inf),
+        "mean": mean,
+        "m2": m2,
+    }
+
+
+def merge_stats(a: dict, b: dict) -> dict:
+    """Két részstatisztika összefésülése (asszociatív, kommutatív)."""
+    n = a["n"] + b["n"]
+    safe_n = np.maximum(n, 1)
+    delta = b["mean"] - a["mean"]
+    return {
+        "n": n,
+        "min": np.minimum(a["min"], b["min"]),
+        "max": np.maximum(a["max"], b["max"]),
+        "mean": a["mean"] + delta * (b["n"] / safe_n),
+        "m2": a["m2"] + b["m2"] + delta ** 2 * (a["n"] * b["n"] / safe_n),
+    }
+
+
+def update_stats(stats: dict | None, X) -> dict:
+    """A futó statisztika bővítése egy újabb chunkkal (stats=None: első chunk)."""
+    part = chunk_stats(X)
+    return part if stats is None else merge_stats(stats, part)
+
+
+def stats_variance(stats: dict, ddof: int = 0) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(stats["n"] > ddof, stats["m2"] / (stats["n"] - ddof), np.nan)
+
+
+def minmax_scaler_from_stats(stats: dict, feature_range=(0, 1)) -> MinMaxScaler:
+    """
+    MinMaxScaler a streaming min / max értékekből (a fit() eredményével azonos).
+    Konstans oszlopnál a tartomány 1 (mint az sklearn-ben), csupa NaN oszlopnál 0..1.
+    """
+    data_min = np.where(stats["n"] > 0, stats["min"], 0.0)
+    data_max = np.where(stats["n"] > 0, stats["max"], 1.0)
+    data_range = data_max - data_min
+    safe_range = np.where(data_range > 10 * np.finfo(float).eps, data_range, 1.0)
+
+    lo, hi = feature_range
+    scaler = MinMaxScaler(feature_range=feature_range)
+    scaler.n_features_in_ = len(data_min)
+    scaler.n_samples_seen_ = int(stats["n"].max()) if len(stats["n"]) else 0
+    scaler.data_min_ = data_min
+    scaler.data_max_ = data_max
+    scaler.data_range_ = data_range
+    scaler.scale_ = (hi - lo) / safe_range
+    scaler.min_ = lo - data_min * scaler.scale_
+    return scaler